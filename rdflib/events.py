@@ -81,6 +81,10 @@ class Dispatcher:
         self._dispatch_map[event_type] = lst
         return self
 
+    def subscribed(self, event_type) -> bool:
+        """Whether any handler is subscribed to the given event_type"""
+        return bool(self._dispatch_map and self._dispatch_map.get(event_type))
+
     def dispatch(self, event):
         """Dispatch the given event to the subscribed handlers for
         the event's type"""
@@ -10,6 +10,7 @@ from typing import (
     Any,
     BinaryIO,
     Callable,
+    ContextManager,
     Dict,
     Generator,
     Iterable,
@@ -38,7 +39,7 @@ from rdflib.collection import Collection
 from rdflib.exceptions import ParserError
 from rdflib.namespace import RDF, Namespace, NamespaceManager
 from rdflib.parser import InputSource, Parser, create_input_source
-from rdflib.paths import Path
+from rdflib.paths import Path, TransitiveClosureIndex
 from rdflib.resource import Resource
 from rdflib.serializer import Serializer
 from rdflib.store import Store
@@ -545,6 +546,18 @@ class Graph(Node):
         )
         return self
 
+    def bulk_load(self) -> ContextManager[None]:
+        """
+        A context in which triples are added to the graph in bulk, which
+        :meth:`parse` uses. The store may defer some of the work adding a
+        triple takes until the context ends, see :meth:`Store.bulk_load
+        <rdflib.store.Store.bulk_load>`::
+
+            with graph.bulk_load():
+                graph.addN(quads)
+        """
+        return self.__store.bulk_load()
+
     def remove(self: _GraphT, triple: "_TriplePatternType") -> _GraphT:
         """Remove a triple from the graph
 
@@ -1146,9 +1159,18 @@ class Graph(Node):
         """Transitively generate objects for the ``predicate`` relationship
 
         Generated objects belong to the depth first transitive closure of the
-        ``predicate`` relationship starting at ``subject``.
+        ``predicate`` relationship starting at ``subject``, or, if there is a
+        :class:`~rdflib.paths.TransitiveClosureIndex` for ``predicate``, come
+        from it in no particular order.
         """
         if remember is None:
+            index = TransitiveClosureIndex.find(self, predicate)
+            if index is not None:
+                yield subject
+                for object in index.objects(subject):
+                    if object != subject:
+                        yield object
+                return
             remember = {}
         if subject in remember:
             return
@@ -1167,9 +1189,18 @@ class Graph(Node):
         """Transitively generate subjects for the ``predicate`` relationship
 
         Generated subjects belong to the depth first transitive closure of the
-        ``predicate`` relationship starting at ``object``.
+        ``predicate`` relationship starting at ``object``, or, if there is a
+        :class:`~rdflib.paths.TransitiveClosureIndex` for ``predicate``, come
+        from it in no particular order.
         """
         if remember is None:
+            index = TransitiveClosureIndex.find(self, predicate)
+            if index is not None:
+                yield object
+                for subject in index.subjects(object):
+                    if subject != object:
+                        yield subject
+                return
             remember = {}
         if object in remember:
             return
@@ -1489,7 +1520,8 @@ class Graph(Node):
         parser = plugin.get(format, Parser)()
         try:
             # TODO FIXME: Parser.parse should have **kwargs argument.
-            parser.parse(source, self, **args)
+            with self.bulk_load():
+                parser.parse(source, self, **args)
         except SyntaxError as se:
             if could_not_guess_format:
                 raise ParserError(
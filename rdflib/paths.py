@@ -185,20 +185,26 @@ No vars specified:
 """
 
 
+import threading
 import warnings
 from functools import total_ordering
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
+    Dict,
     Generator,
+    Iterable,
     Iterator,
     List,
+    Mapping,
     Optional,
     Set,
     Tuple,
+    TypeVar,
     Union,
 )
+from weakref import WeakKeyDictionary
 
 from rdflib.term import Node, URIRef
 
@@ -206,6 +212,7 @@ if TYPE_CHECKING:
     from rdflib._type_checking import _MulPathMod
     from rdflib.graph import Graph, _ObjectType, _PredicateType, _SubjectType
     from rdflib.namespace import NamespaceManager
+    from rdflib.store import Store
 
 
 # property paths
@@ -385,95 +392,103 @@ class MulPath(Path):
         obj: Optional["_ObjectType"] = None,
         first: bool = True,
     ) -> Generator[Tuple[_SubjectType, _ObjectType], None, None]:
+        done: Set[
+            Tuple[Node, Node]
+        ] = set()  # the spec does, by defn, not allow duplicates
+
         if self.zero and first:
             if subj and obj:
                 if subj == obj:
+                    done.add((subj, obj))
                     yield subj, obj
             elif subj:
+                done.add((subj, subj))
                 yield subj, subj
             elif obj:
+                done.add((obj, obj))
                 yield obj, obj
 
-        def _fwd(
-            subj: Optional[_SubjectType] = None,
-            obj: Optional[_ObjectType] = None,
-            seen: Optional[Set[_SubjectType]] = None,
-        ) -> Generator[Tuple[_SubjectType, _ObjectType], None, None]:
-            # type error: Item "None" of "Optional[Set[Node]]" has no attribute "add"
-            # type error: Argument 1 to "add" of "set" has incompatible type "Optional[Node]"; expected "Node"
-            seen.add(subj)  # type: ignore[union-attr, arg-type]
-
-            for s, o in eval_path(graph, (subj, self.path, None)):
-                if not obj or o == obj:
-                    yield s, o
-                if self.more:
-                    # type error: Unsupported right operand type for in ("Optional[Set[Node]]")
-                    if o in seen:  # type: ignore[operator]
-                        continue
-                    for s2, o2 in _fwd(o, obj, seen):
-                        yield s, o2
-
-        def _bwd(
-            subj: Optional[_SubjectType] = None,
-            obj: Optional[_ObjectType] = None,
-            seen: Optional[Set[_ObjectType]] = None,
-        ) -> Generator[Tuple[_SubjectType, _ObjectType], None, None]:
-            # type error: Item "None" of "Optional[Set[Node]]" has no attribute "add"
-            # type error: Argument 1 to "add" of "set" has incompatible type "Optional[Node]"; expected "Node"
-            seen.add(obj)  # type: ignore[union-attr, arg-type]
+        check = getattr(_path_check, "check", None)
+
+        def _fwd(node: Node) -> Iterator[Node]:
+            if check is not None:
+                check()
+            return (o for s, o in eval_path(graph, (node, self.path, None)))
+
+        def _bwd(node: Node) -> Iterator[Node]:
+            if check is not None:
+                check()
+            return (s for s, o in eval_path(graph, (None, self.path, node)))
+
+        def _zero_paths() -> Generator[Tuple[_SubjectType, _ObjectType], None, None]:
+            # According to the spec, ALL nodes are possible solutions
+            # (even literals)
+            # we cannot do this without going through ALL triples
+            # unless we keep an index of all terms somehow
+            # but let's just hope this query doesn't happen very often...
+            for s, o in graph.subject_objects(None):
+                yield s, s
+                yield o, o
+
+        def _all_paths() -> Generator[Tuple[_SubjectType, _ObjectType], None, None]:
+            if self.zero:
+                yield from _zero_paths()
 
-            for s, o in eval_path(graph, (None, self.path, obj)):
-                if not subj or subj == s:
-                    yield s, o
-                if self.more:
-                    # type error: Unsupported right operand type for in ("Optional[Set[Node]]")
-                    if s in seen:  # type: ignore[operator]
-                        continue
+            if index is not None:
+                yield from index.pairs()
+                return
 
-                    for s2, o2 in _bwd(None, s, seen):
-                        yield s2, o
+            if not self.more:
+                yield from eval_path(graph, (None, self.path, None))
+                return
 
-        def _all_fwd_paths() -> Generator[Tuple[_SubjectType, _ObjectType], None, None]:
-            if self.zero:
-                seen1 = set()
-                # According to the spec, ALL nodes are possible solutions
-                # (even literals)
-                # we cannot do this without going through ALL triples
-                # unless we keep an index of all terms somehow
-                # but let's just hope this query doesn't happen very often...
-                for s, o in graph.subject_objects(None):
-                    if s not in seen1:
-                        seen1.add(s)
-                        yield s, s
-                    if o not in seen1:
-                        seen1.add(o)
-                        yield o, o
-
-            seen = set()
+            # a single pass over the path's pairs, and the closure of each
+            # node is shared with every node that reaches it
+            successors: Dict[Node, List[Node]] = {}
             for s, o in eval_path(graph, (None, self.path, None)):
-                if not self.more:
+                if check is not None:
+                    check()
+                successors.setdefault(s, []).append(o)
+            closures = _closures(successors, check=check)
+            for s in successors:
+                for o in closures[s]:
                     yield s, o
-                else:
-                    if s not in seen:
-                        seen.add(s)
-                        f = list(_fwd(s, None, set()))
-                        for s1, o1 in f:
-                            assert s1 == s
-                            yield s1, o1
-
-        done = set()  # the spec does, by defn, not allow duplicates
-        if subj:
-            for x in _fwd(subj, obj, set()):
-                if x not in done:
-                    done.add(x)
-                    yield x
+
+        index = (
+            TransitiveClosureIndex.find(graph, self.path)
+            if self.more and isinstance(self.path, URIRef)
+            else None
+        )
+
+        if subj and obj:
+            if index is not None:
+                found = obj in index.objects(subj)
+            elif self.more:
+                found = _connected(subj, obj, _fwd, _bwd)
+            else:
+                found = any(True for _ in eval_path(graph, (subj, self.path, obj)))
+            if found and (subj, obj) not in done:
+                yield subj, obj
+        elif subj:
+            if index is not None:
+                objects: Iterable[Node] = index.objects(subj)
+            else:
+                objects = _reachable(subj, _fwd) if self.more else _fwd(subj)
+            for o in objects:
+                if (subj, o) not in done:
+                    done.add((subj, o))
+                    yield subj, o
         elif obj:
-            for x in _bwd(subj, obj, set()):
-                if x not in done:
-                    done.add(x)
-                    yield x
+            if index is not None:
+                subjects: Iterable[Node] = index.subjects(obj)
+            else:
+                subjects = _reachable(obj, _bwd) if self.more else _bwd(obj)
+            for s in subjects:
+                if (s, obj) not in done:
+                    done.add((s, obj))
+                    yield s, obj
         else:
-            for x in _all_fwd_paths():
+            for x in _all_paths():
                 if x not in done:
                     done.add(x)
                     yield x
@@ -541,6 +556,362 @@ def path_sequence(self: Union[URIRef, Path], other: Union[URIRef, Path]):
     return SequencePath(self, other)
 
 
+_T = TypeVar("_T")
+
+# while a path is evaluated through _checked_paths, the callable its
+# searches call now and then, which raises to stop them
+_path_check = threading.local()
+
+
+def _checked_paths(
+    pairs: Iterable[_T], check: Callable[[], None]
+) -> Generator[_T, None, None]:
+    """
+    Iterate pairs, found by evaluating a path, with check called as the
+    path is searched, so a search that goes on without finding anything
+    can still be stopped
+    """
+    it = iter(pairs)
+    while True:
+        previous = getattr(_path_check, "check", None)
+        _path_check.check = check
+        try:
+            pair = next(it)
+        except StopIteration:
+            return
+        finally:
+            _path_check.check = previous
+        yield pair
+
+
+def _reachable(
+    start: Node, step: Callable[[Node], Iterator[Node]]
+) -> Generator[Node, None, None]:
+    """
+    The nodes reachable from start in one or more steps, depth first and
+    without recursion, so that long chains do not hit the recursion limit
+    """
+    seen: Set[Node] = set()
+    stack = [step(start)]
+    while stack:
+        for node in stack[-1]:
+            if node not in seen:
+                seen.add(node)
+                yield node
+                stack.append(step(node))
+                break
+        else:
+            stack.pop()
+
+
+def _connected(
+    subj: Node,
+    obj: Node,
+    forward: Callable[[Node], Iterator[Node]],
+    backward: Callable[[Node], Iterator[Node]],
+) -> bool:
+    """
+    Whether obj is reachable from subj in one or more steps, searching
+    breadth first from both ends and always extending the smaller frontier,
+    so a narrow end (e.g. the superclasses of a class) is not swamped by a
+    wide one (its superclass's subclasses)
+    """
+    seen_fwd, seen_bwd = {subj}, {obj}
+    frontier_fwd, frontier_bwd = [subj], [obj]
+    while frontier_fwd and frontier_bwd:
+        if len(frontier_fwd) <= len(frontier_bwd):
+            frontier, step, seen, other = frontier_fwd, forward, seen_fwd, seen_bwd
+        else:
+            frontier, step, seen, other = frontier_bwd, backward, seen_bwd, seen_fwd
+        extended = []
+        for node in frontier:
+            for next_node in step(node):
+                # at least this step lies between subj and obj
+                if next_node in other:
+                    return True
+                if next_node not in seen:
+                    seen.add(next_node)
+                    extended.append(next_node)
+        if step is forward:
+            frontier_fwd = extended
+        else:
+            frontier_bwd = extended
+    return False
+
+
+def _closures(
+    successors: Mapping[Node, Iterable[Node]],
+    roots: Optional[Iterable[Node]] = None,
+    closures: Optional[Dict[Node, Set[Node]]] = None,
+    check: Optional[Callable[[], None]] = None,
+) -> Dict[Node, Set[Node]]:
+    """
+    The nodes reachable in one or more steps from each node (or from the
+    given roots and the nodes they reach), given the successors of each node.
+
+    The strongly connected components are found with (an iterative version
+    of) Tarjan's algorithm, which completes a component only after all the
+    components it reaches, so the closure of a component is made from the
+    closures of its successors rather than by searching again.
+    Nodes of the same component share the same closure, which must not be
+    changed. Closures already in ``closures`` are used as they are, and the
+    new ones are added to it. check, if given, is called for each component.
+    """
+    if closures is None:
+        closures = {}
+    index: Dict[Node, int] = {}
+    low: Dict[Node, int] = {}
+    stack: List[Node] = []
+    on_stack: Set[Node] = set()
+
+    for root in successors if roots is None else roots:
+        if root in index or root in closures:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors.get(root, ())))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child in closures:
+                    continue
+                if child not in index:
+                    index[child] = low[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors.get(child, ()))))
+                    break
+                elif child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    if check is not None:
+                        check()
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                        if member == node:
+                            break
+                    closure: Set[Node] = set()
+                    for member in component:
+                        for o in successors.get(member, ()):
+                            closure.add(o)
+                            if o not in component:
+                                closure.update(closures[o])
+                    for member in component:
+                        closures[member] = closure
+    return closures
+
+
+class TransitiveClosureIndex:
+    """
+    An index of the transitive closure of one predicate in a store, e.g.
+    ``rdfs:subClassOf`` or ``skos:broader``, used instead of searching the
+    store by ``p+``/``p*`` paths and by :meth:`Graph.transitive_objects
+    <rdflib.graph.Graph.transitive_objects>` and :meth:`Graph.transitive_subjects
+    <rdflib.graph.Graph.transitive_subjects>`.
+
+    The index is kept up to date from the store's
+    :class:`~rdflib.store.TripleAddedEvent` and
+    :class:`~rdflib.store.TripleRemovedEvent`; closures are computed when
+    first asked for and only those affected by a change are computed again.
+
+    It covers all the contexts of the store, so it is used for graphs that
+    see all of them: the union of a :class:`~rdflib.graph.ConjunctiveGraph`,
+    any graph of a store which is not context aware, and a graph holding all
+    the indexed triples of a store that is.
+
+    >>> from rdflib import Graph, Namespace, RDFS
+    >>> ex = Namespace("http://example.org/")
+    >>> g = Graph()
+    >>> index = TransitiveClosureIndex(g.store, RDFS.subClassOf)
+    >>> _ = g.add((ex.Dog, RDFS.subClassOf, ex.Mammal))
+    >>> _ = g.add((ex.Mammal, RDFS.subClassOf, ex.Animal))
+    >>> sorted(index.objects(ex.Dog))
+    [rdflib.term.URIRef('http://example.org/Animal'), rdflib.term.URIRef('http://example.org/Mammal')]
+    >>> sorted(g.transitive_subjects(RDFS.subClassOf, ex.Animal))
+    [rdflib.term.URIRef('http://example.org/Animal'), rdflib.term.URIRef('http://example.org/Dog'), rdflib.term.URIRef('http://example.org/Mammal')]
+    >>> index.detach()
+    """
+
+    def __init__(self, store: "Store", predicate: URIRef):
+        from rdflib.graph import QuotedGraph
+        from rdflib.store import TripleAddedEvent, TripleRemovedEvent
+
+        self.store = store
+        self.predicate = predicate
+        self._quoted = QuotedGraph
+        # the contexts of each (subject, object) pair
+        self._pairs: Dict[Tuple[Node, Node], Set[Optional[Node]]] = {}
+        # the number of pairs in each context
+        self._contexts: Dict[Optional[Node], int] = {}
+        self._successors: Dict[Node, Dict[Node, None]] = {}
+        self._predecessors: Dict[Node, Dict[Node, None]] = {}
+        self._forward: Dict[Node, Set[Node]] = {}
+        self._backward: Dict[Node, Set[Node]] = {}
+        self._attached = True
+
+        for (s, p, o), contexts in store.triples((None, predicate, None)):
+            for context in list(contexts) or [None]:
+                self._add(s, o, context)
+
+        store.dispatcher.subscribe(TripleAddedEvent, self._added)
+        store.dispatcher.subscribe(TripleRemovedEvent, self._removed)
+        _closure_indexes.setdefault(store, {})[predicate] = self
+
+    @classmethod
+    def find(cls, graph: "Graph", predicate: Any) -> Optional["TransitiveClosureIndex"]:
+        """
+        The index of predicate to use for graph, if there is one
+        """
+        if not _closure_indexes:
+            return None
+        try:
+            index = _closure_indexes[graph.store][predicate]
+        except (KeyError, TypeError):
+            return None
+        return index if index.covers(graph) else None
+
+    def covers(self, graph: "Graph") -> bool:
+        """
+        Whether graph sees all of the pairs in the index
+        """
+        if graph.store is not self.store or not self._attached:
+            return False
+        if not self.store.context_aware or graph.default_union:
+            return True
+        return all(c == graph.identifier for c in self._contexts)
+
+    def detach(self) -> None:
+        """
+        Stop using and maintaining the index
+        """
+        self._attached = False
+        indexes = _closure_indexes.get(self.store, {})
+        if indexes.get(self.predicate) is self:
+            del indexes[self.predicate]
+
+    def objects(self, subject: Node) -> Set[Node]:
+        """
+        The nodes reachable from subject in one or more steps
+        """
+        return self._closure(subject, self._successors, self._forward)
+
+    def subjects(self, object: Node) -> Set[Node]:
+        """
+        The nodes object can be reached from in one or more steps
+        """
+        return self._closure(object, self._predecessors, self._backward)
+
+    def pairs(self) -> Generator[Tuple[Node, Node], None, None]:
+        """
+        All the pairs of nodes connected in one or more steps
+        """
+        _closures(self._successors, closures=self._forward)
+        for s in list(self._successors):
+            for o in self.objects(s):
+                yield s, o
+
+    @staticmethod
+    def _closure(
+        node: Node,
+        successors: Dict[Node, Dict[Node, None]],
+        closures: Dict[Node, Set[Node]],
+    ) -> Set[Node]:
+        try:
+            return closures[node]
+        except KeyError:
+            return _closures(successors, [node], closures)[node]
+
+    def _context(self, context: Any) -> Optional[Node]:
+        return getattr(context, "identifier", context)
+
+    def _added(self, event: Any) -> None:
+        s, p, o = event.triple
+        if self._attached and p == self.predicate:
+            self._add(s, o, event.context)
+
+    def _add(self, s: Node, o: Node, context: Any) -> None:
+        if isinstance(context, self._quoted):
+            return
+        context = self._context(context)
+        try:
+            contexts = self._pairs[(s, o)]
+        except KeyError:
+            contexts = self._pairs[(s, o)] = set()
+            self._invalidate(s, o)
+            self._successors.setdefault(s, {})[o] = None
+            self._predecessors.setdefault(o, {})[s] = None
+        if context not in contexts:
+            contexts.add(context)
+            self._contexts[context] = self._contexts.get(context, 0) + 1
+
+    def _removed(self, event: Any) -> None:
+        s, p, o = event.triple
+        if not self._attached or p not in (None, self.predicate):
+            return
+        if s is not None and o is not None:
+            pairs = [(s, o)] if (s, o) in self._pairs else []
+        elif s is not None:
+            pairs = [(s, o_) for o_ in self._successors.get(s, ())]
+        elif o is not None:
+            pairs = [(s_, o) for s_ in self._predecessors.get(o, ())]
+        else:
+            pairs = list(self._pairs)
+        context = self._context(event.context)
+        for pair in pairs:
+            contexts = self._pairs[pair]
+            if event.context is None:
+                removed = set(contexts)
+            else:
+                removed = {context} & contexts
+                if contexts - removed == {None}:
+                    # as the default graph of a context aware store
+                    removed.add(None)
+            for c in removed:
+                contexts.discard(c)
+                self._contexts[c] -= 1
+                if not self._contexts[c]:
+                    del self._contexts[c]
+            if not contexts:
+                self._remove(*pair)
+
+    def _remove(self, s: Node, o: Node) -> None:
+        self._invalidate(s, o)
+        del self._pairs[(s, o)]
+        del self._successors[s][o]
+        if not self._successors[s]:
+            del self._successors[s]
+        del self._predecessors[o][s]
+        if not self._predecessors[o]:
+            del self._predecessors[o]
+
+    def _invalidate(self, s: Node, o: Node) -> None:
+        # the closures changed by a pair (s, o): those of s and the nodes
+        # reaching it forwards, and of o and the nodes it reaches backwards
+        if self._forward:
+            self._forward.pop(s, None)
+            for n in _reachable(s, lambda n: iter(self._predecessors.get(n, ()))):
+                self._forward.pop(n, None)
+        if self._backward:
+            self._backward.pop(o, None)
+            for n in _reachable(o, lambda n: iter(self._successors.get(n, ()))):
+                self._backward.pop(n, None)
+
+
+# the TransitiveClosureIndex of each predicate, for each store
+_closure_indexes: "WeakKeyDictionary[Store, Dict[URIRef, TransitiveClosureIndex]]" = (
+    WeakKeyDictionary()
+)
+
+
 def evalPath(  # noqa: N802
     graph: Graph,
     t: Tuple[
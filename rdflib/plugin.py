@@ -202,6 +202,12 @@ register(
     "rdflib.plugins.stores.memory",
     "SimpleMemory",
 )
+register(
+    "EncodedMemory",
+    Store,
+    "rdflib.plugins.stores.memory",
+    "EncodedMemory",
+)
 register(
     "Auditable",
     Store,
@@ -551,6 +557,18 @@ register(
     "rdflib.plugins.sparql.results.csvresults",
     "CSVResultSerializer",
 )
+register(
+    "tsv",
+    ResultSerializer,
+    "rdflib.plugins.sparql.results.tsvresults",
+    "TSVResultSerializer",
+)
+register(
+    "text/tab-separated-values",
+    ResultSerializer,
+    "rdflib.plugins.sparql.results.tsvresults",
+    "TSVResultSerializer",
+)
 
 # Register SPARQL Result Parsers
 register(
@@ -21,6 +21,76 @@ named graphs (like RDFLib's ConjunctiveGraph)
 """
 
 
+SPARQL_DISTINCT_MEMORY_ROWS = None
+"""
+The number of distinct solutions DISTINCT keeps in memory before it
+spills the remaining solutions to temporary files. None means no limit.
+"""
+
+
+SPARQL_GROUP_MEMORY_GROUPS = None
+"""
+The number of groups GROUP BY aggregates in memory before it spills the
+solutions of further groups to temporary files. None means no limit.
+"""
+
+
+SPARQL_REDUCED_WINDOW = 1
+"""
+The number of most recently seen solutions REDUCED compares each
+solution with. 0 disables the reduction, larger windows remove more
+duplicates from unordered solutions at the cost of memory.
+"""
+
+
+SPARQL_SERVICE_BATCH_SIZE = 100
+"""
+The number of solutions sent to a SERVICE endpoint at once, as the rows
+of a VALUES clause
+"""
+
+
+SPARQL_EXECUTOR = None
+"""
+A :class:`concurrent.futures.Executor`, such as a
+:class:`~concurrent.futures.ThreadPoolExecutor`, used to evaluate the
+parts of a query that call a SERVICE ahead of time: the branches of a
+UNION and the sides of a join are then evaluated concurrently. None
+evaluates everything in the calling thread.
+"""
+
+
+SPARQL_PREFETCH_ROWS = 1000
+"""
+The number of solutions of a part evaluated on SPARQL_EXECUTOR that are
+held until they are asked for, before its evaluation waits
+"""
+
+
+SPARQL_QUERY_TIMEOUT = None
+"""
+The seconds a query may run for, unless it is given other
+:class:`~rdflib.plugins.sparql.sparql.QueryLimits`. None for no limit.
+"""
+
+
+SPARQL_MAX_ROWS = None
+"""
+The number of intermediate solutions a query may compute, unless it is
+given other :class:`~rdflib.plugins.sparql.sparql.QueryLimits`. None for
+no limit.
+"""
+
+
+SPARQL_MAX_MEMORY = None
+"""
+The memory in bytes above which queries are stopped, unless they are given
+other :class:`~rdflib.plugins.sparql.sparql.QueryLimits`. None for no limit.
+It only applies where the memory the process uses can be read from /proc,
+as on Linux.
+"""
+
+
 CUSTOM_EVALS = {}
 """
 Custom evaluation functions
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import tempfile
 from decimal import Decimal
 from typing import (
     Any,
     Callable,
     Dict,
+    Generator,
     Iterable,
     List,
     Mapping,
@@ -19,10 +21,22 @@ from typing import (
 
 from rdflib.namespace import XSD
 from rdflib.plugins.sparql.datatypes import type_promotion
-from rdflib.plugins.sparql.evalutils import _eval, _val
+from rdflib.plugins.sparql.evalutils import (
+    _SPILL_MAX_LEVEL,
+    _SPILL_PARTITIONS,
+    _dumpRow,
+    _eval,
+    _loadRows,
+    _val,
+)
 from rdflib.plugins.sparql.operators import numeric
 from rdflib.plugins.sparql.parserutils import CompValue
-from rdflib.plugins.sparql.sparql import FrozenBindings, NotBoundError, SPARQLTypeError
+from rdflib.plugins.sparql.sparql import (
+    FrozenBindings,
+    NotBoundError,
+    QueryContext,
+    SPARQLTypeError,
+)
 from rdflib.term import BNode, Identifier, Literal, URIRef, Variable
 
 """
@@ -313,3 +327,303 @@ class Aggregator:
         for acc in self.accumulators.values():
             acc.set_value(self.bindings)
         return self.bindings
+
+
+class _Aggregate:
+    """
+    An aggregate function for hash aggregation. Unlike an Accumulator, it
+    is shared by all groups and keeps the state of each group in a plain
+    list, so a group costs little more than its values.
+    """
+
+    def __init__(self, aggregation: CompValue):
+        self.var = aggregation.res
+        self.expr = aggregation.vars
+        self.distinct = bool(aggregation.distinct)
+
+    def start(self) -> List[Any]:
+        raise NotImplementedError()
+
+    def update(self, state: List[Any], row: FrozenBindings) -> None:
+        raise NotImplementedError()
+
+    def set_value(
+        self, state: List[Any], bindings: MutableMapping[Variable, Identifier]
+    ) -> None:
+        raise NotImplementedError()
+
+
+class _Count(_Aggregate):
+    # state: [count, seen]
+
+    def start(self) -> List[Any]:
+        return [0, set() if self.distinct else None]
+
+    def update(self, state: List[Any], row: FrozenBindings) -> None:
+        if self.expr == "*":
+            val: Any = row
+        else:
+            try:
+                val = _eval(self.expr, row)
+            except NotBoundError:
+                # skip UNDEF
+                return
+        if self.distinct:
+            if val in state[1]:
+                return
+            state[1].add(val)
+        state[0] += 1
+
+    def set_value(
+        self, state: List[Any], bindings: MutableMapping[Variable, Identifier]
+    ) -> None:
+        bindings[self.var] = Literal(state[0])
+
+
+class _Sum(_Aggregate):
+    # state: [sum, datatype, seen]
+
+    def start(self) -> List[Any]:
+        return [0, None, set() if self.distinct else None]
+
+    def update(self, state: List[Any], row: FrozenBindings) -> None:
+        try:
+            value = _eval(self.expr, row)
+        except NotBoundError:
+            # skip UNDEF
+            return
+        if self.distinct:
+            if value in state[2]:
+                return
+        dt = state[1]
+        if dt is None:
+            dt = value.datatype
+        else:
+            dt = type_promotion(dt, value.datatype)  # type: ignore[arg-type]
+        state[1] = dt
+        state[0] = sum(type_safe_numbers(state[0], numeric(value)))
+        if self.distinct:
+            state[2].add(value)
+
+    def set_value(
+        self, state: List[Any], bindings: MutableMapping[Variable, Identifier]
+    ) -> None:
+        bindings[self.var] = Literal(state[0], datatype=state[1])
+
+
+class _Average(_Aggregate):
+    # state: [sum, count, datatype, seen]
+
+    def start(self) -> List[Any]:
+        return [0, 0, None, set() if self.distinct else None]
+
+    def update(self, state: List[Any], row: FrozenBindings) -> None:
+        try:
+            value = _eval(self.expr, row)
+            if self.distinct and value in state[3]:
+                return
+            state[0] = sum(type_safe_numbers(state[0], numeric(value)))
+            dt = state[2]
+            if dt is None:
+                dt = value.datatype
+            else:
+                dt = type_promotion(dt, value.datatype)  # type: ignore[arg-type]
+            state[2] = dt
+            if self.distinct:
+                state[3].add(value)
+            state[1] += 1
+        # skip UNDEF or BNode => SPARQLTypeError
+        except NotBoundError:
+            pass
+        except SPARQLTypeError:
+            pass
+
+    def set_value(
+        self, state: List[Any], bindings: MutableMapping[Variable, Identifier]
+    ) -> None:
+        total, counter, datatype, _ = state
+        if counter == 0:
+            bindings[self.var] = Literal(0)
+        elif datatype in (XSD.float, XSD.double):
+            bindings[self.var] = Literal(total / counter)
+        else:
+            bindings[self.var] = Literal(Decimal(total) / Decimal(counter))
+
+
+class _Extremum(_Aggregate):
+    # state: [value], DISTINCT does not change the value
+    compare: Callable[[Any, Any], Any]
+
+    def start(self) -> List[Any]:
+        return [None]
+
+    def update(self, state: List[Any], row: FrozenBindings) -> None:
+        try:
+            if state[0] is None:
+                state[0] = _eval(self.expr, row)
+            else:
+                state[0] = self.compare(state[0], _eval(self.expr, row))
+        # skip UNDEF or BNode => SPARQLTypeError
+        except NotBoundError:
+            pass
+        except SPARQLTypeError:
+            pass
+
+    def set_value(
+        self, state: List[Any], bindings: MutableMapping[Variable, Identifier]
+    ) -> None:
+        if state[0] is not None:
+            # simply do not set if the value is still None
+            bindings[self.var] = Literal(state[0])
+
+
+class _Minimum(_Extremum):
+    def compare(self, val1: _ValueT, val2: _ValueT) -> _ValueT:
+        return min(val1, val2, key=_val)
+
+
+class _Maximum(_Extremum):
+    def compare(self, val1: _ValueT, val2: _ValueT) -> _ValueT:
+        return max(val1, val2, key=_val)
+
+
+class _Sample(_Aggregate):
+    # state: [value, found], takes the first eligible value
+
+    def start(self) -> List[Any]:
+        return [None, False]
+
+    def update(self, state: List[Any], row: FrozenBindings) -> None:
+        if state[1]:
+            return
+        try:
+            state[0] = _eval(self.expr, row)
+            state[1] = True
+        except NotBoundError:
+            pass
+
+    def set_value(
+        self, state: List[Any], bindings: MutableMapping[Variable, Identifier]
+    ) -> None:
+        # None if no value was found
+        bindings[self.var] = state[0]
+
+
+class _GroupConcat(_Aggregate):
+    # state: [values, seen]
+
+    def __init__(self, aggregation: CompValue):
+        super(_GroupConcat, self).__init__(aggregation)
+        if aggregation.separator is None:
+            self.separator = " "
+        else:
+            self.separator = aggregation.separator
+
+    def start(self) -> List[Any]:
+        return [[], set() if self.distinct else None]
+
+    def update(self, state: List[Any], row: FrozenBindings) -> None:
+        try:
+            value = _eval(self.expr, row)
+        except NotBoundError:
+            return
+        # skip UNDEF
+        if isinstance(value, NotBoundError):
+            return
+        if self.distinct:
+            if value in state[1]:
+                return
+            state[1].add(value)
+        state[0].append(value)
+
+    def set_value(
+        self, state: List[Any], bindings: MutableMapping[Variable, Identifier]
+    ) -> None:
+        bindings[self.var] = Literal(self.separator.join(str(v) for v in state[0]))
+
+
+_aggregate_classes = {
+    "Aggregate_Count": _Count,
+    "Aggregate_Sample": _Sample,
+    "Aggregate_Sum": _Sum,
+    "Aggregate_Avg": _Average,
+    "Aggregate_Min": _Minimum,
+    "Aggregate_Max": _Maximum,
+    "Aggregate_GroupConcat": _GroupConcat,
+}
+
+
+def _aggregates(aggregations: List[CompValue]) -> List[_Aggregate]:
+    res = []
+    for a in aggregations:
+        aggregate_class = _aggregate_classes.get(a.name)
+        if aggregate_class is None:
+            raise Exception("Unknown aggregate function " + a.name)
+        res.append(aggregate_class(a))
+    return res
+
+
+def _hashAggregate(
+    ctx: QueryContext,
+    rows: Iterable[FrozenBindings],
+    group_expr: Optional[List[Any]],
+    aggregations: List[CompValue],
+    limit: Optional[int] = None,
+    level: int = 0,
+) -> Generator[FrozenBindings, None, None]:
+    """
+    Group rows by the values of group_expr and aggregate each group in one
+    pass, yielding one solution per group.
+
+    At most limit groups are kept in memory. The rows of further groups are
+    spilled to temporary files, partitioned by hash of their group key, and
+    aggregated per partition once all rows are read.
+    """
+    aggregates = _aggregates(aggregations)
+    groups: Dict[Any, List[List[Any]]] = {}
+    partitions: Optional[List[Any]] = None
+
+    try:
+        if group_expr is None:
+            # no grouping, all rows are one group
+            state = groups[True] = [a.start() for a in aggregates]
+            for row in rows:
+                for a, s in zip(aggregates, state):
+                    a.update(s, row)
+        else:
+            spill = limit is not None and level < _SPILL_MAX_LEVEL
+            for row in rows:
+                k = tuple(_eval(e, row, False) for e in group_expr)
+                state = groups.get(k)  # type: ignore[assignment]
+                if state is None:
+                    if spill and len(groups) >= limit:  # type: ignore[operator]
+                        if partitions is None:
+                            partitions = [
+                                tempfile.TemporaryFile()
+                                for _ in range(_SPILL_PARTITIONS)
+                            ]
+                        _dumpRow(row, partitions[hash((level, k)) % _SPILL_PARTITIONS])
+                        continue
+                    state = groups[k] = [a.start() for a in aggregates]
+                for a, s in zip(aggregates, state):
+                    a.update(s, row)
+
+        # all rows are done; yield aggregated values
+        for state in groups.values():
+            bindings: Dict[Variable, Identifier] = {}
+            for a, s in zip(aggregates, state):
+                a.set_value(s, bindings)
+            yield FrozenBindings(ctx, bindings)
+        groups.clear()
+
+        if partitions is not None:
+            for f in partitions:
+                f.seek(0)
+                yield from _hashAggregate(
+                    ctx, _loadRows(f, ctx), group_expr, aggregations, limit, level + 1
+                )
+                f.close()
+    finally:
+        if partitions is not None:
+            for f in partitions:
+                f.close()
@@ -36,10 +36,10 @@ from rdflib.paths import (
     Path,
     SequencePath,
 )
-from rdflib.plugins.sparql.operators import TrueFilter, and_
+from rdflib.plugins.sparql.operators import TrueFilter, and_, precompilePatterns
 from rdflib.plugins.sparql.operators import simplify as simplifyFilters
 from rdflib.plugins.sparql.parserutils import CompValue, Expr
-from rdflib.plugins.sparql.sparql import Prologue, Query, Update
+from rdflib.plugins.sparql.sparql import Prologue, Query, SolutionSlots, Update
 
 # ---------------------------
 # Some convenience methods
@@ -548,6 +548,25 @@ def _addVars(x, children: List[Set[Variable]]) -> Set[Variable]:
     return reduce(operator.or_, children, set())
 
 
+def _findServices(x: Any, children: List[bool]) -> bool:
+    """
+    find whether this part of the query calls a SERVICE
+    """
+    return any(children) or (
+        isinstance(x, CompValue) and x.name == "ServiceGraphPattern"
+    )
+
+
+def _addServices(x: Any, children: List[bool]) -> bool:
+    """
+    mark the parts of the query calling a SERVICE, as _service
+    """
+    found = _findServices(x, children)
+    if isinstance(x, CompValue):
+        x["_service"] = found
+    return found
+
+
 # type error: Missing return statement
 def _sample(e: typing.Union[CompValue, List[Expr], Expr, List[str], Variable], v: Optional[Variable] = None) -> Optional[CompValue]:  # type: ignore[return]
     """
@@ -810,6 +829,156 @@ def analyse(n: Any, children: Any) -> bool:
         return True
 
 
+def _conjuncts(expr: Any) -> List[Any]:
+    if isinstance(expr, CompValue) and expr.name == "ConditionalAndExpression":
+        return [c for e in [expr.expr] + list(expr.other) for c in _conjuncts(e)]
+    return [expr]
+
+
+def _exprVars(expr: Any) -> Optional[Set[Variable]]:
+    """
+    The variables an expression uses, or None if its value may depend on
+    more than those (EXISTS and NOT EXISTS)
+    """
+    res: Set[Variable] = set()
+
+    def _collect(e: Any) -> bool:
+        if isinstance(e, Variable):
+            res.add(e)
+        elif isinstance(e, CompValue):
+            if e.name in ("Builtin_EXISTS", "Builtin_NOTEXISTS"):
+                return False
+            return all(_collect(v) for v in e.values())
+        elif isinstance(e, (list, tuple)):
+            return all(_collect(v) for v in e)
+        return True
+
+    return res if _collect(expr) else None
+
+
+def _certainVars(n: CompValue) -> Set[Variable]:
+    """
+    The variables bound in every solution of a graph pattern
+    """
+    if n.name == "BGP":
+        return set(x for t in n.triples for x in t if isinstance(x, Variable))
+    elif n.name == "Join":
+        return _certainVars(n.p1) | _certainVars(n.p2)
+    elif n.name in ("LeftJoin", "Minus"):
+        return _certainVars(n.p1)
+    elif n.name in ("Filter", "Extend"):
+        return _certainVars(n.p)
+    elif n.name == "Union":
+        return _certainVars(n.p1) & _certainVars(n.p2)
+    elif n.name == "Graph":
+        res = _certainVars(n.p)
+        if isinstance(n.term, Variable):
+            res.add(n.term)
+        return res
+    # subqueries, VALUES, SERVICE, ...
+    return set()
+
+
+def _constantBinding(expr: Any) -> Optional[Tuple[Variable, Identifier]]:
+    """
+    The variable and term of ?x = <iri> or sameTerm(?x, term), which only
+    hold if ?x is bound to exactly that term
+    """
+    if not isinstance(expr, CompValue):
+        return None
+    if expr.name == "RelationalExpression" and expr.op == "=":
+        a, b, constant = expr.expr, expr.other, URIRef
+    elif expr.name == "Builtin_sameTerm":
+        a, b, constant = expr.arg1, expr.arg2, (URIRef, Literal)
+    else:
+        return None
+    if isinstance(b, Variable):
+        a, b = b, a
+    if isinstance(a, Variable) and isinstance(b, constant):
+        return a, b
+    return None
+
+
+def _pushFilter(expr: Any, vars: Set[Variable], n: CompValue) -> Optional[CompValue]:
+    """
+    Push a filter expression, using only vars, into graph pattern n. Returns
+    the new graph pattern, or None if the filter cannot go further down.
+    """
+    if n.name == "BGP":
+        binding = _constantBinding(expr)
+        if binding is not None:
+            # bind the variable before the triple patterns are matched
+            join = Join(ToMultiSet(Values([dict([binding])])), n)
+            join["lazy"] = True
+            return join
+        return Filter(expr, n)
+
+    def _into(p: CompValue) -> Optional[CompValue]:
+        if not vars <= _certainVars(p):
+            return None
+        return _pushFilter(expr, vars, p) or Filter(expr, p)
+
+    if n.name == "Join":
+        p1 = _into(n.p1)
+        if p1 is not None:
+            n["p1"] = p1
+            return n
+        # the second part of a lazy join is evaluated once per solution of
+        # the first, so a filter there does not save any lookups
+        p2 = None if n.lazy else _into(n.p2)
+        if p2 is not None:
+            n["p2"] = p2
+            return n
+    elif n.name in ("LeftJoin", "Minus"):
+        p1 = _into(n.p1)
+        if p1 is not None:
+            n["p1"] = p1
+            return n
+    elif n.name == "Union":
+        if vars <= _certainVars(n):
+            n["p1"] = _into(n.p1)
+            n["p2"] = _into(n.p2)
+            return n
+    elif (n.name == "Filter" and not n.no_isolated_scope) or n.name in (
+        "Extend",
+        "Graph",
+    ):
+        p = _into(n.p)
+        if p is not None:
+            n["p"] = p
+            return n
+    return None
+
+
+def pushDownFilters(n: Any) -> Optional[CompValue]:
+    """
+    Move each condition of a FILTER down to the deepest graph pattern that
+    binds all its variables, and turn ?x = <iri> into a binding of ?x for
+    the BGP it filters, so the store is only asked for matching triples.
+    """
+    if not (isinstance(n, CompValue) and n.name == "Filter") or n.no_isolated_scope:
+        return None
+    if not isinstance(n.p, CompValue):
+        # a FILTER in a SERVICE pattern, which is not translated
+        return None
+
+    remaining = []
+    p = n.p
+    for expr in _conjuncts(n.expr):
+        vars = _exprVars(expr)
+        pushed = None
+        if vars is not None and vars <= _certainVars(p):
+            pushed = _pushFilter(expr, vars, p)
+        if pushed is None:
+            remaining.append(expr)
+        else:
+            p = pushed
+
+    if not remaining:
+        return p
+    return Filter(and_(*remaining), p)
+
+
 def translatePrologue(
     p: ParseResults,
     base: Optional[str],
@@ -904,13 +1073,62 @@ def translateUpdate(
         u = _traverse(u, _simplifyFilters)
 
         u = traverse(u, visitPost=translatePath)
+        u = traverse(u, visitPost=precompilePatterns)
 
         res.append(translateUpdate1(u, prologue))
 
+    # updates are evaluated without slots
+    _compileExpressions(res, None)
+
     # type error: Argument 1 to "Update" has incompatible type "Optional[Any]"; expected "Prologue"
     return Update(prologue, res)  # type: ignore[arg-type]
 
 
+def _solutionSlots(algebra: CompValue) -> SolutionSlots:
+    """
+    Assign a slot to each variable (and blank node, which are variables in
+    graph patterns) used in the algebra, in the order they are found
+    """
+    found: Dict[Identifier, None] = {}
+
+    def _collect(x: Any, children: Any) -> None:
+        if isinstance(x, (Variable, BNode)):
+            found[x] = None
+        elif type(x) is dict:
+            # the solutions in VALUES
+            for k in x:
+                if isinstance(k, Variable):
+                    found[k] = None
+
+    _traverseAgg(algebra, _collect)
+    return SolutionSlots(found)
+
+
+def _compileExpressions(e: Any, slots: Optional[SolutionSlots]) -> None:
+    """
+    Compile the expressions in the algebra once, for the variables of the
+    query's slots, instead of when they are first evaluated
+    """
+    seen: Set[int] = set()
+
+    def _compile(x: Any) -> None:
+        if isinstance(x, (list, ParseResults, tuple)):
+            for y in x:
+                _compile(y)
+        elif isinstance(x, CompValue) and id(x) not in seen:
+            seen.add(id(x))
+            for y in x.values():
+                _compile(y)
+            # and the patterns of EXISTS, set as attributes
+            for y in x.__dict__.values():
+                if isinstance(y, CompValue):
+                    _compile(y)
+            if isinstance(x, Expr):
+                x.compile(slots)
+
+    _compile(e)
+
+
 def translateQuery(
     q: ParseResults,
     base: Optional[str] = None,
@@ -942,9 +1160,15 @@ def translateQuery(
 
     res = traverse(res, visitPost=simplify)
     _traverseAgg(res, visitor=analyse)
+    res = traverse(res, visitPost=pushDownFilters)
+    res = traverse(res, visitPost=precompilePatterns)
     _traverseAgg(res, _addVars)
+    _traverseAgg(res, _addServices)
 
-    return Query(prologue, res)
+    query = Query(prologue, res)
+    query.slots = _solutionSlots(res)
+    _compileExpressions(res, query.slots)
+    return query
 
 
 class ExpressionNotCoveredException(Exception):  # noqa: N818
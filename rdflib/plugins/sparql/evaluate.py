@@ -16,20 +16,23 @@ also return a dict of list of dicts
 
 """
 
+import codecs
 import collections
+import heapq
 import itertools
 import json as j
 import re
 from typing import (
     TYPE_CHECKING,
     Any,
-    Deque,
+    Callable,
     Dict,
     Generator,
     Iterable,
     List,
     Mapping,
     Optional,
+    Set,
     Tuple,
     Union,
 )
@@ -38,17 +41,24 @@ from urllib.request import Request, urlopen
 
 from pyparsing import ParseException
 
+import rdflib.plugins.sparql
 from rdflib.graph import Graph
+from rdflib.paths import Path, _checked_paths
 from rdflib.plugins.sparql import CUSTOM_EVALS, parser
-from rdflib.plugins.sparql.aggregates import Aggregator
+from rdflib.plugins.sparql.aggregates import _hashAggregate
+from rdflib.plugins.sparql.algebra import _findServices, _traverseAgg
 from rdflib.plugins.sparql.evalutils import (
+    _distinct,
     _ebv,
     _eval,
     _fillTemplate,
+    _hashJoin,
     _join,
     _minus,
+    _Prefetch,
     _val,
 )
+from rdflib.plugins.sparql.explain import QueryProfile
 from rdflib.plugins.sparql.parserutils import CompValue, value
 from rdflib.plugins.sparql.sparql import (
     AlreadyBound,
@@ -56,61 +66,248 @@ from rdflib.plugins.sparql.sparql import (
     FrozenDict,
     Query,
     QueryContext,
+    QueryLimits,
+    SlotBindings,
     SPARQLError,
 )
 from rdflib.term import BNode, Identifier, Literal, URIRef, Variable
 
-if TYPE_CHECKING:
-    from rdflib.paths import Path
-
 _Triple = Tuple[Identifier, Identifier, Identifier]
 
 
+# number of partial solutions evalBGP passes between triple patterns at once
+_BGP_BATCH_SIZE = 1000
+
+_BGPRow = Tuple[Optional[Identifier], ...]
+
+
+def _evalTriplePatternBatched(
+    graph: Graph,
+    triple: _Triple,
+    slots: Mapping[Identifier, int],
+    batches: Iterable[List[_BGPRow]],
+    limits: Optional[QueryLimits] = None,
+    profile: Optional[QueryProfile] = None,
+) -> Generator[List[_BGPRow], None, None]:
+    """
+    Extend each batch of partial solutions with the matches of one triple
+    pattern.
+
+    A partial solution is a tuple with the value (or None) of each variable
+    of the BGP at its slot. Within a batch, solutions are grouped by the
+    lookup they need, so each distinct lookup goes to the store once.
+    The limits, if any, are checked for each match, and the lookups are
+    counted in the profile, if any.
+    """
+    out: List[_BGPRow] = []
+    for batch in batches:
+        lookups: Dict[Tuple[Any, Any, Any], List[_BGPRow]] = {}
+        for row in batch:
+            key = tuple(
+                row[slots[n]] if n in slots else n for n in triple  # type: ignore[index]
+            )
+            try:
+                lookups[key].append(row)
+            except KeyError:
+                lookups[key] = [row]
+
+        for key, rows in lookups.items():
+            # the unbound positions of the pattern and the slots they bind
+            fill = [(i, slots[n]) for i, n in enumerate(triple) if key[i] is None]
+            # type error: Argument 1 to "triples" of "Graph" has incompatible type "Tuple[Any, Any, Any]"
+            matches = graph.triples(key)  # type: ignore[arg-type]
+            if profile is not None:
+                profile.countTriples()
+            if limits is not None and isinstance(key[1], Path):
+                matches = _checked_paths(matches, limits.check)
+            for match in matches:
+                if limits is not None:
+                    limits.check(steps=len(rows))
+                for row in rows:
+                    new = list(row)
+                    for i, slot in fill:
+                        v = new[slot]
+                        if v is None:
+                            new[slot] = match[i]
+                        elif v != match[i]:
+                            # the same variable occurs twice in the pattern
+                            break
+                    else:
+                        out.append(tuple(new))
+                        if len(out) >= _BGP_BATCH_SIZE:
+                            if limits is not None:
+                                limits.check(len(out))
+                            yield out
+                            out = []
+    if out:
+        if limits is not None:
+            limits.check(len(out))
+        yield out
+
+
 def evalBGP(
     ctx: QueryContext, bgp: List[_Triple]
 ) -> Generator[FrozenBindings, None, None]:
     """
     A basic graph pattern
+
+    The triple patterns are evaluated in order, passing batches of partial
+    solutions from one pattern to the next (see _evalTriplePatternBatched).
+    Solutions are only turned into FrozenBindings once they match the whole
+    BGP.
     """
 
     if not bgp:
         yield ctx.solution()
         return
 
-    s, p, o = bgp[0]
-
-    _s = ctx[s]
-    _p = ctx[p]
-    _o = ctx[o]
-
-    # type error: Item "None" of "Optional[Graph]" has no attribute "triples"
-    # type Argument 1 to "triples" of "Graph" has incompatible type "Tuple[Union[str, Path, None], Union[str, Path, None], Union[str, Path, None]]"; expected "Tuple[Optional[Node], Optional[Node], Optional[Node]]"
-    for ss, sp, so in ctx.graph.triples((_s, _p, _o)):  # type: ignore[union-attr, arg-type]
-        if None in (_s, _p, _o):
-            c = ctx.push()
-        else:
-            c = ctx
+    if ctx.slots is not None and all(
+        n in ctx.slots.index
+        for triple in bgp
+        for n in triple
+        if isinstance(n, (Variable, BNode))
+    ):
+        # the partial solutions can use the slots of the query directly
+        yield from _evalBGPSlots(ctx, bgp)
+        return
 
-        if _s is None:
-            # type error: Incompatible types in assignment (expression has type "Union[Node, Any]", target has type "Identifier")
-            c[s] = ss  # type: ignore[assignment]
+    variables: List[Identifier] = []
+    slots: Dict[Identifier, int] = {}
+    for triple in bgp:
+        for n in triple:
+            if isinstance(n, (Variable, BNode)) and n not in slots:
+                slots[n] = len(variables)
+                variables.append(n)
+
+    start: _BGPRow = tuple(ctx[v] for v in variables)  # type: ignore[misc]
+    batches: Iterable[List[_BGPRow]] = [[start]]
+    for triple in bgp:
+        # type error: Argument 1 to "_evalTriplePatternBatched" has incompatible type "Optional[Graph]"; expected "Graph"
+        batches = _evalTriplePatternBatched(ctx.graph, triple, slots, batches, ctx.limits, ctx.profile)  # type: ignore[arg-type]
+
+    # all solutions share one context, which is not ctx itself
+    c = ctx.push()
+    bound = dict(ctx.bindings.items())
+    for batch in batches:
+        for row in batch:
+            d = bound.copy()
+            d.update(zip(variables, row))
+            yield FrozenBindings(c, d)
+
+
+def _evalBGPSlots(
+    ctx: QueryContext, bgp: List[_Triple]
+) -> Generator[SlotBindings, None, None]:
+    """
+    evalBGP for queries with SolutionSlots, where the partial solutions are
+    the slot values of the resulting SlotBindings
+    """
+    solution = ctx.solution()
+    if TYPE_CHECKING:
+        assert isinstance(solution, SlotBindings) and ctx.slots is not None
+    batches: Iterable[List[_BGPRow]] = [[solution._v]]
+    for triple in bgp:
+        # type error: Argument 1 to "_evalTriplePatternBatched" has incompatible type "Optional[Graph]"; expected "Graph"
+        batches = _evalTriplePatternBatched(ctx.graph, triple, ctx.slots.index, batches, ctx.limits, ctx.profile)  # type: ignore[arg-type]
+
+    # all solutions share one context, which is not ctx itself
+    c = ctx.push()
+    for batch in batches:
+        for row in batch:
+            yield SlotBindings._make(c, row, solution._d)
+
+
+# assumed number of matches for a pattern with an unbound predicate (or a
+# property path) where the subject or object is known
+_UNKNOWN_PREDICATE_FANOUT = 10
+
+
+def _estimateTriple(
+    ctx: QueryContext,
+    triple: _Triple,
+    known: Set[Identifier],
+    stats: Dict[Identifier, Optional[Tuple[int, int, int]]],
+) -> float:
+    """
+    Estimate how many matches a triple pattern will have for each solution
+    it is evaluated with, if the variables in known are bound by then.
+    """
+    s, p, o = triple
+    s_known = ctx[s] is not None or s in known
+    o_known = ctx[o] is not None or o in known
 
-        try:
-            if _p is None:
-                # type error: Incompatible types in assignment (expression has type "Union[Node, Any]", target has type "Identifier")
-                c[p] = sp  # type: ignore[assignment]
-        except AlreadyBound:
-            continue
+    _p = ctx[p]
+    if _p is None or p in known or not isinstance(_p, Identifier):
+        # no statistics for unbound predicates or paths
+        if s_known or o_known:
+            return _UNKNOWN_PREDICATE_FANOUT
+        return float("inf")
+
+    if _p not in stats:
+        # type error: Item "None" of "Optional[Graph]" has no attribute "store"
+        stats[_p] = ctx.graph.store.predicate_statistics(_p)  # type: ignore[union-attr]
+    pstats = stats[_p]
+    if pstats is None:
+        return float("inf")
+
+    triples, subjects, objects = pstats
+    if not triples:
+        return 0
+    estimate: float = triples
+    if s_known:
+        estimate = min(estimate, triples / subjects)
+    if o_known:
+        estimate = min(estimate, triples / objects)
+    if s_known and o_known:
+        estimate = min(estimate, 1)
+    return estimate
+
+
+def _reorderTriplesByStatistics(
+    ctx: QueryContext, triples: List[_Triple]
+) -> Optional[List[_Triple]]:
+    """
+    Order triple patterns greedily, each time picking the pattern with the
+    fewest estimated matches given the variables bound by the patterns
+    before it. The estimates come from the predicate statistics of the store,
+    returns None if the store has none.
+    """
+    if len(triples) < 2 or ctx.graph is None:
+        return None
+
+    stats: Dict[Identifier, Optional[Tuple[int, int, int]]] = {}
+    # check that the store has statistics at all
+    probe = next(
+        (
+            ctx[t[1]]
+            for t in triples
+            if isinstance(ctx[t[1]], Identifier)
+            and not isinstance(ctx[t[1]], (Variable, BNode))
+        ),
+        None,
+    )
+    if probe is None:
+        return None
+    stats[probe] = ctx.graph.store.predicate_statistics(probe)  # type: ignore[arg-type]
+    if stats[probe] is None:
+        return None
+
+    remaining = list(triples)
+    known: Set[Identifier] = set()
+    ordered: List[_Triple] = []
+    while remaining:
+        best = min(
+            remaining,
+            key=lambda t: (
+                _estimateTriple(ctx, t, known, stats),
+                len([n for n in t if ctx[n] is None and n not in known]),
+            ),
+        )
+        remaining.remove(best)
+        ordered.append(best)
+        known.update(n for n in best if isinstance(n, (Variable, BNode)))
 
-        try:
-            if _o is None:
-                # type error: Incompatible types in assignment (expression has type "Union[Node, Any]", target has type "Identifier")
-                c[o] = so  # type: ignore[assignment]
-        except AlreadyBound:
-            continue
-
-        for x in evalBGP(c, bgp[1:]):
-            yield x
+    return ordered
 
 
 def evalExtend(
@@ -118,13 +315,16 @@ def evalExtend(
 ) -> Generator[FrozenBindings, None, None]:
     # TODO: Deal with dict returned from evalPart from GROUP BY
 
+    expr = extend.expr
+    var = extend.var
+    _vars = extend._vars
     for c in evalPart(ctx, extend.p):
         try:
-            e = _eval(extend.expr, c.forget(ctx, _except=extend._vars))
+            e = _eval(expr, c.forget(ctx, _except=_vars))
             if isinstance(e, SPARQLError):
                 raise e
 
-            yield c.merge({extend.var: e})
+            yield c.merge({var: e})
 
         except SPARQLError:
             yield c
@@ -139,7 +339,10 @@ def evalLazyJoin(
     essentially doing the join implicitly
     hopefully evaluating much fewer triples
     """
+    limits = ctx.limits
     for a in evalPart(ctx, join.p1):
+        if limits is not None:
+            limits.check()
         c = ctx.thaw(a)
         for b in evalPart(c, join.p2):
             yield b.merge(a)  # merge, as some bindings may have been forgotten
@@ -150,33 +353,97 @@ def evalJoin(ctx: QueryContext, join: CompValue) -> Generator[FrozenDict, None,
     # only ever for join.p1
 
     if join.lazy:
+        if join.p2.name == "ServiceGraphPattern":
+            return evalServiceJoin(ctx, join)
         return evalLazyJoin(ctx, join)
     else:
-        a = evalPart(ctx, join.p1)
+        # only a side calling a SERVICE is evaluated in another thread
+        a = _prefetch(ctx, join.p1, _hasService(join.p1)) or evalPart(ctx, join.p1)
         b = set(evalPart(ctx, join.p2))
-        return _join(a, b)
+        # hash on the variables both sides may bind; parts without
+        # _vars information fall back to the nested loop join
+        keys = (join.p1._vars or set()) & (join.p2._vars or set())
+        return _checkRows(ctx.limits, _hashJoin(a, b, keys))
+
+
+def _checkRows(
+    limits: Optional[QueryLimits], rows: Iterable[FrozenDict]
+) -> Iterable[FrozenDict]:
+    """
+    Count rows as the intermediate solutions they are, against the limits
+    """
+    if limits is None:
+        return rows
+    return _checkedRows(limits, rows)
+
+
+def _checkedRows(
+    limits: QueryLimits, rows: Iterable[FrozenDict]
+) -> Generator[FrozenDict, None, None]:
+    for row in rows:
+        limits.check(1)
+        yield row
+
 
+def evalUnion(
+    ctx: QueryContext, union: CompValue
+) -> Generator[FrozenBindings, None, None]:
+    # the second branch is only evaluated once the first one is exhausted,
+    # so a LIMIT or ASK above may not need to evaluate it at all, unless
+    # it calls a SERVICE and can be evaluated while the first one is
+    p2 = _prefetch(ctx, union.p2, _hasService(union.p2))
+    try:
+        yield from evalPart(ctx, union.p1)
+        yield from p2 or evalPart(ctx, union.p2)
+    finally:
+        if p2 is not None:
+            p2.close()
+
+
+def _hasService(part: CompValue) -> bool:
+    """
+    Whether evaluating part may call a SERVICE, as found when the query was
+    translated
+    """
+    found = part._service
+    if found is None:
+        # not translated by translateQuery, e.g. the WHERE of an update
+        found = _traverseAgg(part, _findServices)
+    return found
 
-def evalUnion(ctx: QueryContext, union: CompValue) -> Iterable[FrozenBindings]:
-    branch1_branch2 = []
-    for x in evalPart(ctx, union.p1):
-        branch1_branch2.append(x)
-    for x in evalPart(ctx, union.p2):
-        branch1_branch2.append(x)
-    return branch1_branch2
+
+def _prefetch(
+    ctx: QueryContext, part: CompValue, concurrently: bool
+) -> Optional[_Prefetch]:
+    """
+    Start evaluating part on SPARQL_EXECUTOR, if it is set and concurrently
+    is, while its solutions are not asked for yet
+    """
+    executor = rdflib.plugins.sparql.SPARQL_EXECUTOR
+    if executor is None or not concurrently or _Prefetch.prefetching():
+        return None
+    return _Prefetch(
+        executor,
+        lambda: evalPart(ctx, part),
+        rdflib.plugins.sparql.SPARQL_PREFETCH_ROWS,
+    )
 
 
 def evalMinus(ctx: QueryContext, minus: CompValue) -> Generator[FrozenDict, None, None]:
     a = evalPart(ctx, minus.p1)
-    b = set(evalPart(ctx, minus.p2))
-    return _minus(a, b)
+    b = evalPart(ctx, minus.p2)
+    keys = (minus.p1._vars or set()) & (minus.p2._vars or set())
+    return _minus(a, b, keys)
 
 
 def evalLeftJoin(
     ctx: QueryContext, join: CompValue
 ) -> Generator[FrozenBindings, None, None]:
     # import pdb; pdb.set_trace()
+    limits = ctx.limits
     for a in evalPart(ctx, join.p1):
+        if limits is not None:
+            limits.check()
         ok = False
         c = ctx.thaw(a)
         for b in evalPart(c, join.p2):
@@ -201,11 +468,11 @@ def evalFilter(
     ctx: QueryContext, part: CompValue
 ) -> Generator[FrozenBindings, None, None]:
     # TODO: Deal with dict returned from evalPart!
+    expr = part.expr
+    isolated = not part.no_isolated_scope
+    _vars = part._vars
     for c in evalPart(ctx, part.p):
-        if _ebv(
-            part.expr,
-            c.forget(ctx, _except=part._vars) if not part.no_isolated_scope else c,
-        ):
+        if _ebv(expr, c.forget(ctx, _except=_vars) if isolated else c):
             yield c
 
 
@@ -231,7 +498,9 @@ def evalGraph(
             c = c.push()
             graphSolution = [{part.term: graph.identifier}]
             for x in _join(evalPart(c, part.p), graphSolution):
-                x.ctx.graph = prev_graph
+                # solutions may share their context, so replace it rather
+                # than resetting its graph
+                x.ctx = ctx
                 yield x
 
     else:
@@ -240,7 +509,7 @@ def evalGraph(
         # type error: Argument 1 to "get_context" of "ConjunctiveGraph" has incompatible type "Union[str, Path]"; expected "Union[Node, str, None]"
         c = ctx.pushGraph(ctx.dataset.get_context(graph))  # type: ignore[arg-type]
         for x in evalPart(c, part.p):
-            x.ctx.graph = prev_graph
+            x.ctx = ctx
             yield x
 
 
@@ -267,6 +536,12 @@ def evalMultiset(ctx: QueryContext, part: CompValue):
 
 
 def evalPart(ctx: QueryContext, part: CompValue) -> Any:
+    if ctx.profile is not None:
+        return ctx.profile.evaluate(ctx, part, _evalPart)
+    return _evalPart(ctx, part)
+
+
+def _evalPart(ctx: QueryContext, part: CompValue) -> Any:
     # try custom evaluation functions
     for name, c in CUSTOM_EVALS.items():
         try:
@@ -275,11 +550,14 @@ def evalPart(ctx: QueryContext, part: CompValue) -> Any:
             pass  # the given custome-function did not handle this part
 
     if part.name == "BGP":
-        # Reorder triples patterns by number of bound nodes in the current ctx
+        # Reorder triples patterns using the store's statistics if it has any,
+        # otherwise by number of bound nodes in the current ctx
         # Do patterns with more bound nodes first
-        triples = sorted(
-            part.triples, key=lambda t: len([n for n in t if ctx[n] is None])
-        )
+        triples = _reorderTriplesByStatistics(ctx, part.triples)
+        if triples is None:
+            triples = sorted(
+                part.triples, key=lambda t: len([n for n in t if ctx[n] is None])
+            )
 
         return evalBGP(ctx, triples)
     elif part.name == "Filter":
@@ -333,82 +611,274 @@ def evalPart(ctx: QueryContext, part: CompValue) -> Any:
 
 
 def evalServiceQuery(ctx: QueryContext, part: CompValue):
-    res = {}
+    for i, bound in _evalServiceBlock(ctx, part, [ctx.solution()]):
+        yield bound
+
+
+def evalServiceJoin(
+    ctx: QueryContext, join: CompValue
+) -> Generator[FrozenBindings, None, None]:
+    """
+    A lazy join with a SERVICE as its second part: the solutions of the
+    first part are sent to the endpoint in blocks, as the rows of a VALUES
+    clause, instead of one request per solution
+    """
+    size = rdflib.plugins.sparql.SPARQL_SERVICE_BATCH_SIZE
+    # the next blocks are evaluated while the endpoint answers
+    prefetched = _prefetch(ctx, join.p1, True)
+    solutions = prefetched or evalPart(ctx, join.p1)
+    try:
+        while True:
+            block = list(itertools.islice(solutions, size))
+            if not block:
+                return
+            if ctx.limits is not None:
+                # each request may take a while
+                ctx.limits.checkNow(memory=False)
+            for i, b in _evalServiceBlock(ctx, join.p2, block):
+                if i is None:
+                    # the result does not depend on the solutions
+                    for a in block:
+                        if b.compatible(a):
+                            yield b.merge(a)
+                else:
+                    yield b.merge(block[i])
+    finally:
+        if prefetched is not None:
+            prefetched.close()
+
+
+# the variable numbering the rows of the VALUES clause sent to a SERVICE, so
+# each result can be joined with the solution it belongs to
+_SERVICE_ROW = Variable("__rdflib_service_row")
+
+
+def _evalServiceBlock(
+    ctx: QueryContext, part: CompValue, solutions: List[FrozenBindings]
+) -> Generator[Tuple[Optional[int], FrozenBindings], None, None]:
+    """
+    Evaluate a SERVICE for a block of solutions, yields the index of the
+    solution each result belongs to (None for all of them) with the result
+    """
+    service = _serviceQuery(ctx, part)
+    if service is None:
+        return
+    service_url, prologue, service_query = service
+
+    # only the variables the service pattern uses are sent
+    variables = [
+        v
+        for v in part._vars or ()
+        if isinstance(v, Variable) and any(a.get(v) is not None for a in solutions)
+    ]
+    if not variables:
+        if prologue is not None:
+            service_query = prologue + "SELECT REDUCED * WHERE {" + service_query + "}"
+        for r in _serviceCall(service_url, service_query):
+            for bound in _yieldBindingsFromServiceCallResult(ctx, r, list(r)):
+                yield None, bound
+        return
+
+    if prologue is None:
+        # the projection of the service query is not known, so the rows
+        # cannot be told apart, and each solution gets its own request
+        for i, a in enumerate(solutions):
+            query = service_query + _valuesClause(variables, [a])
+            for r in _serviceCall(service_url, query):
+                for bound in _yieldBindingsFromServiceCallResult(ctx, r, list(r)):
+                    yield i, bound
+        return
+
+    query = (
+        prologue
+        + "SELECT REDUCED "
+        + " ".join(v.n3() for v in itertools.chain([_SERVICE_ROW], part._vars))
+        + " WHERE {"
+        + service_query
+        + "}"
+        + _valuesClause(
+            [_SERVICE_ROW] + variables,
+            [a.merge({_SERVICE_ROW: Literal(i)}) for i, a in enumerate(solutions)],
+        )
+    )
+    row = str(_SERVICE_ROW)
+    for r in _serviceCall(service_url, query):
+        i = r.pop(row, None)
+        if i is not None:
+            for bound in _yieldBindingsFromServiceCallResult(ctx, r, list(r)):
+                yield int(i["value"]), bound
+
+
+def _serviceQuery(
+    ctx: QueryContext, part: CompValue
+) -> Optional[Tuple[str, Optional[str], str]]:
+    """
+    The endpoint of a SERVICE and its query. A pattern that is not a query
+    is returned with the prologue for the SELECT that has to wrap it, and
+    a query with None.
+    """
     match = re.match(
         "^service <(.*)>[ \n]*{(.*)}[ \n]*$",
         # type error: Argument 2 to "get" of "CompValue" has incompatible type "str"; expected "bool"  [arg-type]
         part.get("service_string", ""),  # type: ignore[arg-type]
         re.DOTALL | re.I,
     )
-
-    if match:
-        service_url = match.group(1)
-        service_query = _buildQueryStringForServiceCall(ctx, match.group(2))
-
-        query_settings = {"query": service_query, "output": "json"}
-        headers = {
-            "accept": "application/sparql-results+json",
-            "user-agent": "rdflibForAnUser",
-        }
-        # GET is easier to cache so prefer that if the query is not to long
-        if len(service_query) < 600:
-            response = urlopen(
-                Request(service_url + "?" + urlencode(query_settings), headers=headers)
-            )
-        else:
-            response = urlopen(
-                Request(
-                    service_url,
-                    data=urlencode(query_settings).encode(),
-                    headers=headers,
-                )
+    if not match:
+        return None
+    service_query = match.group(2)
+    try:
+        parser.parseQuery(service_query)
+        return match.group(1), None, service_query
+    except ParseException:
+        pass
+    # This could be because we don't have a select around the service call.
+    prologue = ""
+    # type error: Item "None" of "Optional[Prologue]" has no attribute "namespace_manager"
+    for p in ctx.prologue.namespace_manager.store.namespaces():  # type: ignore[union-attr]
+        prologue = "PREFIX " + p[0] + ":" + p[1].n3() + " " + prologue
+    # re add the base if one was defined
+    # type error: Item "None" of "Optional[Prologue]" has no attribute "base"
+    base = ctx.prologue.base  # type: ignore[union-attr]
+    if base is not None and len(base) > 0:
+        prologue = "BASE <" + base + "> " + prologue
+    return match.group(1), prologue, service_query
+
+
+def _valuesClause(variables: List[Variable], solutions: Iterable[Mapping]) -> str:
+    rows = " ".join(
+        "("
+        + " ".join("UNDEF" if a.get(v) is None else a[v].n3() for v in variables)
+        + ")"
+        for a in solutions
+    )
+    return "VALUES (" + " ".join(v.n3() for v in variables) + ") {" + rows + "}"
+
+
+def _serviceCall(
+    service_url: str, service_query: str
+) -> Generator[Dict[str, Dict[str, str]], None, None]:
+    query_settings = {"query": service_query, "output": "json"}
+    headers = {
+        "accept": "application/sparql-results+json",
+        "user-agent": "rdflibForAnUser",
+    }
+    # GET is easier to cache so prefer that if the query is not to long
+    if len(service_query) < 600:
+        response = urlopen(
+            Request(service_url + "?" + urlencode(query_settings), headers=headers)
+        )
+    else:
+        response = urlopen(
+            Request(
+                service_url,
+                data=urlencode(query_settings).encode(),
+                headers=headers,
             )
-        if response.status == 200:
-            json = j.loads(response.read())
-            variables = res["vars_"] = json["head"]["vars"]
-            # or just return the bindings?
-            res = json["results"]["bindings"]
-            if len(res) > 0:
-                for r in res:
-                    # type error: Argument 2 to "_yieldBindingsFromServiceCallResult" has incompatible type "str"; expected "Dict[str, Dict[str, str]]"
-                    for bound in _yieldBindingsFromServiceCallResult(ctx, r, variables):  # type: ignore[arg-type]
-                        yield bound
-        else:
+        )
+    with response:
+        if response.status != 200:
             raise Exception(
                 "Service: %s responded with code: %s", service_url, response.status
             )
+        yield from _jsonBindings(response)
 
 
-"""
-    Build a query string to be used by the service call.
-    It is supposed to pass in the existing bound solutions.
-    Re-adds prefixes if added and sets the base.
-    Wraps it in select if needed.
-"""
-
+class _JSONReader:
+    """
+    Reads JSON values one at a time from a stream of bytes, only keeping
+    the part of the stream that has not been read yet in memory
+    """
 
-def _buildQueryStringForServiceCall(ctx: QueryContext, service_query: str) -> str:
-    try:
-        parser.parseQuery(service_query)
-    except ParseException:
-        # This could be because we don't have a select around the service call.
-        service_query = "SELECT REDUCED * WHERE {" + service_query + "}"
-        # type error: Item "None" of "Optional[Prologue]" has no attribute "namespace_manager"
-        for p in ctx.prologue.namespace_manager.store.namespaces():  # type: ignore[union-attr]
-            service_query = "PREFIX " + p[0] + ":" + p[1].n3() + " " + service_query
-        # re add the base if one was defined
-        # type error: Item "None" of "Optional[Prologue]" has no attribute "base"
-        base = ctx.prologue.base  # type: ignore[union-attr]
-        if base is not None and len(base) > 0:
-            service_query = "BASE <" + base + "> " + service_query
-    sol = [v for v in ctx.solution() if isinstance(v, Variable)]
-    if len(sol) > 0:
-        variables = " ".join([v.n3() for v in sol])
-        variables_bound = " ".join([ctx.get(v).n3() for v in sol])
-        service_query = (
-            service_query + "VALUES (" + variables + ") {(" + variables_bound + ")}"
+    def __init__(self, stream: Any, size: int = 65536):
+        self._stream = stream
+        self._size = size
+        self._decoder = j.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        data = self._stream.read(self._size)
+        self._eof = not data
+        self._buffer = self._buffer[self._pos :] + self._text.decode(
+            data, final=self._eof
         )
-    return service_query
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        The next character that is not whitespace, "" at the end
+        """
+        while True:
+            buffer, pos = self._buffer, self._pos
+            while pos < len(buffer) and buffer[pos] in " \t\n\r":
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, c: str) -> None:
+        if self.peek() != c:
+            raise ValueError("Expected %r in JSON at %r" % (c, self.peek()))
+        self._pos += 1
+
+    def skip(self, c: str) -> bool:
+        if self.peek() == c:
+            self._pos += 1
+            return True
+        return False
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except j.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # a number may go on in the part of the stream not yet read
+            if end < len(self._buffer) or not self._fill():
+                self._pos = end
+                return value
+
+
+def _jsonBindings(stream: Any) -> Generator[Dict[str, Dict[str, str]], None, None]:
+    """
+    The bindings of SPARQL JSON results, read one at a time rather than
+    after loading the whole response
+    """
+    reader = _JSONReader(stream)
+    reader.expect("{")
+    if reader.skip("}"):
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == "results":
+            reader.expect("{")
+            while not reader.skip("}"):
+                key = reader.value()
+                reader.expect(":")
+                if key == "bindings":
+                    reader.expect("[")
+                    while not reader.skip("]"):
+                        yield reader.value()
+                        reader.skip(",")
+                else:
+                    reader.value()
+                reader.skip(",")
+        else:
+            reader.value()
+        if not reader.skip(","):
+            reader.expect("}")
+            return
 
 
 def _yieldBindingsFromServiceCallResult(
@@ -451,33 +921,22 @@ def evalGroup(ctx: QueryContext, group: CompValue):
 def evalAggregateJoin(
     ctx: QueryContext, agg: CompValue
 ) -> Generator[FrozenBindings, None, None]:
-    # import pdb ; pdb.set_trace()
     p = evalPart(ctx, agg.p)
     # p is always a Group, we always get a dict back
 
-    group_expr = agg.p.expr
-    res: Dict[Any, Any] = collections.defaultdict(
-        lambda: Aggregator(aggregations=agg.A)
-    )
-
-    if group_expr is None:
-        # no grouping, just COUNT in SELECT clause
-        # get 1 aggregator for counting
-        aggregator = res[True]
-        for row in p:
-            aggregator.update(row)
-    else:
-        for row in p:
-            # determine right group aggregator for row
-            k = tuple(_eval(e, row, False) for e in group_expr)
-            res[k].update(row)
-
-    # all rows are done; yield aggregated values
-    for aggregator in res.values():
-        yield FrozenBindings(ctx, aggregator.get_bindings())
+    empty = True
+    for row in _hashAggregate(
+        ctx,
+        p,
+        agg.p.expr,
+        agg.A,
+        rdflib.plugins.sparql.SPARQL_GROUP_MEMORY_GROUPS,
+    ):
+        empty = False
+        yield row
 
     # there were no matches
-    if len(res) == 0:
+    if empty:
         yield FrozenBindings(ctx)
 
 
@@ -495,14 +954,73 @@ def evalOrderBy(
     return res
 
 
+class _Descending:
+    """
+    Wraps a sort key to invert its order, for DESC order conditions in a
+    composite sort key
+    """
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: Any):
+        self.key = key
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.key < self.key
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _Descending) and self.key == other.key
+
+
+def _orderByKey(conditions: List[CompValue]) -> Callable[[FrozenBindings], Tuple]:
+    """
+    A single sort key for all order conditions of an ORDER BY
+    """
+    exprs = [(e.expr, bool(e.order and e.order == "DESC")) for e in conditions]
+
+    def key(x: FrozenBindings) -> Tuple:
+        return tuple(
+            _Descending(_val(value(x, expr, variables=True)))
+            if desc
+            else _val(value(x, expr, variables=True))
+            for expr, desc in exprs
+        )
+
+    return key
+
+
+def _evalTopK(
+    ctx: QueryContext, part: CompValue, k: int
+) -> Optional[Iterable[FrozenBindings]]:
+    """
+    The first k solutions of part if it is an ORDER BY (possibly below a
+    projection), found with a heap of size k instead of sorting all
+    solutions. Returns None for any other part.
+    """
+    project = None
+    if part.name == "Project":
+        project, part = part, part.p
+    if part.name != "OrderBy":
+        return None
+
+    # heapq.nsmallest is stable, like the sorts in evalOrderBy
+    res = heapq.nsmallest(k, evalPart(ctx, part.p), key=_orderByKey(part.expr))
+    if project is not None:
+        return (row.project(project.PV) for row in res)
+    return res
+
+
 def evalSlice(ctx: QueryContext, slice: CompValue):
-    res = evalPart(ctx, slice.p)
+    end = slice.start + slice.length if slice.length is not None else None
 
-    return itertools.islice(
-        res,
-        slice.start,
-        slice.start + slice.length if slice.length is not None else None,
-    )
+    res = None
+    if end is not None:
+        # ORDER BY ... LIMIT only needs to keep the first offset+limit rows
+        res = _evalTopK(ctx, slice.p, end)
+    if res is None:
+        res = evalPart(ctx, slice.p)
+
+    return itertools.islice(res, slice.start, end)
 
 
 def evalReduced(
@@ -518,43 +1036,34 @@ def evalReduced(
     # This implementation uses a most recently used strategy and a limited
     # buffer size. It relates to a LRU caching algorithm:
     # https://en.wikipedia.org/wiki/Cache_algorithms#Least_Recently_Used_.28LRU.29
-    MAX = 1
-    # TODO: add configuration or determine "best" size for most use cases
     # 0: No reduction
     # 1: compare only with the last row, almost no reduction with
     #    unordered incoming rows
     # N: The greater the buffer size the greater the reduction but more
     #    memory and time are needed
+    window = rdflib.plugins.sparql.SPARQL_REDUCED_WINDOW
 
-    # mixed data structure: set for lookup, deque for append/pop/remove
-    mru_set = set()
-    mru_queue: Deque[Any] = collections.deque()
+    # ordered from least to most recently used
+    mru: collections.OrderedDict[FrozenBindings, None] = collections.OrderedDict()
 
     for row in evalPart(ctx, part.p):
-        if row in mru_set:
-            # forget last position of row
-            mru_queue.remove(row)
+        if row in mru:
+            # put row to the front
+            mru.move_to_end(row)
         else:
             # row seems to be new
             yield row
-            mru_set.add(row)
-            if len(mru_set) > MAX:
+            mru[row] = None
+            if len(mru) > window:
                 # drop the least recently used row from buffer
-                mru_set.remove(mru_queue.pop())
-        # put row to the front
-        mru_queue.appendleft(row)
+                mru.popitem(last=False)
 
 
 def evalDistinct(
     ctx: QueryContext, part: CompValue
 ) -> Generator[FrozenBindings, None, None]:
     res = evalPart(ctx, part.p)
-
-    done = set()
-    for x in res:
-        if x not in done:
-            yield x
-            done.add(x)
+    return _distinct(res, rdflib.plugins.sparql.SPARQL_DISTINCT_MEMORY_ROWS, ctx)
 
 
 def evalProject(ctx: QueryContext, project: CompValue):
@@ -644,8 +1153,15 @@ def evalQuery(
     query: Query,
     initBindings: Optional[Mapping[str, Identifier]] = None,
     base: Optional[str] = None,
+    limits: Optional[QueryLimits] = None,
+    profile: Optional[QueryProfile] = None,
 ) -> Mapping[Any, Any]:
     """
+    Evaluate a query. Its evaluation raises a
+    :class:`~rdflib.plugins.sparql.sparql.QueryInterrupted` once it
+    exceeds the given limits, or those of :meth:`QueryLimits.default
+    <rdflib.plugins.sparql.sparql.QueryLimits.default>` if there are none.
+    The statistics of the evaluation are collected in profile, if given.
 
     .. caution::
 
@@ -666,6 +1182,11 @@ def evalQuery(
     ctx = QueryContext(graph, initBindings=initBindings)
 
     ctx.prologue = query.prologue
+    ctx.slots = query.slots
+    ctx.limits = limits if limits is not None else QueryLimits.default()
+    if profile is not None:
+        profile.start(query)
+        ctx.profile = profile
     main = query.algebra
 
     if main.datasetClause:
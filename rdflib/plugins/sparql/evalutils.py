@@ -1,12 +1,24 @@
 from __future__ import annotations
 
 import collections
+import itertools
+import pickle
+import queue
+import tempfile
+import threading
+from concurrent.futures import Executor, Future
 from typing import (
     Any,
+    Callable,
+    Collection,
     DefaultDict,
+    Dict,
     Generator,
     Iterable,
+    Iterator,
+    List,
     Mapping,
+    Optional,
     Set,
     Tuple,
     TypeVar,
@@ -28,12 +40,42 @@ from rdflib.term import BNode, Identifier, Literal, URIRef, Variable
 _ContextType = Union[FrozenBindings, QueryContext]
 _FrozenDictT = TypeVar("_FrozenDictT", bound=FrozenDict)
 
+_SPILL_PARTITIONS = 16
+_SPILL_MAX_LEVEL = 4
+
+# set in the threads evaluating a _Prefetch, which do not start others
+_prefetching = threading.local()
+# the seconds a _Prefetch that is asked for waits for an idle executor to
+# start it, before it is evaluated in the asking thread
+_PREFETCH_START_WAIT = 0.05
+
 
 def _diff(
-    a: Iterable[_FrozenDictT], b: Iterable[_FrozenDictT], expr
+    a: Iterable[_FrozenDictT],
+    b: Iterable[_FrozenDictT],
+    expr,
+    keys: Collection[Variable] = (),
 ) -> Set[_FrozenDictT]:
+    """
+    The solutions in a without a compatible solution in b for which expr
+    holds.
+
+    If keys are given, b is partitioned on them (see _keyedIndex) so only
+    candidates that may be compatible are checked.
+    """
     res = set()
 
+    if keys:
+        index = _keyedIndex(b, keys)
+        for x in a:
+            if all(
+                not x.compatible(y) or not _ebv(expr, x.merge(y))
+                for y in _candidates(index, x)
+            ):
+                res.add(x)
+        return res
+
+    b = list(b)
     for x in a:
         if all(not x.compatible(y) or not _ebv(expr, x.merge(y)) for y in b):
             res.add(x)
@@ -41,9 +83,187 @@ def _diff(
     return res
 
 
+def _distinct(
+    rows: Iterable[FrozenBindings],
+    limit: Optional[int],
+    ctx: QueryContext,
+    level: int = 0,
+) -> Generator[FrozenBindings, None, None]:
+    """
+    The distinct rows, holding at most limit rows in memory.
+
+    Rows are yielded in order of first occurrence until limit distinct rows
+    have been seen. Unseen rows after that are spilled to temporary files,
+    partitioned by hash, and each partition is made distinct on its own
+    (spilling again if needed) once the input is exhausted.
+    """
+    done = set()
+    it = iter(rows)
+    for x in it:
+        if x not in done:
+            yield x
+            done.add(x)
+            if limit is not None and len(done) >= limit:
+                if level < _SPILL_MAX_LEVEL:
+                    break
+    else:
+        return
+
+    partitions = [tempfile.TemporaryFile() for _ in range(_SPILL_PARTITIONS)]
+    try:
+        for x in it:
+            if x not in done:
+                _dumpRow(x, partitions[hash((level, x)) % _SPILL_PARTITIONS])
+        done.clear()
+
+        for f in partitions:
+            f.seek(0)
+            yield from _distinct(_loadRows(f, ctx), limit, ctx, level + 1)
+            f.close()
+    finally:
+        for f in partitions:
+            f.close()
+
+
+def _dumpRow(x: FrozenBindings, f: Any) -> None:
+    pickle.dump(tuple(x.items()), f, pickle.HIGHEST_PROTOCOL)
+
+
+def _loadRows(f: Any, ctx: QueryContext) -> Generator[FrozenBindings, None, None]:
+    while True:
+        try:
+            items = pickle.load(f)
+        except EOFError:
+            return
+        yield FrozenBindings(ctx, items)
+
+
+class _Prefetch:
+    """
+    Solutions computed on an executor ahead of being asked for, holding at
+    most maxsize of them until they are.
+
+    Work the executor has not started shortly after the first solution is
+    asked for is done in the asking thread instead, so a consumer never
+    waits for a busy executor, and threads of the executor do not start
+    more of it.
+    """
+
+    _DONE = object()
+
+    def __init__(
+        self,
+        executor: Executor,
+        rows: Callable[[], Iterable[Any]],
+        maxsize: int,
+    ):
+        self._rows = rows
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._started = threading.Event()
+        self._stop = threading.Event()
+        self._iterator: Optional[Iterator[Any]] = None
+        self._future: Optional[Future] = None
+        self._future = executor.submit(
+            _Prefetch._produce, rows, self._queue, self._started, self._stop
+        )
+
+    @staticmethod
+    def prefetching() -> bool:
+        """
+        Whether the current thread is computing prefetched solutions
+        """
+        return getattr(_prefetching, "active", False)
+
+    @staticmethod
+    def _produce(
+        rows: Callable[[], Iterable[Any]],
+        q: queue.Queue,
+        started: threading.Event,
+        stop: threading.Event,
+    ) -> None:
+        # only uses the queue and the event, so the _Prefetch can be
+        # collected, and stop the work, when it is no longer used
+        def put(item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.05)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        started.set()
+        _prefetching.active = True
+        try:
+            it = iter(rows())
+            try:
+                for row in it:
+                    if not put((row,)):
+                        return
+            finally:
+                close = getattr(it, "close", None)
+                if close is not None:
+                    close()
+            put(_Prefetch._DONE)
+        except BaseException as e:
+            put(e)
+        finally:
+            _prefetching.active = False
+
+    def __iter__(self) -> "_Prefetch":
+        return self
+
+    def __next__(self) -> Any:
+        if self._iterator is None:
+            self._started.wait(_PREFETCH_START_WAIT)
+            if self._future.cancel():  # type: ignore[union-attr]
+                # not started yet
+                self._iterator = iter(self._rows())
+            else:
+                self._iterator = self._consume()
+        return next(self._iterator)
+
+    def _consume(self) -> Generator[Any, None, None]:
+        while True:
+            item = self._queue.get()
+            if item is _Prefetch._DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item[0]
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._future is not None:
+            self._future.cancel()
+
+    def __del__(self) -> None:
+        self.close()
+
+
 def _minus(
-    a: Iterable[_FrozenDictT], b: Iterable[_FrozenDictT]
+    a: Iterable[_FrozenDictT],
+    b: Iterable[_FrozenDictT],
+    keys: Collection[Variable] = (),
 ) -> Generator[_FrozenDictT, None, None]:
+    """
+    The solutions in a that have no compatible solution in b sharing
+    at least one variable with it.
+
+    If keys are given, b is partitioned on them (see _keyedIndex) so each
+    solution in a is only checked against the matching buckets.
+    """
+    if keys:
+        index = _keyedIndex(b, keys)
+        for x in a:
+            if all(
+                (not x.compatible(y)) or x.disjointDomain(y)
+                for y in _candidates(index, x)
+            ):
+                yield x
+        return
+
+    b = list(b)
     for x in a:
         if all((not x.compatible(y)) or x.disjointDomain(y) for y in b):
             yield x
@@ -72,6 +292,75 @@ def _join(
                 yield x.merge(y)
 
 
+_KeyedIndex = Dict[
+    Tuple[Variable, ...], DefaultDict[Tuple[Identifier, ...], List[_FrozenDictT]]
+]
+
+
+def _keyedIndex(
+    b: Iterable[_FrozenDictT], keys: Collection[Variable]
+) -> _KeyedIndex[_FrozenDictT]:
+    """
+    Partition the solutions in b by which of the given key variables they
+    bind, and within each partition hash them on the values of those
+    variables.
+
+    SPARQL solutions may leave any variable unbound, and an unbound variable
+    is compatible with every value, so a solution binding only some of the
+    keys is filed under exactly the keys it binds.
+    """
+    _keys = tuple(keys)
+    index: _KeyedIndex[_FrozenDictT] = {}
+    for y in b:
+        bound = tuple(v for v in _keys if y.get(v) is not None)
+        table = index.get(bound)
+        if table is None:
+            table = index[bound] = collections.defaultdict(list)
+        table[tuple(y[v] for v in bound)].append(y)
+    return index
+
+
+def _candidates(
+    index: _KeyedIndex[_FrozenDictT], x: Mapping[Identifier, Identifier]
+) -> Iterable[_FrozenDictT]:
+    """
+    The solutions in a _keyedIndex that may be compatible with x.
+
+    Partitions keyed only on variables x binds are probed directly, any
+    others (binding a key x leaves unbound) are scanned completely.
+    """
+    for bound, table in index.items():
+        k = tuple(x.get(v) for v in bound)
+        if None in k:
+            yield from itertools.chain.from_iterable(table.values())
+        elif k in table:
+            yield from table[k]
+
+
+def _hashJoin(
+    a: Iterable[FrozenDict],
+    b: Iterable[FrozenDict],
+    keys: Collection[Variable],
+) -> Generator[FrozenDict, None, None]:
+    """
+    Join a and b by building a hash table over b, keyed on the values of the
+    variables in keys (the variables that may be bound on both sides), and
+    probing it with each solution of a as it is produced.
+
+    Without any join variables this is the plain nested loop join.
+    """
+    if not keys:
+        b = list(b)
+        yield from _join(a, b)
+        return
+
+    index = _keyedIndex(b, keys)
+    for x in a:
+        for y in _candidates(index, x):
+            if x.compatible(y):
+                yield x.merge(y)
+
+
 def _ebv(expr: Union[Literal, Variable, Expr], ctx: FrozenDict) -> bool:
     """
     Return true/false for the given expr
@@ -81,10 +370,11 @@ def _ebv(expr: Union[Literal, Variable, Expr], ctx: FrozenDict) -> bool:
     an error is false
     """
 
-    try:
-        return EBV(expr)
-    except SPARQLError:
-        pass
+    if not isinstance(expr, (Expr, Variable)):
+        try:
+            return EBV(expr)
+        except SPARQLError:
+            pass
     if isinstance(expr, Expr):
         try:
             return EBV(expr.eval(ctx))
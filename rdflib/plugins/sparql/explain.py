@@ -0,0 +1,351 @@
+"""
+EXPLAIN and EXPLAIN ANALYZE for SPARQL queries
+
+:func:`explain` gives the plan of a query, the tree of algebra operators
+it is evaluated with; :func:`explainAnalyze` evaluates the query and gives
+the same tree with what evaluating each operator took::
+
+    >>> from rdflib import Graph
+    >>> from rdflib.plugins.sparql.explain import explainAnalyze
+    >>> g = Graph().parse(data="<urn:a> <urn:p> 1, 2 .", format="turtle")
+    >>> plan = explainAnalyze(g, "SELECT ?o { <urn:a> <urn:p> ?o }")
+    >>> plan.rows
+    2
+    >>> print(plan)  # doctest: +SKIP
+    SelectQuery  rows=2 time=0.110ms self=0.021ms
+      Project ?o  rows=2 time=0.089ms self=0.015ms
+        BGP <urn:a> <urn:p> ?o  rows=2 triples=1 time=0.074ms self=0.074ms
+
+A :class:`QueryProfile` passed to :meth:`Graph.query
+<rdflib.graph.Graph.query>` collects the same statistics while the results
+are read, for queries whose results are needed as well.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sized,
+    Tuple,
+    Union,
+)
+
+from rdflib.plugins.sparql.parserutils import CompValue
+from rdflib.plugins.sparql.sparql import Query
+from rdflib.term import Node
+
+if TYPE_CHECKING:
+    from rdflib.graph import Graph
+    from rdflib.namespace import NamespaceManager
+    from rdflib.plugins.sparql.sparql import QueryContext
+    from rdflib.term import Identifier
+
+__all__ = ["PlanNode", "QueryProfile", "explain", "explainAnalyze"]
+
+
+# the algebra operators evalPart evaluates
+_OPERATORS = {
+    "BGP",
+    "Filter",
+    "Join",
+    "LeftJoin",
+    "Graph",
+    "Union",
+    "ToMultiSet",
+    "Extend",
+    "Minus",
+    "Project",
+    "Slice",
+    "Distinct",
+    "Reduced",
+    "OrderBy",
+    "Group",
+    "AggregateJoin",
+    "SelectQuery",
+    "AskQuery",
+    "ConstructQuery",
+    "DescribeQuery",
+    "ServiceGraphPattern",
+}
+
+
+class PlanNode:
+    """
+    An operator of a query plan, with what its evaluation took if the query
+    was analyzed.
+
+    An operator is evaluated once for each solution of the left side of a
+    lazy join above it, so it may have been evaluated many times:
+
+    * ``evaluations``: the times it was evaluated
+    * ``rows``: the solutions it produced in total
+    * ``peak``: the most solutions it produced in one evaluation
+    * ``triples``: the lookups it made in the store
+    * ``time``: the seconds spent in it and the operators below it
+    * ``selfTime``: the seconds spent in it alone
+    """
+
+    def __init__(self, part: CompValue, children: List[PlanNode]):
+        self.part = part
+        self.children = children
+        # for the names in the text of the plan
+        self.namespace_manager: Optional[NamespaceManager] = None
+        self.evaluations = 0
+        self.rows = 0
+        self.peak = 0
+        self.triples = 0
+        self.time = 0.0
+        self.selfTime = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.part.name
+
+    def walk(self, depth: int = 0) -> Generator[Tuple[int, PlanNode], None, None]:
+        """
+        This node and the nodes below it, depth first, with their depth
+        """
+        yield depth, self
+        for child in self.children:
+            yield from child.walk(depth + 1)
+
+    def describe(self, namespace_manager: Optional[NamespaceManager] = None) -> str:
+        """
+        The operator and its main arguments, e.g. the triple patterns of a BGP
+        """
+        part = self.part
+
+        def n3(n: Any) -> str:
+            if isinstance(n, Node):
+                return n.n3(namespace_manager)  # type: ignore[call-arg]
+            return str(n)
+
+        args: List[str] = []
+        if part.name == "BGP":
+            args.append(" . ".join(" ".join(n3(n) for n in t) for t in part.triples))
+        elif part.name in ("Join", "LeftJoin") and part.lazy:
+            args.append("(lazy)")
+        elif part.name == "Project":
+            args.extend(n3(v) for v in part.PV)
+        elif part.name == "Extend":
+            args.append(n3(part.var))
+        elif part.name == "Slice":
+            args.append("start=%s length=%s" % (part.start, part.length))
+        elif part.name in ("Graph", "ServiceGraphPattern"):
+            args.append(n3(part.term))
+        return " ".join([part.name] + args)
+
+    def statistics(self) -> str:
+        if not self.evaluations:
+            return ""
+        stats = ["rows=%d" % self.rows]
+        if self.evaluations > 1:
+            stats.append("evaluations=%d peak=%d" % (self.evaluations, self.peak))
+        if self.triples:
+            stats.append("triples=%d" % self.triples)
+        stats.append("time=%.3fms" % (self.time * 1000))
+        stats.append("self=%.3fms" % (self.selfTime * 1000))
+        return " ".join(stats)
+
+    def render(self, namespace_manager: Optional[NamespaceManager] = None) -> str:
+        """
+        The plan as an indented text tree
+        """
+        if namespace_manager is None:
+            namespace_manager = self.namespace_manager
+        lines = []
+        for depth, node in self.walk():
+            line = "  " * depth + node.describe(namespace_manager)
+            stats = node.statistics()
+            if stats:
+                line += "  " + stats
+            lines.append(line)
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.render()
+
+    def __repr__(self) -> str:
+        return "<PlanNode %s %s>" % (self.describe(), self.statistics())
+
+
+def _plan(part: Any, nodes: Dict[int, PlanNode]) -> List[PlanNode]:
+    """
+    The plan nodes for the operators in part, the topmost ones first
+    """
+    if isinstance(part, CompValue):
+        children = [c for v in part.values() for c in _plan(v, nodes)]
+        if part.name not in _OPERATORS:
+            # e.g. an expression, which may hold the pattern of an EXISTS
+            return children
+        node = PlanNode(part, children)
+        nodes[id(part)] = node
+        return [node]
+    if isinstance(part, (list, tuple)):
+        return [c for v in part for c in _plan(v, nodes)]
+    return []
+
+
+class _Frame:
+    __slots__ = ("node", "childTime")
+
+    def __init__(self, node: PlanNode):
+        self.node = node
+        self.childTime = 0.0
+
+
+class QueryProfile:
+    """
+    The statistics of the evaluation of one query, collected as it is
+    evaluated when the profile is given to :meth:`Graph.query
+    <rdflib.graph.Graph.query>`::
+
+        profile = QueryProfile()
+        for row in graph.query(q, profile=profile):
+            ...
+        print(profile.plan)
+    """
+
+    def __init__(self) -> None:
+        self.plan: Optional[PlanNode] = None
+        self._nodes: Dict[int, PlanNode] = {}
+        # the operators being evaluated by each thread, innermost last
+        self._stacks = threading.local()
+
+    def start(self, query: Query) -> None:
+        """
+        Make the plan of the query being evaluated
+        """
+        self._nodes = {}
+        plans = _plan(query.algebra, self._nodes)
+        self.plan = plans[0] if plans else None
+        if self.plan is not None and query.prologue is not None:
+            self.plan.namespace_manager = query.prologue.namespace_manager
+
+    def _stack(self) -> List[_Frame]:
+        try:
+            return self._stacks.frames
+        except AttributeError:
+            self._stacks.frames = []
+            return self._stacks.frames
+
+    def _node(self, part: CompValue) -> PlanNode:
+        node = self._nodes.get(id(part))
+        if node is None:
+            # not in the algebra of the query, e.g. the pattern of an EXISTS
+            # translated as it is evaluated: below the operator evaluating it
+            node = self._nodes[id(part)] = PlanNode(part, [])
+            stack = self._stack()
+            if stack:
+                stack[-1].node.children.append(node)
+        return node
+
+    def _timed(self, node: PlanNode, f: Callable[[], Any]) -> Any:
+        stack = self._stack()
+        frame = _Frame(node)
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return f()
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            node.time += elapsed
+            node.selfTime += elapsed - frame.childTime
+            if stack:
+                stack[-1].childTime += elapsed
+
+    def evaluate(
+        self,
+        ctx: QueryContext,
+        part: CompValue,
+        evaluate: Callable[[QueryContext, CompValue], Any],
+    ) -> Any:
+        """
+        Evaluate part with evaluate, counting what it takes
+        """
+        node = self._node(part)
+        node.evaluations += 1
+        result = self._timed(node, lambda: evaluate(ctx, part))
+        if isinstance(result, Iterator):
+            return self._rows(node, result)
+        if isinstance(result, dict) and isinstance(result.get("bindings"), Iterator):
+            # the solutions of a SELECT query
+            result["bindings"] = self._rows(node, result["bindings"])
+            return result
+        if isinstance(result, Sized) and not isinstance(result, Mapping):
+            node.rows += len(result)
+            node.peak = max(node.peak, len(result))
+        return result
+
+    def _rows(self, node: PlanNode, rows: Iterator[Any]) -> Generator[Any, None, None]:
+        count = 0
+        try:
+            while True:
+                try:
+                    row = self._timed(node, rows.__next__)
+                except StopIteration:
+                    return
+                count += 1
+                node.rows += 1
+                yield row
+        finally:
+            node.peak = max(node.peak, count)
+
+    def countTriples(self, n: int = 1) -> None:
+        """
+        Count lookups in the store, made by the operator being evaluated
+        """
+        stack = self._stack()
+        if stack:
+            stack[-1].node.triples += n
+
+
+def explain(
+    query: Union[str, Query],
+    initNs: Optional[Mapping[str, Any]] = None,
+    base: Optional[str] = None,
+) -> PlanNode:
+    """
+    The plan of a query, without evaluating it
+    """
+    from rdflib.plugins.sparql.processor import prepareQuery
+
+    if isinstance(query, str):
+        query = prepareQuery(query, initNs, base)
+    profile = QueryProfile()
+    profile.start(query)
+    if TYPE_CHECKING:
+        assert profile.plan is not None
+    return profile.plan
+
+
+def explainAnalyze(
+    graph: Graph,
+    query: Union[str, Query],
+    initBindings: Optional[Mapping[str, Identifier]] = None,
+    initNs: Optional[Mapping[str, Any]] = None,
+    base: Optional[str] = None,
+) -> PlanNode:
+    """
+    Evaluate a query over graph, reading all its results, and return its
+    plan with what evaluating each operator took
+    """
+    profile = QueryProfile()
+    result = graph.query(
+        query, initBindings=initBindings, initNs=initNs, base=base, profile=profile
+    )
+    for _ in result:
+        pass
+    if TYPE_CHECKING:
+        assert profile.plan is not None
+    return profile.plan
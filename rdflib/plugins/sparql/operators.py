@@ -17,7 +17,7 @@ import re
 import uuid
 import warnings
 from decimal import ROUND_HALF_DOWN, ROUND_HALF_UP, Decimal, InvalidOperation
-from functools import reduce
+from functools import lru_cache, reduce
 from typing import Any, Callable, Dict, NoReturn, Optional, Tuple, Union, overload
 from urllib.parse import quote
 
@@ -209,6 +209,67 @@ def Builtin_ROUND(expr: Expr, ctx) -> Literal:
     return Literal(v, datatype=l_.datatype)
 
 
+# Maps XPath REGEX flags (http://www.w3.org/TR/xpath-functions/#flags)
+# to Python's re flags
+_REGEX_FLAGS = {"i": re.IGNORECASE, "s": re.DOTALL, "m": re.MULTILINE}
+
+# how many distinct (pattern, flags) pairs computed at runtime are kept compiled
+_REGEX_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=_REGEX_CACHE_SIZE)
+def _compileRegex(pattern: str, flags: Optional[str] = None) -> re.Pattern:
+    """
+    Compile a REGEX/REPLACE pattern with its XPath flags
+    """
+    cFlag = 0
+    if flags:
+        cFlag = reduce(pyop.or_, [_REGEX_FLAGS.get(f, 0) for f in flags])
+    return re.compile(pattern, cFlag)
+
+
+@lru_cache(maxsize=_REGEX_CACHE_SIZE)
+def _compileReplacement(replacement: str) -> str:
+    """
+    Translate a REPLACE replacement string to python's syntax
+    """
+    # python uses \1, xpath/sparql uses $1
+    return re.sub("\\$([0-9]*)", r"\\\1", replacement)
+
+
+def _regex(expr: Expr) -> re.Pattern:
+    """
+    The compiled pattern of a REGEX or REPLACE expression, see
+    precompilePatterns for constant patterns
+    """
+    compiled = expr._pattern
+    if compiled is None:
+        flags = expr.flags
+        compiled = _compileRegex(
+            str(string(expr.pattern)), str(flags) if flags else None
+        )
+    return compiled
+
+
+def precompilePatterns(e: Any) -> None:
+    """
+    Compile constant REGEX and REPLACE patterns once, when the algebra is
+    translated, rather than looking them up for every solution
+    """
+    if isinstance(e, Expr) and e.name in ("Builtin_REGEX", "Builtin_REPLACE"):
+        pattern, flags = e.pattern, e.flags
+        if isinstance(pattern, Literal) and (
+            flags is None or isinstance(flags, Literal)
+        ):
+            try:
+                e._pattern = _compileRegex(
+                    str(string(pattern)), str(flags) if flags else None
+                )
+            except (SPARQLError, re.error):
+                # left to fail for each solution, as it would without this
+                pass
+
+
 def Builtin_REGEX(expr: Expr, ctx) -> Literal:
     """
     http://www.w3.org/TR/sparql11-query/#func-regex
@@ -219,17 +280,7 @@ def Builtin_REGEX(expr: Expr, ctx) -> Literal:
     """
 
     text = string(expr.text)
-    pattern = string(expr.pattern)
-    flags = expr.flags
-
-    cFlag = 0
-    if flags:
-        # Maps XPath REGEX flags (http://www.w3.org/TR/xpath-functions/#flags)
-        # to Python's re flags
-        flagMap = dict([("i", re.IGNORECASE), ("s", re.DOTALL), ("m", re.MULTILINE)])
-        cFlag = reduce(pyop.or_, [flagMap.get(f, 0) for f in flags])
-
-    return Literal(bool(re.search(str(pattern), text, cFlag)))
+    return Literal(_regex(expr).search(text) is not None)
 
 
 def Builtin_REPLACE(expr: Expr, ctx) -> Literal:
@@ -237,25 +288,13 @@ def Builtin_REPLACE(expr: Expr, ctx) -> Literal:
     http://www.w3.org/TR/sparql11-query/#func-substr
     """
     text = string(expr.arg)
-    pattern = string(expr.pattern)
-    replacement = string(expr.replacement)
-    flags = expr.flags
+    compiled = _regex(expr)
+    replacement = _compileReplacement(str(string(expr.replacement)))
 
-    # python uses \1, xpath/sparql uses $1
-    # type error: Incompatible types in assignment (expression has type "str", variable has type "Literal")
-    replacement = re.sub("\\$([0-9]*)", r"\\\1", replacement)  # type: ignore[assignment]
-
-    cFlag = 0
-    if flags:
-        # Maps XPath REGEX flags (http://www.w3.org/TR/xpath-functions/#flags)
-        # to Python's re flags
-        flagMap = dict([("i", re.IGNORECASE), ("s", re.DOTALL), ("m", re.MULTILINE)])
-        cFlag = reduce(pyop.or_, [flagMap.get(f, 0) for f in flags])
-
-        # @@FIXME@@ either datatype OR lang, NOT both
+    # @@FIXME@@ either datatype OR lang, NOT both
 
     return Literal(
-        re.sub(str(pattern), replacement, text, cFlag),
+        compiled.sub(replacement, text),
         datatype=text.datatype,
         lang=text.language,
     )
@@ -841,6 +880,22 @@ def AdditiveExpression(e: Expr, ctx: Union[QueryContext, FrozenBindings]) -> Lit
         return Literal(res, datatype=dt)
 
 
+# literals are immutable, so comparisons can share their results
+_TRUE = Literal(True)
+_FALSE = Literal(False)
+
+_RELATIONAL_OPS: Dict[str, Callable[[Any, Any], Any]] = {
+    ">": lambda x, y: x.__gt__(y),
+    "<": lambda x, y: x.__lt__(y),
+    "=": lambda x, y: x.eq(y),
+    "!=": lambda x, y: x.neq(y),
+    ">=": lambda x, y: x.__ge__(y),
+    "<=": lambda x, y: x.__le__(y),
+    "IN": pyop.contains,
+    "NOT IN": lambda x, y: not pyop.contains(x, y),
+}
+
+
 def RelationalExpression(e: Expr, ctx: Union[QueryContext, FrozenBindings]) -> Literal:
     expr = e.expr
     other = e.other
@@ -851,19 +906,6 @@ def RelationalExpression(e: Expr, ctx: Union[QueryContext, FrozenBindings]) -> L
     if other is None:
         return expr
 
-    ops = dict(
-        [
-            (">", lambda x, y: x.__gt__(y)),
-            ("<", lambda x, y: x.__lt__(y)),
-            ("=", lambda x, y: x.eq(y)),
-            ("!=", lambda x, y: x.neq(y)),
-            (">=", lambda x, y: x.__ge__(y)),
-            ("<=", lambda x, y: x.__le__(y)),
-            ("IN", pyop.contains),
-            ("NOT IN", lambda x, y: not pyop.contains(x, y)),
-        ]
-    )
-
     if op in ("IN", "NOT IN"):
         res = op == "NOT IN"
 
@@ -912,11 +954,15 @@ def RelationalExpression(e: Expr, ctx: Union[QueryContext, FrozenBindings]) -> L
                 raise SPARQLError("Can only do =,!= comparisons of non-XSD Literals")
 
     try:
-        r = ops[op](expr, other)
+        r = _RELATIONAL_OPS[op](expr, other)
         if r == NotImplemented:
             raise SPARQLError("Error when comparing")
     except TypeError as te:
         raise SPARQLError(*te.args)
+    if r is True:
+        return _TRUE
+    if r is False:
+        return _FALSE
     return Literal(r)
 
 
@@ -933,7 +979,7 @@ def ConditionalAndExpression(
     if other is None:
         return expr
 
-    return Literal(all(EBV(x) for x in [expr] + other))
+    return _TRUE if all(EBV(x) for x in [expr] + other) else _FALSE
 
 
 def ConditionalOrExpression(
@@ -1040,18 +1086,8 @@ def string(s: Literal) -> Literal:
     return s
 
 
-def numeric(expr: Literal) -> Any:
-    """
-    return a number from a literal
-    http://www.w3.org/TR/xpath20/#promotion
-
-    or TypeError
-    """
-
-    if not isinstance(expr, Literal):
-        raise SPARQLTypeError("%r is not a literal!" % expr)
-
-    if expr.datatype not in (
+_NUMERIC_DATATYPES = frozenset(
+    (
         XSD.float,
         XSD.double,
         XSD.decimal,
@@ -1068,7 +1104,22 @@ def numeric(expr: Literal) -> Any:
         XSD.int,
         XSD.short,
         XSD.byte,
-    ):
+    )
+)
+
+
+def numeric(expr: Literal) -> Any:
+    """
+    return a number from a literal
+    http://www.w3.org/TR/xpath20/#promotion
+
+    or TypeError
+    """
+
+    if not isinstance(expr, Literal):
+        raise SPARQLTypeError("%r is not a literal!" % expr)
+
+    if expr.datatype not in _NUMERIC_DATATYPES:
         raise SPARQLTypeError("%r does not have a numeric datatype!" % expr)
 
     return expr.toPython()
@@ -1,25 +1,34 @@
 from __future__ import annotations
 
+import re
 from collections import OrderedDict
 from types import MethodType
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
+    Dict,
     List,
     Mapping,
     Optional,
     Tuple,
+    Type,
     TypeVar,
     Union,
 )
 
-from pyparsing import ParserElement, ParseResults, TokenConverter, originalTextFor
+from pyparsing import (
+    ParseException,
+    ParserElement,
+    ParseResults,
+    TokenConverter,
+    originalTextFor,
+)
 
 from rdflib.term import BNode, Identifier, Variable
 
 if TYPE_CHECKING:
-    from rdflib.plugins.sparql.sparql import FrozenBindings
+    from rdflib.plugins.sparql.sparql import FrozenBindings, SolutionSlots
 
 """
 
@@ -215,21 +224,183 @@ class Expr(CompValue):
         evalfn: Optional[Callable[[Any, Any], Any]] = None,
         **values,
     ):
+        self._compiled: Optional[Callable[[Any], Any]] = None
         super(Expr, self).__init__(name, **values)
 
         self._evalfn = None
         if evalfn:
             self._evalfn = MethodType(evalfn, self)
 
+    def __setitem__(self, key: str, value: Any) -> None:
+        OrderedDict.__setitem__(self, key, value)
+        # the parameters changed, compile again
+        self._compiled = None
+
+    def compile(self, slots: Optional[SolutionSlots] = None) -> None:
+        """
+        Compile the expression for evaluating it, reading the variables
+        having one of the slots straight from SlotBindings of those slots.
+        Done for the expressions of queries when they are translated, and
+        otherwise when they are first evaluated.
+        """
+        self._compiled = _compileExpr(self, slots)
+
     def eval(self, ctx: Any = {}) -> Union[SPARQLError, Any]:
+        compiled = self._compiled
+        if compiled is None:
+            compiled = self._compiled = _compileExpr(self)
+        return compiled(ctx)
+
+
+class _ExprView:
+    """
+    What the evalfn of an Expr sees while it is evaluated for one solution:
+    parameters are evaluated in ctx when accessed, as with a CompValue whose
+    ctx is set, but the (possibly shared) Expr itself is not changed.
+
+    Each Expr is viewed through a subclass made by _viewClass, reading its
+    parameters as properties.
+    """
+
+    __slots__ = ("_expr", "_params", "ctx")
+
+    def __init__(
+        self,
+        expr: Expr,
+        params: Mapping[str, Callable[[Any], Any]],
+        ctx: Any,
+    ):
+        self._expr = expr
+        self._params = params
+        self.ctx = ctx
+
+    def __getattr__(self, a: str) -> Any:
+        # not a parameter, the parameters are properties of the subclasses
+        expr = self._expr
+        res = getattr(expr, a)
+        if res is None and a not in expr.__dict__ and not hasattr(type(expr), a):
+            # a parameter the expressions of this subclass all leave out
+            setattr(type(self), a, None)
+        return res
+
+    def __getitem__(self, a: str) -> Any:
+        param = self._params.get(a)
+        if param is None:
+            return value(self.ctx, OrderedDict.__getitem__(self._expr, a))
+        return param(self.ctx)
+
+    def get(self, a: str, variables: bool = False, errors: bool = False) -> Any:
+        return value(self.ctx, OrderedDict.get(self._expr, a, a), variables)
+
+
+# attributes all expressions have
+_EXPR_ATTRS = frozenset(["name", "_compiled", "_evalfn"])
+
+_VIEW_CLASSES: Dict[Tuple[Any, ...], Type[_ExprView]] = {}
+
+
+def _paramProperty(name: str) -> property:
+    return property(lambda view: view._params[name](view.ctx))
+
+
+def _viewClass(expr: Expr, names: Tuple[str, ...]) -> Type[_ExprView]:
+    """
+    The subclass of _ExprView for the expressions with the same parameters
+    and attributes as expr, with a property for each of the parameters
+    """
+    attrs = tuple(k for k in expr.__dict__ if k not in _EXPR_ATTRS)
+    key = (type(expr), names, attrs)
+    cls = _VIEW_CLASSES.get(key)
+    if cls is None:
+        cls = type(
+            "_ExprView",
+            (_ExprView,),
+            dict(
+                {k: _paramProperty(k) for k in names if not hasattr(_ExprView, k)},
+                __slots__=(),
+            ),
+        )
+        _VIEW_CLASSES[key] = cls
+    return cls
+
+
+def _compileParam(
+    val: Any, slots: Optional[SolutionSlots] = None
+) -> Callable[[Any], Any]:
+    """
+    A function doing value(ctx, val) for a fixed val, with the type checks
+    done once
+    """
+    if isinstance(val, Expr):
+        return val.eval
+    elif isinstance(val, CompValue):
+
+        def _compValue(ctx: Any) -> Any:
+            raise Exception("What do I do with this CompValue? %s" % val)
+
+        return _compValue
+
+    elif isinstance(val, list):
+        params = [_compileParam(x, slots) for x in val]
+        return lambda ctx: [param(ctx) for param in params]
+
+    elif isinstance(val, (BNode, Variable)):
+
+        def _lookup(ctx: Any) -> Any:
+            r = ctx.get(val)
+            if isinstance(r, SPARQLError):
+                raise r
+            if r is not None:
+                return r
+            # not bound
+            raise NotBoundError
+
+        if slots is not None:
+            return slots.getter(val, _lookup)
+        return _lookup
+
+    elif isinstance(val, ParseResults) and len(val) == 1:
+        return _compileParam(val[0], slots)
+    else:
+        return lambda ctx: val
+
+
+def _compileExpr(
+    expr: Expr, slots: Optional[SolutionSlots] = None
+) -> Callable[[Any], Any]:
+    """
+    Turn an Expr into a closure evaluating it for a solution. The type
+    dispatch of value() for each parameter is done once here, and the
+    evalfn gets an _ExprView so the same Expr can be evaluated concurrently.
+    """
+    # parameters replaced by attributes (like the graph of EXISTS) are
+    # read as attributes
+    params = {
+        k: _compileParam(OrderedDict.__getitem__(expr, k), slots)
+        for k in OrderedDict.keys(expr)
+        if k not in expr.__dict__
+    }
+    evalfn = expr._evalfn.__func__ if expr._evalfn is not None else None
+    view = _viewClass(expr, tuple(params))
+
+    def _eval(ctx: Any) -> Any:
         try:
-            self.ctx: Optional[Union[Mapping, FrozenBindings]] = ctx
             # type error: "None" not callable
-            return self._evalfn(ctx)  # type: ignore[misc]
+            return evalfn(view(expr, params, ctx), ctx)  # type: ignore[misc]
         except SPARQLError as e:
             return e
-        finally:
-            self.ctx = None
+
+    return _eval
+
+
+def _serviceString(expr: ParserElement, instring: str, loc: int) -> str:
+    sgp = originalTextFor(expr)
+    for m in reversed(list(re.finditer("service", instring[:loc], re.IGNORECASE))):
+        try:
+            return sgp.parseString(instring[m.start() : loc], parseAll=True)[0]
+        except ParseException:
+            pass
+    raise ParseException(instring, loc, "SERVICE expected")
 
 
 class Comp(TokenConverter):
@@ -258,11 +429,9 @@ class Comp(TokenConverter):
             res = CompValue(self.name)
             if self.name == "ServiceGraphPattern":
                 # Then this must be a service graph pattern and have
-                # already matched.
-                # lets assume there is one, for now, then test for two later.
-                sgp = originalTextFor(self.expr)
-                service_string = sgp.searchString(instring)[0][0]
-                res["service_string"] = service_string
+                # already matched, ending at loc: its text starts at the
+                # nearest SERVICE keyword it can be parsed from
+                res["service_string"] = _serviceString(self.expr, instring, loc)
 
         for t in tokenList:
             if isinstance(t, ParamValue):
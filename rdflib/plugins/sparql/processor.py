@@ -6,16 +6,21 @@ These should be automatically registered with RDFLib
 """
 from __future__ import annotations
 
-from typing import Any, Mapping, Optional, Union
+import collections
+import threading
+from typing import Any, Callable, Hashable, Mapping, Optional, Tuple, TypeVar, Union
 
 from rdflib.graph import Graph
 from rdflib.plugins.sparql.algebra import translateQuery, translateUpdate
 from rdflib.plugins.sparql.evaluate import evalQuery
+from rdflib.plugins.sparql.explain import QueryProfile
 from rdflib.plugins.sparql.parser import parseQuery, parseUpdate
-from rdflib.plugins.sparql.sparql import Query, Update
+from rdflib.plugins.sparql.sparql import Query, QueryLimits, Update
 from rdflib.plugins.sparql.update import evalUpdate
 from rdflib.query import Processor, Result, UpdateProcessor
-from rdflib.term import Identifier
+from rdflib.term import BNode, Identifier
+
+_PlanT = TypeVar("_PlanT", Query, Update)
 
 
 def prepareQuery(
@@ -64,6 +69,107 @@ def processUpdate(
     )
 
 
+class PlanCache:
+    """
+    A thread-safe LRU cache of translated queries or updates, keyed by the
+    query text, base and initial namespaces.
+
+    The cached algebra is not modified by evaluation, so the same
+    :class:`~rdflib.plugins.sparql.sparql.Query` is shared between callers.
+    A ``maxsize`` of 0 disables caching.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._plans: collections.OrderedDict[Hashable, Any] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._buildLock = threading.Lock()
+
+    @staticmethod
+    def key(
+        text: str,
+        base: Optional[str] = None,
+        initNs: Optional[Mapping[str, Any]] = None,
+    ) -> Tuple[str, Optional[str], Tuple[Tuple[str, str], ...]]:
+        ns = tuple(sorted((k, str(v)) for k, v in initNs.items())) if initNs else ()
+        return (text, base, ns)
+
+    def get(
+        self,
+        key: Hashable,
+        build: Callable[[], _PlanT],
+        cacheable: Callable[[_PlanT], bool] = lambda plan: True,
+    ) -> _PlanT:
+        """
+        Return the plan cached for key, or build it and cache it if
+        cacheable(plan) allows it
+        """
+        plan = self._lookup(key)
+        if plan is not None:
+            return plan
+
+        # the parser is not thread-safe, so plans are built one at a time
+        with self._buildLock:
+            plan = self._lookup(key, count=False)
+            if plan is not None:
+                return plan
+            plan = build()
+            if self.maxsize > 0 and cacheable(plan):
+                with self._lock:
+                    self._plans[key] = plan
+                    while len(self._plans) > self.maxsize:
+                        self._plans.popitem(last=False)
+        return plan
+
+    def _lookup(self, key: Hashable, count: bool = True) -> Any:
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+            if count:
+                if plan is not None:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            return plan
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+
+queryPlanCache = PlanCache()
+"""
+Translated queries for :meth:`SPARQLProcessor.query`
+"""
+
+updatePlanCache = PlanCache()
+"""
+Translated updates for :meth:`SPARQLUpdateProcessor.update`
+"""
+
+
+def _hasBNodes(e: Any) -> bool:
+    if isinstance(e, BNode):
+        return True
+    if isinstance(e, Mapping):
+        return any(_hasBNodes(k) or _hasBNodes(v) for k, v in e.items())
+    if isinstance(e, (list, tuple)):
+        return any(_hasBNodes(x) for x in e)
+    return False
+
+
+def _cacheableUpdate(update: Update) -> bool:
+    # blank nodes in INSERT DATA must be new each time the update runs
+    return not _hasBNodes(update.algebra)
+
+
 class SPARQLResult(Result):
     def __init__(self, res: Mapping[str, Any]):
         Result.__init__(self, res["type_"])
@@ -100,7 +206,12 @@ class SPARQLUpdateProcessor(UpdateProcessor):
         """
 
         if isinstance(strOrQuery, str):
-            strOrQuery = translateUpdate(parseUpdate(strOrQuery), initNs=initNs)
+            updateString = strOrQuery
+            strOrQuery = updatePlanCache.get(
+                PlanCache.key(updateString, None, initNs),
+                lambda: translateUpdate(parseUpdate(updateString), initNs=initNs),
+                _cacheableUpdate,
+            )
 
         return evalUpdate(self.graph, strOrQuery, initBindings)
 
@@ -120,12 +231,25 @@ class SPARQLProcessor(Processor):
         initNs: Optional[Mapping[str, Any]] = None,
         base: Optional[str] = None,
         DEBUG: bool = False,
+        limits: Optional[QueryLimits] = None,
+        profile: Optional[QueryProfile] = None,
     ) -> Mapping[str, Any]:
         """
         Evaluate a query with the given initial bindings, and initial
         namespaces. The given base is used to resolve relative URIs in
         the query and will be overridden by any BASE given in the query.
 
+        The evaluation, which goes on as the results are read, stops with a
+        :class:`~rdflib.plugins.sparql.sparql.QueryInterrupted` once it
+        exceeds the given :class:`~rdflib.plugins.sparql.sparql.QueryLimits`,
+        e.g. ``graph.query(q, limits=QueryLimits(timeout=10))``, or those
+        set by ``SPARQL_QUERY_TIMEOUT``, ``SPARQL_MAX_ROWS`` and
+        ``SPARQL_MAX_MEMORY``.
+
+        A :class:`~rdflib.plugins.sparql.explain.QueryProfile` given as
+        profile collects what evaluating each operator of the query took,
+        as the results are read.
+
         .. caution::
 
            This method can access indirectly requested network endpoints, for
@@ -141,6 +265,10 @@ class SPARQLProcessor(Processor):
         """
 
         if isinstance(strOrQuery, str):
-            strOrQuery = translateQuery(parseQuery(strOrQuery), base, initNs)
+            queryString = strOrQuery
+            strOrQuery = queryPlanCache.get(
+                PlanCache.key(queryString, base, initNs),
+                lambda: translateQuery(parseQuery(queryString), base, initNs),
+            )
 
-        return evalQuery(self.graph, strOrQuery, initBindings, base)
+        return evalQuery(self.graph, strOrQuery, initBindings, base, limits, profile)
@@ -81,7 +81,7 @@ class CSVResultSerializer(ResultSerializer):
 
         vs = [self.serializeTerm(v, encoding) for v in self.result.vars]  # type: ignore[union-attr]
         out.writerow(vs)
-        for row in self.result.bindings:
+        for row in self.bindings():
             out.writerow(
                 [self.serializeTerm(row.get(v), encoding) for v in self.result.vars]  # type: ignore[union-attr]
             )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import codecs
 import json
 from typing import IO, Any, Dict, Mapping, MutableSequence, Optional
 
@@ -33,31 +34,41 @@ class JSONResultSerializer(ResultSerializer):
 
     # type error: Signature of "serialize" incompatible with supertype "ResultSerializer"
     def serialize(self, stream: IO, encoding: str = None) -> None:  # type: ignore[override]
-        res: Dict[str, Any] = {}
+        encoder = codecs.getincrementalencoder(encoding)() if encoding else None
+
+        def write(r: str) -> None:
+            if encoder is not None:
+                stream.write(encoder.encode(r))
+            else:
+                stream.write(r)
+
         if self.result.type == "ASK":
+            res: Dict[str, Any] = {}
             res["head"] = {}
             res["boolean"] = self.result.askAnswer
-        else:
-            # select
-            res["results"] = {}
-            res["head"] = {}
-            res["head"]["vars"] = self.result.vars
-            res["results"]["bindings"] = [
-                self._bindingToJSON(x) for x in self.result.bindings
-            ]
-
-        r = json.dumps(res, allow_nan=False, ensure_ascii=False)
-        if encoding is not None:
-            stream.write(r.encode(encoding))
-        else:
-            stream.write(r)
+            write(json.dumps(res, allow_nan=False, ensure_ascii=False))
+            return
+
+        # select, written a solution at a time so they need not all be kept
+        head = json.dumps({"vars": self.result.vars}, ensure_ascii=False)
+        write('{"head": %s, "results": {"bindings": [' % head)
+        sep = ""
+        for x in self.bindings():
+            write(
+                sep
+                + json.dumps(
+                    self._bindingToJSON(x), allow_nan=False, ensure_ascii=False
+                )
+            )
+            sep = ", "
+        write("]}}")
 
     def _bindingToJSON(self, b: Mapping[Variable, Identifier]) -> Dict[Variable, Any]:
         res = {}
         for var in b:
             j = termToJSON(self, b[var])
             if j is not None:
-                res[var] = termToJSON(self, b[var])
+                res[var] = j
         return res
 
 
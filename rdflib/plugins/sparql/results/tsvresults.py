@@ -1,7 +1,8 @@
 """
 This implements the Tab Separated SPARQL Result Format
 
-It is implemented with pyparsing, reusing the elements from the SPARQL Parser
+The parser is implemented with pyparsing, reusing the elements from the
+SPARQL Parser
 """
 
 import codecs  # noqa: I001
@@ -29,8 +30,8 @@ from rdflib.plugins.sparql.parser import (
     Var,
 )
 from rdflib.plugins.sparql.parserutils import Comp, CompValue, Param
-from rdflib.query import Result, ResultParser
-from rdflib.term import BNode
+from rdflib.query import Result, ResultParser, ResultSerializer
+from rdflib.term import BNode, Identifier
 from rdflib.term import Literal as RDFLiteral
 from rdflib.term import URIRef
 
@@ -102,3 +103,42 @@ class TSVResultParser(ResultParser):
                 raise Exception("I dont know how to handle this: %s" % (t,))
         else:
             return t
+
+
+# the characters escaped in strings, which may not hold tabs or line breaks
+_ESCAPES = {
+    ord("\\"): "\\\\",
+    ord('"'): '\\"',
+    ord("\n"): "\\n",
+    ord("\r"): "\\r",
+    ord("\t"): "\\t",
+}
+
+
+class TSVResultSerializer(ResultSerializer):
+    def __init__(self, result: Result):
+        ResultSerializer.__init__(self, result)
+        if result.type != "SELECT":
+            raise Exception("TSVSerializer can only serialize select query results")
+
+    def serialize(self, stream: IO, encoding: str = "utf-8", **kwargs) -> None:
+        stream = codecs.getwriter(encoding)(stream)  # type: ignore[assignment]
+
+        vs = self.result.vars or []
+        stream.write("\t".join("?" + v for v in vs) + "\n")
+        for row in self.bindings():
+            stream.write("\t".join(self.serializeTerm(row.get(v)) for v in vs) + "\n")
+
+    def serializeTerm(self, term: typing.Optional[Identifier]) -> str:
+        if term is None:
+            return ""
+        elif isinstance(term, RDFLiteral):
+            # always in the short form, which the parser reads back as it was
+            r = '"%s"' % term.translate(_ESCAPES)
+            if term.language is not None:
+                r += "@" + term.language
+            elif term.datatype is not None:
+                r += "^^<%s>" % term.datatype
+            return r
+        else:
+            return term.n3()
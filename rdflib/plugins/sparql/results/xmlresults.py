@@ -165,7 +165,7 @@ class XMLResultSerializer(ResultSerializer):
             # type error: Argument 1 to "write_header" of "SPARQLXMLWriter" has incompatible type "Optional[List[Variable]]"; expected "Sequence[Variable]"
             writer.write_header(self.result.vars)  # type: ignore[arg-type]
             writer.write_results_header()
-            for b in self.result.bindings:
+            for b in self.bindings():
                 writer.write_start_result()
                 for key, val in b.items():
                     writer.write_binding(key, val)
@@ -3,11 +3,15 @@ from __future__ import annotations
 import collections
 import datetime
 import itertools
+import os
+import threading
+import time
 import typing as t
-from collections.abc import Mapping, MutableMapping
+from collections.abc import ItemsView, Mapping, MutableMapping
 from typing import (
     TYPE_CHECKING,
     Any,
+    Callable,
     Container,
     Dict,
     Generator,
@@ -29,6 +33,7 @@ from rdflib.term import BNode, Identifier, Literal, Node, URIRef, Variable
 
 if TYPE_CHECKING:
     from rdflib.paths import Path
+    from rdflib.plugins.sparql.explain import QueryProfile
 
 
 _AnyT = TypeVar("_AnyT")
@@ -56,6 +61,153 @@ class SPARQLTypeError(SPARQLError):
         SPARQLError.__init__(self, msg)
 
 
+class QueryInterrupted(Exception):  # noqa: N818
+    """
+    The evaluation of a query was stopped by its :class:`QueryLimits`.
+
+    This is not a :class:`SPARQLError`, which would be taken for an error
+    in the expression being evaluated when it is raised.
+    """
+
+
+class QueryTimeout(QueryInterrupted):
+    """The query ran past its deadline"""
+
+
+class QueryCancelled(QueryInterrupted):
+    """The query was cancelled"""
+
+
+class QueryLimitExceeded(QueryInterrupted):
+    """The query computed too many intermediate solutions or used too much memory"""
+
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+# the sizes of the process in pages, where the system has /proc
+_STATM = "/proc/self/statm"
+
+
+def _residentMemory() -> Optional[int]:
+    """
+    The memory the process uses now in bytes, or None if it is not known.
+    The peak use getrusage reports elsewhere would stop all later queries
+    once it was over a limit, so it is not used.
+    """
+    try:
+        with open(_STATM, "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class QueryLimits:
+    """
+    Bounds on the evaluation of one query, checked as its solutions are
+    computed: the BGPs, joins and property paths being evaluated raise a
+    :class:`QueryInterrupted` once one of them is exceeded.
+
+    :param timeout: the seconds the query may run for, from now
+    :param maxRows: the number of intermediate solutions the query may
+        compute, e.g. the matches of its triple patterns and the results
+        of its joins
+    :param maxMemory: the memory in bytes above which the process stops
+        the query, as the operating system reports it in /proc; a
+        ValueError is raised where it does not
+    :param cancel: an event cancelling the query when set, see also
+        :meth:`cancel`
+    """
+
+    # the number of steps between two looks at the clock and the event, and
+    # at the memory of the process
+    CLOCK_INTERVAL = 128
+    MEMORY_INTERVAL = 4096
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        maxRows: Optional[int] = None,
+        maxMemory: Optional[int] = None,
+        cancel: Optional[threading.Event] = None,
+    ):
+        self.timeout = timeout
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.maxRows = maxRows
+        self.maxMemory = maxMemory
+        if maxMemory is not None and _residentMemory() is None:
+            raise ValueError("The memory used cannot be measured on this platform")
+        self.cancelled = cancel if cancel is not None else threading.Event()
+        self.rows = 0
+        self._steps = 0
+        self._nextClock = self.CLOCK_INTERVAL
+        self._nextMemory = self.MEMORY_INTERVAL
+
+    def cancel(self) -> None:
+        """
+        Stop the query the next time its limits are checked, from any thread
+        """
+        self.cancelled.set()
+
+    def check(self, rows: int = 0, steps: int = 1) -> None:
+        """
+        Count rows intermediate solutions and steps of work done, e.g. the
+        partial solutions a match was tried with, and check the limits.
+        The clock, the cancel event and the memory are only looked at
+        every so many steps.
+        """
+        if rows:
+            self.rows += rows
+            if self.maxRows is not None and self.rows > self.maxRows:
+                raise QueryLimitExceeded(
+                    "Query computed more than %d intermediate solutions" % self.maxRows
+                )
+        self._steps += steps
+        if self._steps >= self._nextClock:
+            self._nextClock = self._steps + self.CLOCK_INTERVAL
+            memory = self._steps >= self._nextMemory
+            if memory:
+                self._nextMemory = self._steps + self.MEMORY_INTERVAL
+            self.checkNow(memory)
+
+    def checkNow(self, memory: bool = True) -> None:
+        """
+        Check the deadline, the cancel event and, if memory is set, the
+        memory used
+        """
+        if self.cancelled.is_set():
+            raise QueryCancelled("Query was cancelled")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise QueryTimeout("Query ran for more than %s seconds" % self.timeout)
+        if memory and self.maxMemory is not None:
+            used = _residentMemory()
+            if used is not None and used > self.maxMemory:
+                raise QueryLimitExceeded(
+                    "Query stopped with %d bytes of memory used, more than %d"
+                    % (used, self.maxMemory)
+                )
+
+    @classmethod
+    def default(cls) -> Optional[QueryLimits]:
+        """
+        The limits given by SPARQL_QUERY_TIMEOUT, SPARQL_MAX_ROWS and
+        SPARQL_MAX_MEMORY, None if there are none. SPARQL_MAX_MEMORY is left
+        out where the memory used cannot be measured.
+        """
+        timeout = rdflib.plugins.sparql.SPARQL_QUERY_TIMEOUT
+        maxRows = rdflib.plugins.sparql.SPARQL_MAX_ROWS
+        maxMemory = rdflib.plugins.sparql.SPARQL_MAX_MEMORY
+        if maxMemory is not None and _residentMemory() is None:
+            # not measurable here
+            maxMemory = None
+        if timeout is None and maxRows is None and maxMemory is None:
+            return None
+        return cls(timeout, maxRows, maxMemory)
+
+
 class Bindings(MutableMapping):
 
     """
@@ -122,6 +274,8 @@ class FrozenDict(Mapping):
 
     """
 
+    __slots__ = ("_d", "_hash")
+
     def __init__(self, *args: Any, **kwargs: Any):
         self._d: Dict[Identifier, Identifier] = dict(*args, **kwargs)
         self._hash: Optional[int] = None
@@ -177,6 +331,8 @@ class FrozenDict(Mapping):
 
 
 class FrozenBindings(FrozenDict):
+    __slots__ = ("ctx",)
+
     def __init__(self, ctx: "QueryContext", *args, **kwargs):
         FrozenDict.__init__(self, *args, **kwargs)
         self.ctx = ctx
@@ -246,6 +402,248 @@ class FrozenBindings(FrozenDict):
         return FrozenBindings(self.ctx, (x for x in self.items() if x[0] in these))
 
 
+class SolutionSlots:
+    """
+    The variables of a query, each assigned a fixed slot index when the
+    query is translated. See SlotBindings.
+    """
+
+    __slots__ = ("variables", "index")
+
+    def __init__(self, variables: Iterable[Identifier]):
+        self.variables: Tuple[Identifier, ...] = tuple(variables)
+        self.index: Dict[Identifier, int] = {v: i for i, v in enumerate(self.variables)}
+
+    def __len__(self) -> int:
+        return len(self.variables)
+
+    def __repr__(self) -> str:
+        return "SolutionSlots(%r)" % (self.variables,)
+
+    def getter(
+        self, key: Identifier, fallback: Callable[[Any], Any]
+    ) -> Callable[[Any], Any]:
+        """
+        A function reading the value of key from its slot, when given a
+        SlotBindings of these slots with key bound, and calling fallback
+        with the solution otherwise
+        """
+        i = self.index.get(key)
+        if i is None:
+            return fallback
+
+        def _get(ctx: Any) -> Any:
+            if type(ctx) is SlotBindings and ctx._slots is self:
+                v = ctx._v[i]
+                if v is not None:
+                    return v
+            return fallback(ctx)
+
+        return _get
+
+
+class _SlotItemsView(ItemsView):
+    def __iter__(self):
+        # type error: "Mapping[Any, Any]" has no attribute "_iteritems"
+        return self._mapping._iteritems()  # type: ignore[attr-defined]
+
+
+class SlotBindings(FrozenBindings):
+    """
+    FrozenBindings keeping the values of the query's variables in a tuple,
+    at the slots of the context's SolutionSlots, with None for unbound
+    variables. Bindings of any other variables are kept in a dict, which is
+    usually empty.
+
+    Solutions of the same query share their SolutionSlots, so merging and
+    comparing them is done slot by slot, without building dicts.
+    """
+
+    __slots__ = ("_slots", "_v")
+
+    def __init__(self, ctx: "QueryContext", *args, **kwargs):
+        slots = ctx.slots
+        if slots is None:
+            raise ValueError("SlotBindings need a context with slots")
+        values: List[Optional[Identifier]] = [None] * len(slots)
+        other: Dict[Identifier, Identifier] = {}
+        index = slots.index
+        for k, v in dict(*args, **kwargs).items():
+            i = index.get(k)
+            if i is None:
+                other[k] = v
+            else:
+                values[i] = v
+        self.ctx = ctx
+        self._slots = slots
+        self._v: Tuple[Optional[Identifier], ...] = tuple(values)
+        self._d = other
+        self._hash = None
+
+    @classmethod
+    def _make(
+        cls,
+        ctx: "QueryContext",
+        values: Tuple[Optional[Identifier], ...],
+        other: Dict[Identifier, Identifier],
+    ) -> "SlotBindings":
+        """
+        Create solution from its slot values and other bindings, which are
+        used as they are (and must not be modified afterwards)
+        """
+        res = cls.__new__(cls)
+        res.ctx = ctx
+        # type error: Incompatible types in assignment (expression has type "Optional[SolutionSlots]", variable has type "SolutionSlots")
+        res._slots = ctx.slots  # type: ignore[assignment]
+        res._v = values
+        res._d = other
+        res._hash = None
+        return res
+
+    def _iteritems(self) -> Generator[Tuple[Identifier, Identifier], None, None]:
+        for k, v in zip(self._slots.variables, self._v):
+            if v is not None:
+                yield k, v
+        yield from self._d.items()
+
+    def _sameSlots(self, other: Any) -> bool:
+        return isinstance(other, SlotBindings) and other._slots is self._slots
+
+    def __iter__(self):
+        for k, v in zip(self._slots.variables, self._v):
+            if v is not None:
+                yield k
+        yield from self._d
+
+    def __len__(self) -> int:
+        return len(self._v) - self._v.count(None) + len(self._d)
+
+    def items(self) -> _SlotItemsView:  # type: ignore[override]
+        return _SlotItemsView(self)
+
+    def __getitem__(self, key: Union[Identifier, str]) -> Identifier:
+        if not isinstance(key, Node):
+            key = Variable(key)
+
+        if not isinstance(key, (BNode, Variable)):
+            return key
+
+        i = self._slots.index.get(key)
+        if i is not None:
+            v = self._v[i]
+            if v is not None:
+                return v
+        elif key in self._d:
+            return self._d[key]
+        # type error: Value of type "Optional[Dict[Variable, Identifier]]" is not indexable
+        return self.ctx.initBindings[key]  # type: ignore[index]
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            # same as FrozenDict.__hash__, so equal solutions hash alike
+            # whatever their type
+            h = 0
+            for key, value in self._iteritems():
+                h ^= hash(key)
+                h ^= hash(value)
+            self._hash = h
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        if self._sameSlots(other):
+            return self._v == other._v and self._d == other._d
+        return FrozenBindings.__eq__(self, other)
+
+    def project(self, vars: Container[Variable]) -> "SlotBindings":
+        return SlotBindings._make(
+            self.ctx,
+            tuple(
+                v if v is not None and k in vars else None
+                for k, v in zip(self._slots.variables, self._v)
+            ),
+            {k: v for k, v in self._d.items() if k in vars} if self._d else self._d,
+        )
+
+    def remember(self, these) -> "SlotBindings":
+        return self.project(these)
+
+    def disjointDomain(self, other: t.Mapping[Identifier, Identifier]) -> bool:
+        if self._sameSlots(other):
+            # type error: "Mapping[Identifier, Identifier]" has no attribute "_v"
+            for a, b in zip(self._v, other._v):  # type: ignore[attr-defined]
+                if a is not None and b is not None:
+                    return False
+            # type error: "Mapping[Identifier, Identifier]" has no attribute "_d"
+            return not (self._d and other._d and set(self._d).intersection(other._d))  # type: ignore[attr-defined]
+        return FrozenBindings.disjointDomain(self, other)
+
+    def compatible(self, other: t.Mapping[Identifier, Identifier]) -> bool:
+        if self._sameSlots(other):
+            # type error: "Mapping[Identifier, Identifier]" has no attribute "_v"
+            for a, b in zip(self._v, other._v):  # type: ignore[attr-defined]
+                if a is not None and b is not None and a != b:
+                    return False
+            if not self._d:
+                return True
+        return FrozenBindings.compatible(self, other)
+
+    def merge(self, other: t.Mapping[Identifier, Identifier]) -> "SlotBindings":
+        if self._sameSlots(other):
+            # values from other win, as in FrozenDict.merge
+            # type error: "Mapping[Identifier, Identifier]" has no attribute "_v"
+            values = tuple(
+                b if b is not None else a for a, b in zip(self._v, other._v)  # type: ignore[attr-defined]
+            )
+            # type error: "Mapping[Identifier, Identifier]" has no attribute "_d"
+            if other._d:  # type: ignore[attr-defined]
+                return SlotBindings._make(self.ctx, values, {**self._d, **other._d})  # type: ignore[attr-defined]
+            return SlotBindings._make(self.ctx, values, self._d)
+
+        _values = list(self._v)
+        _other = self._d
+        index = self._slots.index
+        for k, v in other.items():
+            i = index.get(k)
+            if i is None:
+                if _other is self._d:
+                    _other = dict(self._d)
+                _other[k] = v
+            else:
+                _values[i] = v
+        return SlotBindings._make(self.ctx, tuple(_values), _other)
+
+    def forget(
+        self, before: "QueryContext", _except: Optional[Container[Variable]] = None
+    ) -> "SlotBindings":
+        """
+        return a frozen dict only of bindings made in self
+        since before
+        """
+        if not _except:
+            _except = []
+        # type error: Unsupported right operand type for in ("Optional[Dict[Variable, Identifier]]")
+        init: Container[Identifier] = self.ctx.initBindings or ()  # type: ignore[assignment]
+
+        def keep(k: Identifier) -> bool:
+            # type error: Unsupported right operand type for in ("Optional[Container[Variable]]")
+            return k in _except or k in init or before[k] is None  # type: ignore[operator]
+
+        return SlotBindings._make(
+            self.ctx,
+            tuple(
+                v if v is not None and keep(k) else None
+                for k, v in zip(self._slots.variables, self._v)
+            ),
+            {k: v for k, v in self._d.items() if keep(k)} if self._d else self._d,
+        )
+
+    def __str__(self) -> str:
+        return str(dict(self._iteritems()))
+
+    def __repr__(self) -> str:
+        return repr(dict(self._iteritems()))
+
+
 class QueryContext:
     """
     Query context - passed along when evaluating the query
@@ -276,6 +674,12 @@ class QueryContext:
 
         self.prologue: Optional[Prologue] = None
         self._now: Optional[datetime.datetime] = None
+        # slots assigned to the variables of the query, see SlotBindings
+        self.slots: Optional[SolutionSlots] = None
+        # the bounds checked as the query is evaluated, if any
+        self.limits: Optional[QueryLimits] = None
+        # the statistics collected as the query is evaluated, if any
+        self.profile: Optional[QueryProfile] = None
 
         self.bnodes: t.MutableMapping[Identifier, BNode] = collections.defaultdict(
             BNode
@@ -298,6 +702,9 @@ class QueryContext:
         r.prologue = self.prologue
         r.graph = self.graph
         r.bnodes = self.bnodes
+        r.slots = self.slots
+        r.limits = self.limits
+        r.profile = self.profile
         return r
 
     @property
@@ -385,12 +792,11 @@ class QueryContext:
         """
         Return a static copy of the current variable bindings as dict
         """
+        cls = FrozenBindings if self.slots is None else SlotBindings
         if vars:
-            return FrozenBindings(
-                self, ((k, v) for k, v in self.bindings.items() if k in vars)
-            )
+            return cls(self, ((k, v) for k, v in self.bindings.items() if k in vars))
         else:
-            return FrozenBindings(self, self.bindings.items())
+            return cls(self, self.bindings.items())
 
     def __setitem__(self, key: str, value: str) -> None:
         if key in self.bindings and self.bindings[key] != value:
@@ -469,6 +875,7 @@ class Query:
     def __init__(self, prologue: Prologue, algebra: CompValue):
         self.prologue = prologue
         self.algebra = algebra
+        self.slots: Optional[SolutionSlots] = None
         self._original_args: Tuple[str, Mapping[str, str], Optional[str]]
 
 
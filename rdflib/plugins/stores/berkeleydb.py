@@ -9,7 +9,13 @@ from rdflib.store import NO_STORE, VALID_STORE, Store
 from rdflib.term import Identifier, Node, URIRef
 
 if TYPE_CHECKING:
-    from rdflib.graph import Graph, _ContextType, _TriplePatternType, _TripleType
+    from rdflib.graph import (
+        Graph,
+        _ContextType,
+        _PredicateType,
+        _TriplePatternType,
+        _TripleType,
+    )
 
 
 def bb(u: str) -> bytes:
@@ -243,6 +249,9 @@ class BerkeleyDB(Store):
         self.__i2k.set_flags(dbsetflags)
         self.__i2k.open("i2k", dbname, db.DB_RECNO, dbopenflags, dbmode)
 
+        # predicate statistics, computed on demand and reset on writes
+        self.__predicate_stats: Dict[str, Tuple[int, int, int]] = {}
+
         self.__needs_sync = False
         t = Thread(target=self.__sync_run)
         t.setDaemon(True)
@@ -340,6 +349,7 @@ class BerkeleyDB(Store):
                 cpos.put(bb("%s^%s^%s^%s^" % ("", p, o, s)), contexts_value, txn=txn)
                 cosp.put(bb("%s^%s^%s^%s^" % ("", o, s, p)), contexts_value, txn=txn)
 
+            self.__predicate_stats.pop(p, None)
             self.__needs_sync = True
 
     def __remove(
@@ -389,6 +399,11 @@ class BerkeleyDB(Store):
         Store.remove(self, (subject, predicate, object), context)
         _to_string = self._to_string
 
+        if predicate is not None:
+            self.__predicate_stats.pop(_to_string(predicate, txn=txn), None)
+        else:
+            self.__predicate_stats.clear()
+
         if context is not None:
             if context == self:
                 context = None
@@ -544,6 +559,50 @@ class BerkeleyDB(Store):
         cursor.close()
         return count
 
+    def predicate_statistics(
+        self,
+        predicate: "_PredicateType",
+        context: Optional["_ContextType"] = None,
+    ) -> Tuple[int, int, int]:
+        """
+        Statistics for the given predicate over all contexts, ``context`` is
+        ignored. They are computed with one scan of the predicate's entries
+        in the conjunctive pos index and kept until the predicate is next
+        written to.
+        """
+        assert self.__open, "The Store must be open."
+        p = self._to_string(predicate)
+        try:
+            return self.__predicate_stats[p]
+        except KeyError:
+            pass
+
+        prefix = bb("^%s^" % p)
+        index = self.__indicies[1]
+        cursor = index.cursor()
+        try:
+            current = cursor.set_range(prefix)
+        except db.DBNotFoundError:
+            current = None
+        triples = 0
+        subjects = set()
+        objects = set()
+        while current:
+            key, value = current
+            if key.startswith(prefix):
+                _, _, o, s, _ = key.split("^".encode("latin-1"))
+                triples += 1
+                subjects.add(s)
+                objects.add(o)
+                # Hack to stop 2to3 converting this to next(cursor)
+                current = getattr(cursor, "next")()
+            else:
+                break
+        cursor.close()
+
+        stats = self.__predicate_stats[p] = (triples, len(subjects), len(objects))
+        return stats
+
     def bind(self, prefix: str, namespace: "URIRef", override: bool = True) -> None:
         # NOTE on type error: this is because the variables are reused with
         # another type.
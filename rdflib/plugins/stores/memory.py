@@ -2,22 +2,29 @@
 #
 from __future__ import annotations
 
+from array import array
+from contextlib import contextmanager
+from threading import Lock
 from typing import (
     TYPE_CHECKING,
     Any,
     Collection,
     Dict,
+    FrozenSet,
     Generator,
+    Iterable,
     Iterator,
+    List,
     Mapping,
     Optional,
     Set,
     Tuple,
+    TypeVar,
     Union,
     overload,
 )
 
-from rdflib.store import Store
+from rdflib.store import Store, TripleAddedEvent
 from rdflib.util import _coalesce
 
 if TYPE_CHECKING:
@@ -26,18 +33,28 @@ if TYPE_CHECKING:
         _ContextType,
         _ObjectType,
         _PredicateType,
+        _QuadType,
         _SubjectType,
         _TriplePatternType,
         _TripleType,
     )
     from rdflib.plugins.sparql.sparql import Query, Update
     from rdflib.query import Result
-    from rdflib.term import Identifier, URIRef
+    from rdflib.term import Identifier, Node, URIRef
 
-__all__ = ["SimpleMemory", "Memory"]
+__all__ = ["SimpleMemory", "Memory", "EncodedMemory"]
 
 ANY: None = None
 
+_T = TypeVar("_T")
+
+# Memory.triples copies the dicts and sets up to this size rather than
+# tracking its iteration over them
+_COPIED_SIZE = 16
+
+# Memory.addN adds the triples of each context in batches of up to this size
+_BATCH_SIZE = 10000
+
 
 class SimpleMemory(Store):
     """\
@@ -88,6 +105,7 @@ class SimpleMemory(Store):
         # add dictionary entries for spo[s][p][p] = 1 and pos[p][o][s]
         # = 1, creating the nested dictionaries where they do not yet
         # exits.
+        Store.add(self, triple, context, quoted=quoted)
         subject, predicate, object = triple
         spo = self.__spo
         try:
@@ -127,6 +145,7 @@ class SimpleMemory(Store):
         triple_pattern: "_TriplePatternType",
         context: Optional["_ContextType"] = None,
     ) -> None:
+        Store.remove(self, triple_pattern, context)
         for (subject, predicate, object), c in list(self.triples(triple_pattern)):
             del self.__spo[subject][predicate][object]
             del self.__pos[predicate][object][subject]
@@ -306,13 +325,32 @@ class Memory(Store):
 
         self.__namespace: Dict[str, "URIRef"] = {}
         self.__prefix: Dict["URIRef", str] = {}
-        self.__context_obj_map: Dict[str, "Graph"] = {}
-        self.__tripleContexts: Dict["_TripleType", Dict[Optional[str], bool]] = {}
-        self.__contextTriples: Dict[Optional[str], Set["_TripleType"]] = {None: set()}
+        # the key of each context by its identifier, and the context for each
+        # key; the key of the default context is 0
+        self.__context_keys: Dict["Node", int] = {}
+        self.__context_obj_map: Dict[int, "Graph"] = {}
+        # the keys of the contexts of each triple, negated where the triple is
+        # quoted, for triples not in the same contexts as the first triple
+        self.__tripleContexts: Dict["_TripleType", FrozenSet[int]] = {}
+        self.__contextTriples: Dict[int, Set["_TripleType"]] = {0: set()}
         # all contexts used in store (unencoded)
         self.__all_contexts: Set["Graph"] = set()
         # default context information for triples
-        self.__defaultContexts: Optional[Dict[Optional[str], bool]] = None
+        self.__defaultContexts: Optional[FrozenSet[int]] = None
+        # each set of context keys, shared by all the triples in it
+        self.__contextSets: Dict[FrozenSet[int], FrozenSet[int]] = {}
+        # [triples, distinct subjects, distinct objects] for each predicate
+        self.__predicateStats: Dict["_PredicateType", List[int]] = {}
+        # the number of triples() iterating over each dict and set, by id;
+        # these are copied rather than changed. Readers in several threads
+        # count themselves in and out under the lock.
+        self.__iterated: Dict[int, int] = {}
+        self.__iteratedLock = Lock()
+        # the triples loaded in bulk not in __pos and __osp yet, None if not
+        # loading in bulk, and the terms in them to share equal ones
+        self.__unindexed: Optional[List["_TripleType"]] = None
+        self.__bulkTerms: Dict["Node", "Node"] = {}
+        self.__bulkLoads = 0
 
     def add(
         self,
@@ -323,82 +361,98 @@ class Memory(Store):
         """\
         Add a triple to the store of triples.
         """
-        # add dictionary entries for spo[s][p][p] = 1 and pos[p][o][s]
-        # = 1, creating the nested dictionaries where they do not yet
-        # exits.
-        Store.add(self, triple, context, quoted=quoted)
-        if context is not None:
-            self.__all_contexts.add(context)
-        subject, predicate, object_ = triple
-
-        spo = self.__spo
-        try:
-            po = spo[subject]
-        except LookupError:
-            po = spo[subject] = {}
-        try:
-            o = po[predicate]
-        except LookupError:
-            o = po[predicate] = {}
-
-        try:
-            _ = o[object_]
-            # This cannot be reached if (s, p, o) was not inserted before.
-            triple_exists = True
-        except KeyError:
-            o[object_] = 1
-            triple_exists = False
-        self.__add_triple_context(triple, triple_exists, context, quoted)
-
-        if triple_exists:
-            # No need to insert twice this triple.
+        # the events are only made if something is subscribed to them
+        if self.dispatcher.subscribed(TripleAddedEvent):
+            Store.add(self, triple, context, quoted=quoted)
+        self.__add(triple, context, quoted)
+
+    def addN(self, quads: Iterable["_QuadType"]) -> None:  # noqa: N802
+        if self.dispatcher.subscribed(TripleAddedEvent):
+            # the triples are added one by one as their events are dispatched
+            Store.addN(self, quads)
             return
-
-        pos = self.__pos
-        try:
-            os = pos[predicate]
-        except LookupError:
-            os = pos[predicate] = {}
-        try:
-            s = os[object_]
-        except LookupError:
-            s = os[object_] = {}
-        s[subject] = 1
-
-        osp = self.__osp
-        try:
-            sp = osp[object_]
-        except LookupError:
-            sp = osp[object_] = {}
+        ctx_key = self.__ctx_key
+        batch: List["_TripleType"] = []
+        context: Optional["_ContextType"] = None
+        key = None
+        for s, p, o, c in quads:
+            assert c is not None, "Context associated with %s %s %s is None!" % (
+                s,
+                p,
+                o,
+            )
+            if c is not context:
+                # the same context may be given by several graphs
+                c_key = ctx_key(c)
+                if c_key != key and batch:
+                    # type error: Argument 2 to "__add_batch" of "Memory" has incompatible type "Optional[Graph]"; expected "Graph"
+                    self.__add_batch(batch, context)  # type: ignore[arg-type]
+                    batch = []
+                context = c
+                key = c_key
+            if len(batch) >= _BATCH_SIZE:
+                self.__add_batch(batch, context)  # type: ignore[arg-type]
+                batch = []
+            batch.append((s, p, o))
+        if batch:
+            self.__add_batch(batch, context)  # type: ignore[arg-type]
+
+    @contextmanager
+    def bulk_load(self) -> Generator[None, None, None]:
+        """
+        Triples added in bulk are only added to the subject index as they
+        are added, the other indexes are built in one pass when the
+        outermost bulk load ends, or before a lookup needs them. Equal
+        terms are shared meanwhile, which makes the lookups cheaper.
+        """
+        if self.__unindexed is None:
+            self.__unindexed = []
+        self.__bulkLoads += 1
         try:
-            p = sp[subject]
-        except LookupError:
-            p = sp[subject] = {}
-        p[predicate] = 1
+            yield
+        finally:
+            self.__bulkLoads -= 1
+            if not self.__bulkLoads:
+                unindexed = self.__unindexed
+                self.__unindexed = None
+                self.__bulkTerms = {}
+                self.__index(unindexed)
 
     def remove(
         self,
         triple_pattern: "_TriplePatternType",
         context: Optional["_ContextType"] = None,
     ) -> None:
-        req_ctx = self.__ctx_to_str(context)
+        Store.remove(self, triple_pattern, context)
+        self.__index_unindexed()
+        req_ctx = self.__ctx_key(context)
         for triple, c in self.triples(triple_pattern, context=context):
             subject, predicate, object_ = triple
-            for ctx in self.__get_context_for_triple(triple):
-                if context is not None and req_ctx != ctx:
-                    continue
-                self.__remove_triple_context(triple, ctx)
-            ctxs = self.__get_context_for_triple(triple, skipQuoted=True)
-            if None in ctxs and (context is None or len(ctxs) == 1):
-                # remove from default graph too
-                self.__remove_triple_context(triple, None)
-            if len(self.__get_context_for_triple(triple)) == 0:
-                del self.__spo[subject][predicate][object_]
-                del self.__pos[predicate][object_][subject]
-                del self.__osp[object_][subject][predicate]
-                del self.__tripleContexts[triple]
+            ctxs = self.__tripleContexts.get(triple, self.__defaultContexts)
+            if context is None:
+                removed = ctxs
+            else:
+                # type error: Unsupported left operand type for & ("None")
+                removed = ctxs & {req_ctx, -req_ctx}  # type: ignore[operator]
+                if {c for c in ctxs - removed if c >= 0} == {0}:
+                    # remove from default graph too
+                    removed |= {0}
+            for ctx in removed:
+                self.__writable(self.__contextTriples, abs(ctx)).discard(triple)
+            # type error: Unsupported left operand type for - ("None")
+            self.__set_triple_contexts(triple, ctxs - removed)  # type: ignore[operator]
+            if ctxs == removed:
+                del self.__writable(self.__spo[subject], predicate)[object_]
+                del self.__writable(self.__pos[predicate], object_)[subject]
+                del self.__writable(self.__osp[object_], subject)[predicate]
+                stats = self.__predicateStats[predicate]
+                stats[0] -= 1
+                if not self.__spo[subject][predicate]:
+                    stats[1] -= 1
+                if not self.__pos[predicate][object_]:
+                    stats[2] -= 1
         if (
-            req_ctx is not None
+            req_ctx
             and req_ctx in self.__contextTriples
             and len(self.__contextTriples[req_ctx]) == 0
         ):
@@ -424,15 +478,23 @@ class Memory(Store):
         None,
     ]:
         """A generator over all the triples matching"""
-        req_ctx = self.__ctx_to_str(context)
+        req_ctx = self.__ctx_key(context)
         subject, predicate, object_ = triple_pattern
+        if req_ctx not in self.__contextTriples:
+            # no triples in the given graph
+            return
+        if subject is None and self.__unindexed:
+            # the lookup may need the indexes still to be built
+            self.__index_unindexed()
+        contextTriples = self.__contextTriples  # noqa: N806
+        # the dicts and sets are iterated over as they are, the store copies
+        # those it changes meanwhile
+        live = self.__live
 
         # all triples case (no triple parts given as pattern)
         if subject is None and predicate is None and object_ is None:
             # Just dump all known triples from the given graph
-            if req_ctx not in self.__contextTriples:
-                return
-            for triple in self.__contextTriples[req_ctx].copy():
+            for triple in live(contextTriples[req_ctx]):
                 yield triple, self.__contexts(triple)
 
         # optimize "triple in graph" case (all parts given)
@@ -443,7 +505,7 @@ class Memory(Store):
             triple = triple_pattern  # type: ignore[assignment]
             try:
                 _ = self.__spo[subject][predicate][object_]
-                if self.__triple_has_context(triple, req_ctx):
+                if triple in contextTriples.get(req_ctx, ()):
                     yield triple, self.__contexts(triple)
             except KeyError:
                 return
@@ -457,30 +519,30 @@ class Memory(Store):
                         if object_ is not None:  # subject+predicate+object is given
                             if object_ in subjectDictionary[predicate]:
                                 triple = (subject, predicate, object_)
-                                if self.__triple_has_context(triple, req_ctx):
+                                if triple in contextTriples.get(req_ctx, ()):
                                     yield triple, self.__contexts(triple)
                             else:  # given object not found
                                 pass
                         else:  # subject+predicate is given, object unbound
-                            for o in list(subjectDictionary[predicate].keys()):
+                            for o in live(subjectDictionary[predicate]):
                                 triple = (subject, predicate, o)
-                                if self.__triple_has_context(triple, req_ctx):
+                                if triple in contextTriples.get(req_ctx, ()):
                                     yield triple, self.__contexts(triple)
                     else:  # given predicate not found
                         pass
                 else:  # subject given, predicate unbound
-                    for p in list(subjectDictionary.keys()):
+                    for p in live(subjectDictionary):
                         if object_ is not None:  # object is given
                             if object_ in subjectDictionary[p]:
                                 triple = (subject, p, object_)
-                                if self.__triple_has_context(triple, req_ctx):
+                                if triple in contextTriples.get(req_ctx, ()):
                                     yield triple, self.__contexts(triple)
                             else:  # given object not found
                                 pass
                         else:  # object unbound
-                            for o in list(subjectDictionary[p].keys()):
+                            for o in live(subjectDictionary[p]):
                                 triple = (subject, p, o)
-                                if self.__triple_has_context(triple, req_ctx):
+                                if triple in contextTriples.get(req_ctx, ()):
                                     yield triple, self.__contexts(triple)
             else:  # given subject not found
                 pass
@@ -490,36 +552,36 @@ class Memory(Store):
                 predicateDictionary = pos[predicate]  # noqa: N806
                 if object_ is not None:  # predicate+object is given, subject unbound
                     if object_ in predicateDictionary:
-                        for s in list(predicateDictionary[object_].keys()):
+                        for s in live(predicateDictionary[object_]):
                             triple = (s, predicate, object_)
-                            if self.__triple_has_context(triple, req_ctx):
+                            if triple in contextTriples.get(req_ctx, ()):
                                 yield triple, self.__contexts(triple)
                     else:  # given object not found
                         pass
                 else:  # predicate is given, object+subject unbound
-                    for o in list(predicateDictionary.keys()):
-                        for s in list(predicateDictionary[o].keys()):
+                    for o in live(predicateDictionary):
+                        for s in live(predicateDictionary[o]):
                             triple = (s, predicate, o)
-                            if self.__triple_has_context(triple, req_ctx):
+                            if triple in contextTriples.get(req_ctx, ()):
                                 yield triple, self.__contexts(triple)
         elif object_ is not None:  # object is given, subject+predicate unbound
             osp = self.__osp
             if object_ in osp:
                 objectDictionary = osp[object_]  # noqa: N806
-                for s in list(objectDictionary.keys()):
-                    for p in list(objectDictionary[s].keys()):
+                for s in live(objectDictionary):
+                    for p in live(objectDictionary[s]):
                         triple = (s, p, object_)
-                        if self.__triple_has_context(triple, req_ctx):
+                        if triple in contextTriples.get(req_ctx, ()):
                             yield triple, self.__contexts(triple)
         else:  # subject+predicate+object unbound
             # Shouldn't get here if all other cases above worked correctly.
             spo = self.__spo
             for s in list(spo.keys()):
                 subjectDictionary = spo[s]  # noqa: N806
-                for p in list(subjectDictionary.keys()):
-                    for o in list(subjectDictionary[p].keys()):
+                for p in live(subjectDictionary):
+                    for o in live(subjectDictionary[p]):
                         triple = (s, p, o)
-                        if self.__triple_has_context(triple, req_ctx):
+                        if triple in contextTriples.get(req_ctx, ()):
                             yield triple, self.__contexts(triple)
 
     def bind(self, prefix: str, namespace: "URIRef", override: bool = True) -> None:
@@ -571,11 +633,27 @@ class Memory(Store):
         except KeyError:
             return (_ for _ in [])
 
+    def predicate_statistics(
+        self,
+        predicate: "_PredicateType",
+        context: Optional["_ContextType"] = None,
+    ) -> Tuple[int, int, int]:
+        """
+        Statistics for the given predicate, maintained as triples are added
+        and removed. These cover all contexts, ``context`` is ignored.
+        """
+        self.__index_unindexed()
+        try:
+            triples, subjects, objects = self.__predicateStats[predicate]
+        except KeyError:
+            return 0, 0, 0
+        return triples, subjects, objects
+
     def __len__(self, context: Optional["_ContextType"] = None) -> int:
-        ctx = self.__ctx_to_str(context)
-        if ctx not in self.__contextTriples:
+        ctx_triples = self.__contextTriples.get(self.__ctx_key(context))
+        if ctx_triples is None:
             return 0
-        return len(self.__contextTriples[ctx])
+        return len(ctx_triples)
 
     def add_graph(self, graph: "Graph") -> None:
         if not self.graph_aware:
@@ -594,6 +672,178 @@ class Memory(Store):
                 pass  # we didn't know this graph, no problem
 
     # internal utility methods below
+    def __add(
+        self,
+        triple: "_TripleType",
+        context: "_ContextType",
+        quoted: bool,
+    ) -> None:
+        """add the triple to the subject index and to its contexts, and to the
+        other indexes unless loading in bulk"""
+        # add dictionary entries for spo[s][p][p] = 1 and pos[p][o][s]
+        # = 1, creating the nested dictionaries where they do not yet
+        # exits.
+        if context is not None:
+            self.__all_contexts.add(context)
+        subject, predicate, object_ = triple
+        unindexed = self.__unindexed
+        if unindexed is not None:
+            terms = self.__bulkTerms
+            subject = terms.setdefault(subject, subject)
+            predicate = terms.setdefault(predicate, predicate)
+            object_ = terms.setdefault(object_, object_)
+            triple = (subject, predicate, object_)
+
+        spo = self.__spo
+        try:
+            po = spo[subject]
+        except LookupError:
+            po = spo[subject] = {}
+        try:
+            o = po[predicate]
+        except LookupError:
+            po = self.__writable(spo, subject)
+            o = po[predicate] = {}
+
+        try:
+            _ = o[object_]
+            # This cannot be reached if (s, p, o) was not inserted before.
+            triple_exists = True
+        except KeyError:
+            o = self.__writable(po, predicate)
+            o[object_] = 1
+            triple_exists = False
+        self.__add_triple_context(triple, triple_exists, context, quoted)
+
+        if triple_exists:
+            # No need to insert twice this triple.
+            return
+
+        try:
+            stats = self.__predicateStats[predicate]
+        except LookupError:
+            stats = self.__predicateStats[predicate] = [0, 0, 0]
+        stats[0] += 1
+        if len(o) == 1:
+            # first object for this subject and predicate
+            stats[1] += 1
+
+        if unindexed is not None:
+            unindexed.append(triple)
+        else:
+            self.__index((triple,))
+
+    def __add_batch(
+        self, triples: List["_TripleType"], context: "_ContextType"
+    ) -> None:
+        """add the triples to the context like __add, those not in the store
+        yet together"""
+        self.__all_contexts.add(context)
+        ctx = self.__ctx_key(context)
+        unindexed = self.__unindexed
+        terms = self.__bulkTerms if unindexed is not None else None
+        # nothing needs to be copied if nothing is iterated over
+        writable = self.__writable if self.__iterated else dict.__getitem__
+        spo = self.__spo
+        predicateStats = self.__predicateStats  # noqa: N806
+        new: Dict["_TripleType", None] = {}
+        for triple in triples:
+            subject, predicate, object_ = triple
+            if terms is not None:
+                subject = terms.setdefault(subject, subject)
+                predicate = terms.setdefault(predicate, predicate)
+                object_ = terms.setdefault(object_, object_)
+                triple = (subject, predicate, object_)
+
+            try:
+                po = spo[subject]
+            except LookupError:
+                po = spo[subject] = {}
+            try:
+                o = po[predicate]
+            except LookupError:
+                po = writable(spo, subject)
+                o = po[predicate] = {}
+            if object_ in o:
+                if triple not in new:
+                    self.__add_triple_context(triple, True, context, False)
+                continue
+            o = writable(po, predicate)
+            o[object_] = 1
+            new[triple] = None
+
+            try:
+                stats = predicateStats[predicate]
+            except LookupError:
+                stats = predicateStats[predicate] = [0, 0, 0]
+            stats[0] += 1
+            if len(o) == 1:
+                # first object for this subject and predicate
+                stats[1] += 1
+
+        if not new:
+            return
+        # the new triples are all in the context and the default context
+        ctxs = frozenset((ctx, 0))
+        ctxs = self.__contextSets.setdefault(ctxs, ctxs)
+        if self.__defaultContexts is None:
+            self.__defaultContexts = ctxs
+        if ctxs is not self.__defaultContexts:
+            self.__tripleContexts.update(dict.fromkeys(new, ctxs))
+        contextTriples = self.__contextTriples  # noqa: N806
+        for key in (0, ctx):
+            if key in contextTriples:
+                writable(contextTriples, key).update(new)
+            else:
+                contextTriples[key] = set(new)
+
+        if unindexed is not None:
+            unindexed.extend(new)
+        else:
+            self.__index(new)
+
+    def __index(self, triples: Iterable["_TripleType"]) -> None:
+        """add the triples in the subject index to the other indexes"""
+        pos = self.__pos
+        osp = self.__osp
+        predicateStats = self.__predicateStats  # noqa: N806
+        # nothing needs to be copied if nothing is iterated over
+        writable = self.__writable if self.__iterated else dict.__getitem__
+        for subject, predicate, object_ in triples:
+            try:
+                os = pos[predicate]
+            except LookupError:
+                os = pos[predicate] = {}
+            try:
+                s = os[object_]
+            except LookupError:
+                os = writable(pos, predicate)
+                s = os[object_] = {}
+            s = writable(os, object_)
+            s[subject] = 1
+            if len(s) == 1:
+                # first subject for this predicate and object
+                predicateStats[predicate][2] += 1
+
+            try:
+                sp = osp[object_]
+            except LookupError:
+                sp = osp[object_] = {}
+            try:
+                p = sp[subject]
+            except LookupError:
+                sp = writable(osp, object_)
+                p = sp[subject] = {}
+            p = writable(sp, subject)
+            p[predicate] = 1
+
+    def __index_unindexed(self) -> None:
+        """index the triples loaded in bulk so far, for a lookup"""
+        if self.__unindexed:
+            unindexed = self.__unindexed
+            self.__unindexed = []
+            self.__index(unindexed)
+
     def __add_triple_context(
         self,
         triple: "_TripleType",
@@ -602,121 +852,118 @@ class Memory(Store):
         quoted: bool,
     ) -> None:
         """add the given context to the set of contexts for the triple"""
-        ctx = self.__ctx_to_str(context)
+        ctx = self.__ctx_key(context)
         quoted = bool(quoted)
+        member = -ctx if quoted else ctx
         if triple_exists:
             # we know the triple exists somewhere in the store
-            try:
-                triple_context = self.__tripleContexts[triple]
-            except KeyError:
-                # triple exists with default ctx info
-                # start with a copy of the default ctx info
-                # type error: Item "None" of "Optional[Dict[Optional[str], bool]]" has no attribute "copy"
-                triple_context = self.__tripleContexts[
-                    triple
-                ] = self.__defaultContexts.copy()  # type: ignore[union-attr]
-
-            triple_context[ctx] = quoted
-
+            ctxs = self.__tripleContexts.get(triple, self.__defaultContexts)
+            # type error: Unsupported left operand type for - ("None")
+            ctxs = ctxs - {ctx, -ctx} | {member}  # type: ignore[operator]
             if not quoted:
-                triple_context[None] = quoted
-
-        else:
-            # the triple didn't exist before in the store
-            if quoted:  # this context only
-                triple_context = self.__tripleContexts[triple] = {ctx: quoted}
-            else:  # default context as well
-                triple_context = self.__tripleContexts[triple] = {
-                    ctx: quoted,
-                    None: quoted,
-                }
+                ctxs |= {0}
+        elif quoted:  # this context only
+            ctxs = frozenset((member,))
+        else:  # default context as well
+            ctxs = frozenset((member, 0))
+        self.__set_triple_contexts(triple, ctxs)
 
         # if the triple is not quoted add it to the default context
         if not quoted:
-            self.__contextTriples[None].add(triple)
+            self.__add_to_context(triple, 0)
 
         # always add the triple to given context, making sure it's initialized
-        if ctx not in self.__contextTriples:
-            self.__contextTriples[ctx] = set()
-        self.__contextTriples[ctx].add(triple)
+        self.__add_to_context(triple, ctx)
 
+    def __add_to_context(self, triple: "_TripleType", ctx: int) -> None:
+        try:
+            if triple in self.__contextTriples[ctx]:
+                return
+        except KeyError:
+            self.__contextTriples[ctx] = {triple}
+            return
+        self.__writable(self.__contextTriples, ctx).add(triple)
+
+    def __live(self, container: Collection[_T]) -> Iterable[_T]:
+        """iterate over the dict or set without copying it, it is copied
+        instead if it is changed meanwhile"""
+        if len(container) <= _COPIED_SIZE:
+            return list(container)
+        return self.__iterate(container)
+
+    def __iterate(self, container: Collection[_T]) -> Generator[_T, None, None]:
+        key = id(container)
+        iterated = self.__iterated
+        with self.__iteratedLock:
+            iterated[key] = iterated.get(key, 0) + 1
+        try:
+            yield from container
+        finally:
+            with self.__iteratedLock:
+                if iterated[key] == 1:
+                    del iterated[key]
+                else:
+                    iterated[key] -= 1
+
+    def __writable(self, parent: Dict[Any, Any], key: Any) -> Any:
+        """parent[key], to change, copied first if it is being iterated over"""
+        container = parent[key]
+        if self.__iterated and id(container) in self.__iterated:
+            container = parent[key] = container.copy()
+        return container
+
+    def __set_triple_contexts(
+        self, triple: "_TripleType", ctxs: FrozenSet[int]
+    ) -> None:
+        """set the context keys of the triple, sharing equal sets"""
+        ctxs = self.__contextSets.setdefault(ctxs, ctxs)
         # if this is the first ever triple in the store, set default ctx info
         if self.__defaultContexts is None:
-            self.__defaultContexts = triple_context
+            self.__defaultContexts = ctxs
         # if the context info is the same as default, no need to store it
-        if triple_context == self.__defaultContexts:
-            del self.__tripleContexts[triple]
-
-    def __get_context_for_triple(
-        self, triple: "_TripleType", skipQuoted: bool = False  # noqa: N803
-    ) -> Collection[Optional[str]]:
-        """return a list of contexts (str) for the triple, skipping
-        quoted contexts if skipQuoted==True"""
-
-        ctxs = self.__tripleContexts.get(triple, self.__defaultContexts)
-
-        if not skipQuoted:
-            # type error: Item "None" of "Optional[Dict[Optional[str], bool]]" has no attribute "keys"
-            return ctxs.keys()  # type: ignore[union-attr]
-
-        # type error: Item "None" of "Optional[Dict[Optional[str], bool]]" has no attribute "items"
-        return [ctx for ctx, quoted in ctxs.items() if not quoted]  # type: ignore[union-attr]
-
-    def __triple_has_context(self, triple: "_TripleType", ctx: Optional[str]) -> bool:
-        """return True if the triple exists in the given context"""
-        # type error: Unsupported right operand type for in ("Optional[Dict[Optional[str], bool]]")
-        return ctx in self.__tripleContexts.get(triple, self.__defaultContexts)  # type: ignore[operator]
-
-    def __remove_triple_context(self, triple: "_TripleType", ctx):
-        """remove the context from the triple"""
-        # type error: Item "None" of "Optional[Dict[Optional[str], bool]]" has no attribute "copy"
-        ctxs = self.__tripleContexts.get(triple, self.__defaultContexts).copy()  # type: ignore[union-attr]
-        del ctxs[ctx]
-        if ctxs == self.__defaultContexts:
-            del self.__tripleContexts[triple]
+        if ctxs is self.__defaultContexts or not ctxs:
+            self.__tripleContexts.pop(triple, None)
         else:
             self.__tripleContexts[triple] = ctxs
-        self.__contextTriples[ctx].remove(triple)
 
     @overload
-    def __ctx_to_str(self, ctx: "_ContextType") -> str:
+    def __ctx_key(self, ctx: "_ContextType") -> int:
         ...
 
     @overload
-    def __ctx_to_str(self, ctx: None) -> None:
+    def __ctx_key(self, ctx: None) -> int:
         ...
 
-    def __ctx_to_str(self, ctx: Optional["_ContextType"]) -> Optional[str]:
+    def __ctx_key(self, ctx: Optional["_ContextType"]) -> int:
+        """the key of the context, 0 for the default context"""
         if ctx is None:
-            return None
+            return 0
+        # ctx could be a graph. In that case, use its identifier
+        identifier = getattr(ctx, "identifier", ctx)
         try:
-            # ctx could be a graph. In that case, use its identifier
-            ctx_str = "{}:{}".format(ctx.identifier.__class__.__name__, ctx.identifier)
-            self.__context_obj_map[ctx_str] = ctx
-            return ctx_str
-        except AttributeError:
-            # otherwise, ctx should be a URIRef or BNode or str
-            # NOTE on type errors: This is actually never called with ctx value as str in all unit tests, so this seems like it should just not be here.
-            # type error: Subclass of "Graph" and "str" cannot exist: would have incompatible method signatures
-            if isinstance(ctx, str):  # type: ignore[unreachable]
-                # type error: Statement is unreachable
-                ctx_str = "{}:{}".format(ctx.__class__.__name__, ctx)  # type: ignore[unreachable]
-                if ctx_str in self.__context_obj_map:
-                    return ctx_str
-                self.__context_obj_map[ctx_str] = ctx
-                return ctx_str
+            return self.__context_keys[identifier]
+        except KeyError:
+            pass
+        except TypeError:
+            raise RuntimeError("Cannot use that type of object as a Graph context")
+        # otherwise, ctx should be a URIRef or BNode or str
+        if identifier is ctx and not isinstance(ctx, str):
             raise RuntimeError("Cannot use that type of object as a Graph context")
+        key = self.__context_keys[identifier] = len(self.__context_keys) + 1
+        self.__context_obj_map[key] = ctx
+        return key
 
     def __contexts(
         self, triple: "_TripleType"
     ) -> Generator["_ContextType", None, None]:
         """return a generator for all the non-quoted contexts
         (dereferenced) the encoded triple appears in"""
-        # type error: Argument 2 to "get" of "Mapping" has incompatible type "str"; expected "Optional[Graph]"
+        obj_map = self.__context_obj_map
+        # type error: Item "None" of "Optional[FrozenSet[int]]" has no attribute "__iter__" (not iterable)
         return (
-            self.__context_obj_map.get(ctx_str, ctx_str)  # type: ignore[arg-type]
-            for ctx_str in self.__get_context_for_triple(triple, skipQuoted=True)
-            if ctx_str is not None
+            obj_map[ctx]
+            for ctx in self.__tripleContexts.get(triple, self.__defaultContexts)  # type: ignore[union-attr]
+            if ctx > 0
         )
 
     # type error: Missing return statement
@@ -739,3 +986,560 @@ class Memory(Store):
         **kwargs,
     ) -> None:
         super(Memory, self).update(update, initNs, initBindings, queryGraph, **kwargs)
+
+
+# The indexes of EncodedMemory map the id of the first term of a triple to the
+# ids of the other two: a (second, third) tuple while there is one such
+# triple, then a dict from the second to the thirds. The thirds are an int
+# while there is one, then an array and, past _ARRAY_SIZE, a set.
+_ARRAY_SIZE = 64
+# the triples are keyed by the ids of their terms packed into one int
+_ID_BITS = 32
+_ID_MASK = (1 << _ID_BITS) - 1
+
+_Thirds = Union[int, "array[int]", Set[int]]
+_Level = Union[Tuple[int, int], Dict[int, _Thirds]]
+
+
+def _index_add(index: Dict[int, _Level], a: int, b: int, c: int) -> bool:
+    """
+    Add (a, b, c) to the index, which does not hold it, and return whether
+    it is the first c for (a, b)
+    """
+    try:
+        level = index[a]
+    except KeyError:
+        index[a] = (b, c)
+        return True
+    if type(level) is tuple:
+        level = index[a] = {level[0]: level[1]}
+    try:
+        thirds = level[b]
+    except KeyError:
+        level[b] = c
+        return True
+    if type(thirds) is int:
+        level[b] = array("q", (thirds, c))
+    elif type(thirds) is array and len(thirds) < _ARRAY_SIZE:
+        thirds.append(c)
+    elif type(thirds) is array:
+        level[b] = {*thirds, c}
+    else:
+        thirds.add(c)
+    return False
+
+
+def _index_remove(index: Dict[int, _Level], a: int, b: int, c: int) -> bool:
+    """
+    Remove (a, b, c), which the index holds, and return whether it was the
+    last c for (a, b)
+    """
+    level = index[a]
+    if type(level) is tuple:
+        del index[a]
+        return True
+    thirds = level[b]
+    last = type(thirds) is int
+    if last:
+        del level[b]
+    else:
+        thirds.remove(c)
+        if len(thirds) == 1:
+            level[b] = next(iter(thirds))
+    if len(level) == 1:
+        ((b, thirds),) = level.items()
+        if type(thirds) is int:
+            index[a] = (b, thirds)
+    return last
+
+
+def _index_has(index: Dict[int, _Level], a: int, b: int, c: int) -> bool:
+    level = index.get(a)
+    if level is None:
+        return False
+    if type(level) is tuple:
+        return level == (b, c)
+    thirds = level.get(b)
+    if thirds is None:
+        return False
+    if type(thirds) is int:
+        return thirds == c
+    return c in thirds
+
+
+def _index_thirds(index: Dict[int, _Level], a: int, b: int) -> Tuple[int, ...]:
+    level = index.get(a)
+    if level is None:
+        return ()
+    if type(level) is tuple:
+        return (level[1],) if level[0] == b else ()
+    thirds = level.get(b)
+    if thirds is None:
+        return ()
+    return (thirds,) if type(thirds) is int else tuple(thirds)
+
+
+def _index_pairs(index: Dict[int, _Level], a: int) -> List[Tuple[int, int]]:
+    level = index.get(a)
+    if level is None:
+        return []
+    if type(level) is tuple:
+        return [level]
+    return [
+        (b, c)
+        for b, thirds in list(level.items())
+        for c in ((thirds,) if type(thirds) is int else tuple(thirds))
+    ]
+
+
+class EncodedMemory(Store):
+    """\
+    An in memory implementation of a triple store, for graphs too large for
+    Memory.
+
+    Each term is given an integer id once and the triples are indexed by the
+    ids of their terms, in ints, arrays and sets of ints rather than in
+    dicts of terms, which takes a fraction of the memory. The terms are
+    looked up by their ids as matching triples are returned.
+
+    Context-aware, Graph-aware and Formula-aware like Memory.
+    """
+
+    context_aware = True
+    formula_aware = True
+    graph_aware = True
+
+    def __init__(
+        self,
+        configuration: Optional[str] = None,
+        identifier: Optional["Identifier"] = None,
+    ):
+        super(EncodedMemory, self).__init__(configuration)
+        self.identifier = identifier
+
+        # the id of each term, the term for each id and the number of triples
+        # using it; the ids of terms no longer used are given out again
+        self.__ids: Dict["Node", int] = {}
+        self.__terms: List[Optional["Node"]] = []
+        self.__uses = array("q")
+        self.__free: List[int] = []
+
+        # indexed by [subject][predicate][object]
+        self.__spo: Dict[int, _Level] = {}
+        # indexed by [predicate][object][subject]
+        self.__pos: Dict[int, _Level] = {}
+        # indexed by [object][subject][predicate]
+        self.__osp: Dict[int, _Level] = {}
+
+        self.__namespace: Dict[str, "URIRef"] = {}
+        self.__prefix: Dict["URIRef", str] = {}
+
+        # the id of each context by its identifier, and the context for each
+        # id; the default context is 0
+        self.__contextIds: Dict["Node", int] = {}
+        self.__contextObjs: Dict[int, "_ContextType"] = {}
+        # the contexts of each triple, negated where the triple is quoted, for
+        # the triples not in the contexts of the first triple added
+        self.__tripleContexts: Dict[int, FrozenSet[int]] = {}
+        self.__defaultContexts: FrozenSet[int] = frozenset()
+        # each set of contexts, shared by all the triples in it
+        self.__contextSets: Dict[FrozenSet[int], FrozenSet[int]] = {}
+        # the triples of each context but the default one
+        self.__contextTriples: Dict[int, Set[int]] = {}
+        self.__defaultLen = 0
+        # all contexts used in store (unencoded)
+        self.__all_contexts: Set["Graph"] = set()
+        # [triples, distinct subjects, distinct objects] for each predicate
+        self.__predicateStats: Dict[int, List[int]] = {}
+        # changed as triples are removed, for triples() to notice
+        self.__generation = 0
+
+    def add(
+        self,
+        triple: "_TripleType",
+        context: "_ContextType",
+        quoted: bool = False,
+    ) -> None:
+        """\
+        Add a triple to the store of triples.
+        """
+        Store.add(self, triple, context, quoted=quoted)
+        if context is not None:
+            self.__all_contexts.add(context)
+        subject, predicate, object_ = triple
+        s, p, o = self.__id(subject), self.__id(predicate), self.__id(object_)
+        key = (s << _ID_BITS | p) << _ID_BITS | o
+        ctx = self.__context_id(context, create=True)
+        member = -ctx if quoted and ctx else ctx
+
+        if _index_has(self.__spo, s, p, o):
+            old = self.__tripleContexts.get(key, self.__defaultContexts)
+            new = (old - {ctx, -ctx}) | {member}
+            if not quoted:
+                new |= {0}
+            self.__set_contexts(key, old, new)
+            return
+
+        self.__set_contexts(
+            key, frozenset(), frozenset((member,) if quoted else (member, 0))
+        )
+        uses = self.__uses
+        uses[s] += 1
+        uses[p] += 1
+        uses[o] += 1
+        first_object = _index_add(self.__spo, s, p, o)
+        first_subject = _index_add(self.__pos, p, o, s)
+        _index_add(self.__osp, o, s, p)
+
+        try:
+            stats = self.__predicateStats[p]
+        except KeyError:
+            stats = self.__predicateStats[p] = [0, 0, 0]
+        stats[0] += 1
+        if first_object:
+            stats[1] += 1
+        if first_subject:
+            stats[2] += 1
+
+    def remove(
+        self,
+        triple_pattern: "_TriplePatternType",
+        context: Optional["_ContextType"] = None,
+    ) -> None:
+        Store.remove(self, triple_pattern, context)
+        ctx = self.__context_id(context)
+        if ctx is None:
+            return
+        for key in list(self.__match(triple_pattern, ctx)):
+            old = self.__tripleContexts.get(key, self.__defaultContexts)
+            if context is None:
+                new: FrozenSet[int] = frozenset()
+            else:
+                new = old - {ctx, -ctx}
+                if {c for c in new if c >= 0} == {0}:
+                    # only in the default context, remove it from there too
+                    new = new - {0}
+            self.__set_contexts(key, old, new)
+            if new:
+                continue
+
+            self.__generation += 1
+            s, p, o = key >> 2 * _ID_BITS, key >> _ID_BITS & _ID_MASK, key & _ID_MASK
+            last_object = _index_remove(self.__spo, s, p, o)
+            last_subject = _index_remove(self.__pos, p, o, s)
+            _index_remove(self.__osp, o, s, p)
+            stats = self.__predicateStats[p]
+            stats[0] -= 1
+            if last_object:
+                stats[1] -= 1
+            if last_subject:
+                stats[2] -= 1
+            if not stats[0]:
+                del self.__predicateStats[p]
+            self.__release(s)
+            self.__release(p)
+            self.__release(o)
+
+    def triples(
+        self,
+        triple_pattern: "_TriplePatternType",
+        context: Optional["_ContextType"] = None,
+    ) -> Generator[
+        Tuple["_TripleType", Generator[Optional["_ContextType"], None, None]],
+        None,
+        None,
+    ]:
+        """A generator over all the triples matching"""
+        ctx = self.__context_id(context)
+        if ctx is None:
+            return
+        terms = self.__terms
+        generation = self.__generation
+        for key in self.__match(triple_pattern, ctx):
+            triple = (
+                terms[key >> 2 * _ID_BITS],
+                terms[key >> _ID_BITS & _ID_MASK],
+                terms[key & _ID_MASK],
+            )
+            if generation != self.__generation and not self.__has(
+                key, triple, triple_pattern
+            ):
+                # removed since the matches were found
+                continue
+            # type error: Incompatible types in "yield"
+            yield triple, self.__contexts(key)  # type: ignore[misc]
+
+    def bind(self, prefix: str, namespace: "URIRef", override: bool = True) -> None:
+        # should be identical to `Memory.bind`
+        bound_namespace = self.__namespace.get(prefix)
+        bound_prefix = _coalesce(
+            self.__prefix.get(namespace),
+            # type error: error: Argument 1 to "get" of "Mapping" has incompatible type "Optional[URIRef]"; expected "URIRef"
+            self.__prefix.get(bound_namespace),  # type: ignore[arg-type]
+        )
+        if override:
+            if bound_prefix is not None:
+                del self.__namespace[bound_prefix]
+            if bound_namespace is not None:
+                del self.__prefix[bound_namespace]
+            self.__prefix[namespace] = prefix
+            self.__namespace[prefix] = namespace
+        else:
+            # type error: Invalid index type "Optional[URIRef]" for "Dict[URIRef, str]"; expected type "URIRef"
+            self.__prefix[_coalesce(bound_namespace, namespace)] = _coalesce(  # type: ignore[index]
+                bound_prefix, default=prefix
+            )
+            # type error: Invalid index type "Optional[str]" for "Dict[str, URIRef]"; expected type "str"
+            # type error: Incompatible types in assignment (expression has type "Optional[URIRef]", target has type "URIRef")
+            self.__namespace[_coalesce(bound_prefix, prefix)] = _coalesce(  # type: ignore[index]
+                bound_namespace, default=namespace
+            )
+
+    def namespace(self, prefix: str) -> Optional["URIRef"]:
+        return self.__namespace.get(prefix, None)
+
+    def prefix(self, namespace: "URIRef") -> Optional[str]:
+        return self.__prefix.get(namespace, None)
+
+    def namespaces(self) -> Iterator[Tuple[str, "URIRef"]]:
+        for prefix, namespace in self.__namespace.items():
+            yield prefix, namespace
+
+    def contexts(
+        self, triple: Optional["_TripleType"] = None
+    ) -> Generator["_ContextType", None, None]:
+        if triple is None or triple == (None, None, None):
+            return (context for context in self.__all_contexts)
+
+        try:
+            s, p, o = (self.__ids[t] for t in triple)
+        except KeyError:
+            return (_ for _ in [])
+        if not _index_has(self.__spo, s, p, o):
+            return (_ for _ in [])
+        return self.__contexts((s << _ID_BITS | p) << _ID_BITS | o)
+
+    def predicate_statistics(
+        self,
+        predicate: "_PredicateType",
+        context: Optional["_ContextType"] = None,
+    ) -> Tuple[int, int, int]:
+        """
+        Statistics for the given predicate, maintained as triples are added
+        and removed. These cover all contexts, ``context`` is ignored.
+        """
+        try:
+            triples, subjects, objects = self.__predicateStats[self.__ids[predicate]]
+        except KeyError:
+            return 0, 0, 0
+        return triples, subjects, objects
+
+    def __len__(self, context: Optional["_ContextType"] = None) -> int:
+        ctx = self.__context_id(context)
+        if ctx is None:
+            return 0
+        if ctx == 0:
+            return self.__defaultLen
+        return len(self.__contextTriples.get(ctx, ()))
+
+    def add_graph(self, graph: "Graph") -> None:
+        if not self.graph_aware:
+            Store.add_graph(self, graph)
+        else:
+            self.__all_contexts.add(graph)
+
+    def remove_graph(self, graph: "Graph") -> None:
+        if not self.graph_aware:
+            Store.remove_graph(self, graph)
+        else:
+            self.remove((None, None, None), graph)
+            try:
+                self.__all_contexts.remove(graph)
+            except KeyError:
+                pass  # we didn't know this graph, no problem
+
+    # internal utility methods below
+    def __id(self, term: "Node") -> int:
+        """the id of the term, given one if it has none"""
+        try:
+            return self.__ids[term]
+        except KeyError:
+            pass
+        if self.__free:
+            i = self.__free.pop()
+            self.__terms[i] = term
+        else:
+            i = len(self.__terms)
+            if i > _ID_MASK:
+                raise RuntimeError("Too many terms for an EncodedMemory store")
+            self.__terms.append(term)
+            self.__uses.append(0)
+        self.__ids[term] = i
+        return i
+
+    def __release(self, i: int) -> None:
+        """a triple using the term with id i was removed"""
+        self.__uses[i] -= 1
+        if not self.__uses[i]:
+            del self.__ids[self.__terms[i]]
+            self.__terms[i] = None
+            self.__free.append(i)
+
+    def __context_id(
+        self, context: Optional["_ContextType"], create: bool = False
+    ) -> Optional[int]:
+        """the id of the context, None if it has none and create is False"""
+        if context is None:
+            return 0
+        # context could be a graph. In that case, use its identifier
+        identifier = getattr(context, "identifier", context)
+        try:
+            return self.__contextIds[identifier]
+        except KeyError:
+            if not create:
+                return None
+        ctx = self.__contextIds[identifier] = len(self.__contextIds) + 1
+        self.__contextObjs[ctx] = context
+        return ctx
+
+    def __set_contexts(self, key: int, old: FrozenSet[int], new: FrozenSet[int]):
+        """change the contexts of the triple with key from old to new"""
+        if 0 in new and 0 not in old:
+            self.__defaultLen += 1
+        elif 0 in old and 0 not in new:
+            self.__defaultLen -= 1
+        contextTriples = self.__contextTriples  # noqa: N806
+        for ctx in {abs(c) for c in new if c} - {abs(c) for c in old if c}:
+            try:
+                contextTriples[ctx].add(key)
+            except KeyError:
+                contextTriples[ctx] = {key}
+        for ctx in {abs(c) for c in old if c} - {abs(c) for c in new if c}:
+            triples = contextTriples[ctx]
+            triples.discard(key)
+            if not triples:
+                del contextTriples[ctx]
+
+        if not self.__defaultContexts:
+            self.__defaultContexts = new
+        if new == self.__defaultContexts or not new:
+            self.__tripleContexts.pop(key, None)
+        else:
+            self.__tripleContexts[key] = self.__contextSets.setdefault(new, new)
+
+    def __match(self, triple_pattern: "_TriplePatternType", ctx: int) -> Iterator[int]:
+        """the keys of the triples matching the pattern in the context"""
+        try:
+            s, p, o = (None if t is None else self.__ids[t] for t in triple_pattern)
+        except KeyError:
+            # a term of the pattern is in no triple
+            return iter(())
+
+        keys: Iterable[int]
+        if s is not None:
+            if p is not None:
+                if o is not None:
+                    found = _index_has(self.__spo, s, p, o)
+                    keys = [(s << _ID_BITS | p) << _ID_BITS | o] if found else []
+                else:
+                    keys = [
+                        (s << _ID_BITS | p) << _ID_BITS | o_
+                        for o_ in _index_thirds(self.__spo, s, p)
+                    ]
+            elif o is not None:
+                keys = [
+                    (s << _ID_BITS | p_) << _ID_BITS | o
+                    for p_ in _index_thirds(self.__osp, o, s)
+                ]
+            else:
+                keys = [
+                    (s << _ID_BITS | p_) << _ID_BITS | o_
+                    for p_, o_ in _index_pairs(self.__spo, s)
+                ]
+        elif p is not None:
+            if o is not None:
+                keys = [
+                    (s_ << _ID_BITS | p) << _ID_BITS | o
+                    for s_ in _index_thirds(self.__pos, p, o)
+                ]
+            else:
+                keys = [
+                    (s_ << _ID_BITS | p) << _ID_BITS | o_
+                    for o_, s_ in _index_pairs(self.__pos, p)
+                ]
+        elif o is not None:
+            keys = [
+                (s_ << _ID_BITS | p_) << _ID_BITS | o
+                for s_, p_ in _index_pairs(self.__osp, o)
+            ]
+        elif ctx:
+            return iter(list(self.__contextTriples.get(ctx, ())))
+        else:
+            spo = self.__spo
+            keys = (
+                (s_ << _ID_BITS | p_) << _ID_BITS | o_
+                for s_ in list(spo)
+                for p_, o_ in _index_pairs(spo, s_)
+            )
+
+        if ctx:
+            triples = self.__contextTriples.get(ctx, set())
+            return (key for key in keys if key in triples)
+        tripleContexts = self.__tripleContexts  # noqa: N806
+        default = self.__defaultContexts
+        if not tripleContexts and 0 in default:
+            # all the triples are in the default context
+            return iter(keys)
+        return (key for key in keys if 0 in tripleContexts.get(key, default))
+
+    def __has(
+        self, key: int, triple: "_TripleType", triple_pattern: "_TriplePatternType"
+    ) -> bool:
+        """whether the triple with key is still in the store and matches"""
+        if None in triple:
+            return False
+        for t, term in zip(triple_pattern, triple):
+            if t is not None and t != term:
+                # its ids were given to other terms
+                return False
+        return _index_has(
+            self.__spo,
+            key >> 2 * _ID_BITS,
+            key >> _ID_BITS & _ID_MASK,
+            key & _ID_MASK,
+        )
+
+    def __contexts(self, key: int) -> Generator["_ContextType", None, None]:
+        """return a generator for all the non-quoted contexts the triple
+        with key appears in"""
+        objs = self.__contextObjs
+        return (
+            objs[c]
+            for c in self.__tripleContexts.get(key, self.__defaultContexts)
+            if c > 0
+        )
+
+    # type error: Missing return statement
+    def query(  # type: ignore[return]
+        self,
+        query: Union["Query", str],
+        initNs: Mapping[str, Any],  # noqa: N803
+        initBindings: Mapping["str", "Identifier"],  # noqa: N803
+        queryGraph: "str",  # noqa: N803
+        **kwargs,
+    ) -> "Result":
+        super(EncodedMemory, self).query(
+            query, initNs, initBindings, queryGraph, **kwargs
+        )
+
+    def update(
+        self,
+        update: Union["Update", Any],
+        initNs: Mapping[str, Any],  # noqa: N803
+        initBindings: Mapping["str", "Identifier"],  # noqa: N803
+        queryGraph: "str",  # noqa: N803
+        **kwargs,
+    ) -> None:
+        super(EncodedMemory, self).update(
+            update, initNs, initBindings, queryGraph, **kwargs
+        )
@@ -0,0 +1,343 @@
+"""
+Binary snapshots of graphs in the in-memory stores
+
+:func:`dump` writes a graph held in a
+:class:`~rdflib.plugins.stores.memory.Memory`,
+:class:`~rdflib.plugins.stores.memory.SimpleMemory` or
+:class:`~rdflib.plugins.stores.memory.EncodedMemory` store to a binary file,
+and :func:`load` reads it back into a new store of the same kind, much faster
+than parsing the graph from an RDF syntax::
+
+    >>> from io import BytesIO
+    >>> from rdflib import Dataset, URIRef
+    >>> from rdflib.plugins.stores.snapshot import dump, load
+    >>> ds = Dataset()
+    >>> _ = ds.graph(URIRef("urn:g")).add((URIRef("urn:a"), URIRef("urn:p"), URIRef("urn:b")))
+    >>> f = BytesIO()
+    >>> dump(ds, f)
+    >>> _ = f.seek(0)
+    >>> restored = load(f)
+    >>> len(restored.graph(URIRef("urn:g")))
+    1
+
+A snapshot holds each term once, and the triples of each context as an
+array of the numbers of their terms. The store builds its indexes from
+these as it loads them in bulk. Its layout, with little-endian numbers, is:
+
+* the magic bytes ``RDFSNAP`` and a NUL, and the version of the layout as
+  a 16-bit number
+* the name of the store plugin
+* the terms: their number, a byte for the kind of each, the lengths in code
+  points of their strings (the value of each term, and the language of each
+  literal), the numbers of the datatypes of the literals and of the
+  identifiers of the formulas, plus one, and the strings, in UTF-8. The
+  terms a term refers to come before it.
+* the namespace bindings: their number, then the prefix and namespace of each
+* the graph: its kind, whether its default graph is the union of its
+  graphs, and the number of its identifier
+* the contexts: their number, then the kind of each, the number of its
+  identifier, plus one, the number of its triples and their terms. The
+  triples of a context-aware store in its default context only come last,
+  as a context of their own.
+
+The numbers, counts and lengths are 32-bit, and each string outside the term
+table is its length in bytes followed by its UTF-8 bytes.
+"""
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from pathlib import PurePath
+from typing import IO, TYPE_CHECKING, Dict, List, Tuple, Type, Union
+
+from rdflib.graph import ConjunctiveGraph, Dataset, Graph, QuotedGraph
+from rdflib.plugins.stores.memory import EncodedMemory, Memory, SimpleMemory
+from rdflib.store import Store
+from rdflib.term import BNode, Literal, URIRef, Variable
+
+if TYPE_CHECKING:
+    from rdflib.graph import _ContextType
+    from rdflib.term import Node
+
+__all__ = ["dump", "load"]
+
+_MAGIC = b"RDFSNAP\0"
+_VERSION = 1
+
+_STORES: Dict[str, Type[Store]] = {
+    "Memory": Memory,
+    "SimpleMemory": SimpleMemory,
+    "EncodedMemory": EncodedMemory,
+}
+
+# the kinds of the terms
+_URIREF, _BNODE, _LITERAL, _VARIABLE, _FORMULA = b"UBLVF"
+# the kinds of the graphs and contexts
+_GRAPH, _CONJUNCTIVE_GRAPH, _DATASET = b"GCD"
+_QUOTED_GRAPH, _DEFAULT_CONTEXT, _NO_CONTEXT = b"Q0N"
+
+# the array type of 32-bit numbers
+_ID_TYPE = "I" if array("I").itemsize == 4 else "L"
+
+_COUNT = struct.Struct("<I")
+
+
+class _Terms:
+    """
+    The terms of a snapshot being written, numbered as they are met
+    """
+
+    def __init__(self) -> None:
+        self.ids: Dict[Node, int] = {}
+        self.kinds = bytearray()
+        self.strings: List[str] = []
+        # the number of the term each literal and formula refers to, plus
+        # one: the datatype of a literal, the identifier of a formula
+        self.refs = array(_ID_TYPE)
+
+    def id(self, term: Node) -> int:
+        try:
+            return self.ids[term]
+        except KeyError:
+            pass
+        if isinstance(term, Literal):
+            datatype = 0 if term.datatype is None else self.id(term.datatype) + 1
+            self.kinds.append(_LITERAL)
+            self.strings.append(str(term))
+            self.strings.append(term.language or "")
+            self.refs.append(datatype)
+        elif isinstance(term, QuotedGraph):
+            identifier = self.id(term.identifier) + 1
+            self.kinds.append(_FORMULA)
+            self.strings.append("")
+            self.refs.append(identifier)
+        elif isinstance(term, URIRef):
+            self.kinds.append(_URIREF)
+            self.strings.append(str(term))
+        elif isinstance(term, BNode):
+            self.kinds.append(_BNODE)
+            self.strings.append(str(term))
+        elif isinstance(term, Variable):
+            self.kinds.append(_VARIABLE)
+            self.strings.append(str(term))
+        else:
+            raise ValueError("Cannot write %r to a snapshot" % (term,))
+        i = self.ids[term] = len(self.ids)
+        return i
+
+
+def _ids(values: List[int]) -> bytes:
+    ids = array(_ID_TYPE, values)
+    if sys.byteorder == "big":
+        ids.byteswap()
+    return ids.tobytes()
+
+
+def _write_str(file: IO[bytes], s: str) -> None:
+    data = s.encode("utf-8", "surrogatepass")
+    file.write(_COUNT.pack(len(data)))
+    file.write(data)
+
+
+def dump(graph: Graph, file: Union[IO[bytes], str, PurePath]) -> None:
+    """
+    Write a snapshot of graph, and of all the other graphs in its store, to
+    file, a binary file or the path of one. Its store must be one of the
+    in-memory stores.
+    """
+    if isinstance(file, (str, PurePath)):
+        with open(file, "wb") as f:
+            dump(graph, f)
+        return
+    store = graph.store
+    for name, store_type in _STORES.items():
+        if type(store) is store_type:
+            break
+    else:
+        raise ValueError("Cannot make a snapshot of a %s store" % type(store).__name__)
+
+    terms = _Terms()
+    term_id = terms.id
+    contexts: List[Tuple[int, int, List[int]]] = []
+    if store.context_aware:
+        for context in store.contexts():
+            kind = _QUOTED_GRAPH if isinstance(context, QuotedGraph) else _GRAPH
+            contexts.append((kind, term_id(context.identifier) + 1, []))
+            ids = contexts[-1][2]
+            for triple, _ in store.triples((None, None, None), context):
+                ids.extend(map(term_id, triple))
+        # contexts() does not list the default context, so the triples in
+        # no other context are written apart
+        ids = []
+        for triple, triple_contexts in store.triples((None, None, None), None):
+            if next(triple_contexts, None) is None:
+                ids.extend(map(term_id, triple))
+        if ids:
+            contexts.append((_DEFAULT_CONTEXT, 0, ids))
+    else:
+        ids = []
+        contexts.append((_NO_CONTEXT, 0, ids))
+        for triple, _ in store.triples((None, None, None), None):
+            ids.extend(map(term_id, triple))
+    namespaces = list(store.namespaces())
+    if isinstance(graph, Dataset):
+        kind = _DATASET
+    elif isinstance(graph, ConjunctiveGraph):
+        kind = _CONJUNCTIVE_GRAPH
+    else:
+        kind = _GRAPH
+    identifier = term_id(graph.identifier)
+
+    file.write(_MAGIC + struct.pack("<H", _VERSION))
+    _write_str(file, name)
+
+    file.write(_COUNT.pack(len(terms.kinds)))
+    file.write(bytes(terms.kinds))
+    file.write(_COUNT.pack(len(terms.strings)))
+    file.write(_ids([len(s) for s in terms.strings]))
+    file.write(_COUNT.pack(len(terms.refs)))
+    file.write(_ids(terms.refs))  # type: ignore[arg-type]
+    _write_str(file, "".join(terms.strings))
+
+    file.write(_COUNT.pack(len(namespaces)))
+    for prefix, namespace in namespaces:
+        _write_str(file, prefix)
+        _write_str(file, namespace)
+
+    file.write(struct.pack("<BBI", kind, graph.default_union, identifier))
+
+    file.write(_COUNT.pack(len(contexts)))
+    for kind, context_id, ids in contexts:
+        file.write(struct.pack("<BII", kind, context_id, len(ids) // 3))
+        file.write(_ids(ids))
+
+
+class _Reader:
+    def __init__(self, file: IO[bytes]):
+        self.file = file
+
+    def read(self, size: int) -> bytes:
+        data = self.file.read(size)
+        if len(data) != size:
+            raise ValueError("The snapshot is truncated")
+        return data
+
+    def unpack(self, fmt: str) -> Tuple[int, ...]:
+        return struct.unpack(fmt, self.read(struct.calcsize(fmt)))
+
+    def count(self) -> int:
+        return _COUNT.unpack(self.read(_COUNT.size))[0]
+
+    def ids(self, count: int) -> array:
+        ids = array(_ID_TYPE)
+        ids.frombytes(self.read(count * ids.itemsize))
+        if sys.byteorder == "big":
+            ids.byteswap()
+        return ids
+
+    def str(self) -> str:
+        return self.read(self.count()).decode("utf-8", "surrogatepass")
+
+
+def _terms(reader: _Reader, store: Store) -> List[Node]:
+    kinds = reader.read(reader.count())
+    lengths = reader.ids(reader.count())
+    refs = iter(reader.ids(reader.count()))
+    text = reader.str()
+    offsets = accumulate(lengths, initial=0)
+    start = next(offsets)
+    terms: List[Node] = []
+    for kind in kinds:
+        end = next(offsets)
+        value = text[start:end]
+        start = end
+        if kind == _URIREF:
+            terms.append(URIRef(value))
+        elif kind == _LITERAL:
+            end = next(offsets)
+            lang = text[start:end]
+            start = end
+            datatype = next(refs)
+            terms.append(
+                Literal(
+                    value,
+                    lang=lang or None,
+                    # type error: Argument "datatype" to "Literal" has incompatible type "Optional[Node]"; expected "Optional[str]"
+                    datatype=terms[datatype - 1] if datatype else None,  # type: ignore[arg-type]
+                    normalize=False,
+                )
+            )
+        elif kind == _BNODE:
+            terms.append(BNode(value))
+        elif kind == _VARIABLE:
+            terms.append(Variable(value))
+        elif kind == _FORMULA:
+            # type error: Argument 2 to "QuotedGraph" has incompatible type "Node"; expected "Union[IdentifiedNode, str, None]"
+            terms.append(QuotedGraph(store, terms[next(refs) - 1]))  # type: ignore[arg-type]
+        else:
+            raise ValueError("Unknown kind of term in the snapshot: %r" % kind)
+    return terms
+
+
+def load(file: Union[IO[bytes], str, PurePath]) -> Graph:
+    """
+    Read a snapshot written by :func:`dump` from file, a binary file or the
+    path of one, into a new store, and return the graph it was written from
+    """
+    if isinstance(file, (str, PurePath)):
+        with open(file, "rb") as f:
+            return load(f)
+    reader = _Reader(file)
+    magic, version = reader.unpack("<%dsH" % len(_MAGIC))
+    if magic != _MAGIC:
+        raise ValueError("Not a snapshot")
+    if version != _VERSION:
+        raise ValueError("Unsupported snapshot version %d" % version)
+    name = reader.str()
+    try:
+        store = _STORES[name]()
+    except KeyError:
+        raise ValueError("Unknown store in the snapshot: %s" % name)
+
+    terms = _terms(reader, store)
+    for _ in range(reader.count()):
+        prefix = reader.str()
+        store.bind(prefix, URIRef(reader.str()))
+
+    kind, default_union, identifier = reader.unpack("<BBI")
+    graph: Graph
+    if kind == _DATASET:
+        graph = Dataset(store, default_union=bool(default_union))
+    elif kind == _CONJUNCTIVE_GRAPH:
+        # type error: Argument "identifier" to "ConjunctiveGraph" has incompatible type "Node"; expected "Union[IdentifiedNode, str, None]"
+        graph = ConjunctiveGraph(store, identifier=terms[identifier])  # type: ignore[arg-type]
+    else:
+        graph = Graph(store, identifier=terms[identifier])  # type: ignore[arg-type]
+
+    with graph.bulk_load():
+        for _ in range(reader.count()):
+            kind, context_id, count = reader.unpack("<BII")
+            ids = iter(reader.ids(3 * count))
+            context: _ContextType
+            if kind == _NO_CONTEXT:
+                context = graph
+            elif kind == _QUOTED_GRAPH:
+                context = QuotedGraph(store, terms[context_id - 1])  # type: ignore[arg-type]
+                for s, p, o in zip(ids, ids, ids):
+                    store.add((terms[s], terms[p], terms[o]), context, quoted=True)  # type: ignore[arg-type]
+                continue
+            elif kind == _DEFAULT_CONTEXT:
+                for s, p, o in zip(ids, ids, ids):
+                    store.add((terms[s], terms[p], terms[o]), None)  # type: ignore[arg-type]
+                continue
+            else:
+                context = Graph(store, identifier=terms[context_id - 1])  # type: ignore[arg-type]
+            if not count and store.graph_aware:
+                store.add_graph(context)
+            store.addN(
+                (terms[s], terms[p], terms[o], context)  # type: ignore[misc]
+                for s, p, o in zip(ids, ids, ids)
+            )
+    return graph
@@ -10,6 +10,7 @@ from typing import (
     Any,
     BinaryIO,
     Dict,
+    Iterable,
     Iterator,
     List,
     Mapping,
@@ -259,6 +260,16 @@ class Result:
             # type error: Incompatible types in assignment (expression has type "Union[MutableSequence[Mapping[Variable, Identifier]], Iterator[Mapping[Variable, Identifier]]]", variable has type "MutableSequence[Mapping[Variable, Identifier]]")
             self._bindings = b  # type: ignore[assignment]
 
+    def _streamBindings(self) -> Iterator[Mapping[Variable, Identifier]]:
+        """
+        The bindings, without keeping those that were not evaluated yet
+        """
+        if self._bindings:
+            yield from self._bindings
+        if self._genbindings:
+            genbindings, self._genbindings = self._genbindings, None
+            yield from genbindings
+
     @staticmethod
     def parse(
         source: Optional[IO] = None,
@@ -287,6 +298,7 @@ class Result:
         destination: Optional[Union[str, IO]] = None,
         encoding: str = "utf-8",
         format: str = "xml",
+        lazy: bool = False,
         **args: Any,
     ) -> Optional[bytes]:
         """
@@ -296,12 +308,17 @@ class Result:
 
         - csv: :class:`~rdflib.plugins.sparql.results.csvresults.CSVResultSerializer`
         - json: :class:`~rdflib.plugins.sparql.results.jsonresults.JSONResultSerializer`
+        - tsv: :class:`~rdflib.plugins.sparql.results.tsvresults.TSVResultSerializer`
         - txt: :class:`~rdflib.plugins.sparql.results.txtresults.TXTResultSerializer`
         - xml: :class:`~rdflib.plugins.sparql.results.xmlresults.XMLResultSerializer`
 
         :param destination: Path of file output or BufferedIOBase object to write the output to.
         :param encoding: Encoding of output.
-        :param format: One of ['csv', 'json', 'txt', xml']
+        :param format: One of ['csv', 'json', 'tsv', 'txt', xml']
+        :param lazy: Write the solutions of a SELECT query as they are
+            evaluated, without keeping them in the result, which can then not
+            be read again. The txt format needs all the solutions to align
+            its columns and keeps them regardless.
         :param args:
         :return: bytes
         """
@@ -316,6 +333,7 @@ class Result:
         from rdflib import plugin
 
         serializer = plugin.get(format, ResultSerializer)(self)
+        serializer.lazy = lazy
         if destination is None:
             streamb: BytesIO = BytesIO()
             stream2 = EncodeOnlyUnicode(streamb)
@@ -426,6 +444,14 @@ class ResultParser:
 class ResultSerializer:
     def __init__(self, result: Result):
         self.result = result
+        #: write the bindings as they are evaluated, without keeping them
+        self.lazy = False
+
+    def bindings(self) -> Iterable[Mapping[Variable, Identifier]]:
+        """the bindings of the result to write"""
+        if self.lazy:
+            return self.result._streamBindings()
+        return self.result.bindings
 
     def serialize(self, stream: IO, encoding: str = "utf-8", **kwargs: Any) -> None:
         """return a string properly serialized"""
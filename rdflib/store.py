@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import pickle
+from contextlib import contextmanager
 from io import BytesIO
 from typing import (
     TYPE_CHECKING,
@@ -271,6 +272,20 @@ class Store:
             )
             self.add((s, p, o), c)
 
+    @contextmanager
+    def bulk_load(self) -> Generator[None, None, None]:
+        """
+        A context in which triples are added in bulk, as when parsing. The
+        store may defer some of the work adding a triple takes, e.g.
+        maintaining indexes, until the context ends, and skip the
+        :class:`TripleAddedEvent` nothing is subscribed to. The triples
+        added can still be read in the context.
+
+        Bulk loads may be nested, the work is deferred until the outermost
+        one ends. The default implementation does nothing.
+        """
+        yield
+
     def remove(
         self,
         triple: "_TriplePatternType",
@@ -387,6 +402,26 @@ class Store:
         :returns: a generator over Nodes
         """
 
+    def predicate_statistics(
+        self,
+        predicate: "_PredicateType",
+        context: Optional["_ContextType"] = None,
+    ) -> Optional[Tuple[int, int, int]]:
+        """
+        Optional statistics used by query engines to estimate how many
+        triples a pattern with the given predicate will match.
+
+        Returns a tuple of the number of triples with the given predicate,
+        the number of distinct subjects and the number of distinct objects
+        of these triples, or None if the store cannot provide them cheaply
+        (the default). Stores may ignore ``context`` and return statistics
+        for the whole store, as they are only used as estimates.
+
+        :param predicate: the predicate to return statistics for
+        :param context: a graph instance to restrict the statistics to, or None
+        """
+        return None
+
     # TODO FIXME: the result of query is inconsistent.
     def query(
         self,
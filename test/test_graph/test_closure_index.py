@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+from rdflib import RDFS, ConjunctiveGraph, Graph, Namespace
+from rdflib.paths import OneOrMore, TransitiveClosureIndex, ZeroOrMore, eval_path
+
+EX = Namespace("http://example.org/")
+
+
+def _closures(graph: Graph):
+    nodes = set(graph.all_nodes())
+    return (
+        set(eval_path(graph, (None, RDFS.subClassOf * OneOrMore, None))),
+        set(eval_path(graph, (None, RDFS.subClassOf * ZeroOrMore, None))),
+        {n: set(graph.transitive_objects(n, RDFS.subClassOf)) for n in nodes},
+        {n: set(graph.transitive_subjects(RDFS.subClassOf, n)) for n in nodes},
+        {
+            n: set(eval_path(graph, (n, RDFS.subClassOf * OneOrMore, None)))
+            for n in nodes
+        },
+        {
+            n: set(eval_path(graph, (None, RDFS.subClassOf * OneOrMore, n)))
+            for n in nodes
+        },
+        {
+            (n, m)
+            for n in nodes
+            for m in nodes
+            if (n, RDFS.subClassOf * OneOrMore, m) in graph
+        },
+    )
+
+
+@pytest.mark.parametrize("store", ["Memory", "SimpleMemory"])
+def test_closure_index_is_maintained(store: str) -> None:
+    rnd = random.Random(7)
+    graph = Graph(store=store)
+    nodes = [EX["c%d" % i] for i in range(25)]
+    for _ in range(30):
+        graph.add((rnd.choice(nodes), RDFS.subClassOf, rnd.choice(nodes)))
+
+    index = TransitiveClosureIndex(graph.store, RDFS.subClassOf)
+    assert TransitiveClosureIndex.find(graph, RDFS.subClassOf) is index
+    try:
+        for _ in range(15):
+            with_index = _closures(graph)
+            index.detach()
+            assert TransitiveClosureIndex.find(graph, RDFS.subClassOf) is None
+            assert _closures(graph) == with_index
+            index = TransitiveClosureIndex(graph.store, RDFS.subClassOf)
+
+            for _ in range(3):
+                graph.add((rnd.choice(nodes), RDFS.subClassOf, rnd.choice(nodes)))
+            graph.remove((rnd.choice(nodes), RDFS.subClassOf, None))
+            graph.remove((None, None, rnd.choice(nodes)))
+            # the closures are found from the index and changed as the graph is
+            _closures(graph)
+    finally:
+        index.detach()
+
+
+def test_closure_index_contexts() -> None:
+    cg = ConjunctiveGraph()
+    a = cg.get_context(EX.a)
+    b = cg.get_context(EX.b)
+    a.add((EX.Dog, RDFS.subClassOf, EX.Mammal))
+    a.add((EX.Mammal, RDFS.subClassOf, EX.Animal))
+
+    index = TransitiveClosureIndex(cg.store, RDFS.subClassOf)
+    try:
+        assert TransitiveClosureIndex.find(cg, RDFS.subClassOf) is index
+        assert TransitiveClosureIndex.find(a, RDFS.subClassOf) is index
+        assert TransitiveClosureIndex.find(b, RDFS.subClassOf) is None
+        assert TransitiveClosureIndex.find(a, RDFS.seeAlso) is None
+
+        b.add((EX.Animal, RDFS.subClassOf, EX.Thing))
+        # a no longer sees all the pairs in the index
+        assert TransitiveClosureIndex.find(a, RDFS.subClassOf) is None
+        assert set(a.transitive_objects(EX.Dog, RDFS.subClassOf)) == {
+            EX.Dog,
+            EX.Mammal,
+            EX.Animal,
+        }
+        assert set(cg.transitive_objects(EX.Dog, RDFS.subClassOf)) == {
+            EX.Dog,
+            EX.Mammal,
+            EX.Animal,
+            EX.Thing,
+        }
+
+        # the pair stays while it is in another context
+        b.add((EX.Dog, RDFS.subClassOf, EX.Mammal))
+        a.remove((EX.Dog, RDFS.subClassOf, EX.Mammal))
+        assert index.objects(EX.Dog) == {EX.Mammal, EX.Animal, EX.Thing}
+        cg.remove((EX.Dog, RDFS.subClassOf, None))
+        assert index.objects(EX.Dog) == set()
+        assert index.subjects(EX.Thing) == {EX.Mammal, EX.Animal}
+
+        cg.remove_context(b)
+        assert TransitiveClosureIndex.find(a, RDFS.subClassOf) is index
+        assert set(index.pairs()) == {(EX.Mammal, EX.Animal)}
+    finally:
+        index.detach()
@@ -3,7 +3,7 @@ from typing import Union
 
 import pytest
 
-from rdflib import RDF, RDFS, Graph, URIRef
+from rdflib import RDF, RDFS, Graph, Namespace, URIRef
 from rdflib.namespace import DCAT, DCTERMS
 from rdflib.paths import (
     AlternativePath,
@@ -15,6 +15,7 @@ from rdflib.paths import (
     SequencePath,
     ZeroOrMore,
     ZeroOrOne,
+    eval_path,
 )
 
 g = Graph()
@@ -140,3 +141,60 @@ def test_hash(lhs: Path, rhs: Path) -> None:
 def test_dict_key(insert_path: Path, check_path: Path) -> None:
     d = {insert_path: "foo"}
     assert d[check_path] == "foo"
+
+
+def _naive_closure(graph: Graph, p: URIRef, start: URIRef):
+    found, todo = set(), [start]
+    while todo:
+        for o in graph.objects(todo.pop(), p):
+            if o not in found:
+                found.add(o)
+                todo.append(o)
+    return found
+
+
+def test_mulpath_eval_matches_naive_closure() -> None:
+    import random
+
+    ex = Namespace("http://example.org/")
+    rnd = random.Random(42)
+    graph = Graph()
+    nodes = [ex["n%d" % i] for i in range(40)]
+    for _ in range(70):
+        graph.add((rnd.choice(nodes), ex.p, rnd.choice(nodes)))
+
+    expected = {(s, o) for s in nodes for o in _naive_closure(graph, ex.p, s)}
+    assert set(eval_path(graph, (None, ex.p * OneOrMore, None))) == expected
+    results = list(eval_path(graph, (None, ex.p * ZeroOrMore, None)))
+    assert len(results) == len(set(results))
+    assert set(results) == expected | {(n, n) for n in graph.all_nodes() if n in nodes}
+
+    for n in nodes:
+        forward = list(eval_path(graph, (n, ex.p * OneOrMore, None)))
+        assert len(forward) == len(set(forward))
+        assert set(forward) == {(s, o) for s, o in expected if s == n}
+        backward = list(eval_path(graph, (None, ex.p * OneOrMore, n)))
+        assert set(backward) == {(s, o) for s, o in expected if o == n}
+        for m in nodes[:10]:
+            assert ((n, m) in expected) == bool(
+                list(eval_path(graph, (n, ex.p * OneOrMore, m)))
+            )
+            assert ((n, m) in expected or n == m) == bool(
+                list(eval_path(graph, (n, ex.p * ZeroOrMore, m)))
+            )
+
+
+def test_mulpath_eval_long_chain() -> None:
+    ex = Namespace("http://example.org/")
+    graph = Graph()
+    chain = [ex["c%d" % i] for i in range(5000)]
+    for a, b in zip(chain, chain[1:]):
+        graph.add((a, RDFS.subClassOf, b))
+
+    path = RDFS.subClassOf * ZeroOrMore
+    assert len(list(eval_path(graph, (chain[0], path, None)))) == 5000
+    assert len(list(eval_path(graph, (None, path, chain[-1])))) == 5000
+    assert list(eval_path(graph, (chain[0], path, chain[-1]))) == [
+        (chain[0], chain[-1])
+    ]
+    assert list(eval_path(graph, (chain[-1], path, chain[0]))) == []
@@ -0,0 +1,268 @@
+from typing import List
+
+import rdflib.plugins.sparql
+import rdflib.plugins.sparql.evaluate
+from rdflib import RDF, Graph, Literal, Namespace, URIRef, Variable
+from rdflib.plugins.sparql.evaluate import _reorderTriplesByStatistics
+from rdflib.plugins.sparql.evalutils import (
+    _diff,
+    _distinct,
+    _hashJoin,
+    _join,
+    _minus,
+)
+from rdflib.plugins.sparql.sparql import FrozenDict, QueryContext
+
+EX = "http://example.org/"
+
+S = Variable("s")
+O = Variable("o")
+L = Variable("l")
+
+
+def _sorted(rows) -> List[List]:
+    return sorted(sorted(row.items()) for row in rows)
+
+
+def _solutions():
+    a = [
+        FrozenDict({S: URIRef(EX + "a"), O: Literal(1)}),
+        FrozenDict({S: URIRef(EX + "b"), O: Literal(2)}),
+        FrozenDict({S: URIRef(EX + "c")}),
+        FrozenDict({O: Literal(3)}),
+    ]
+    b = [
+        FrozenDict({S: URIRef(EX + "a"), L: Literal("A")}),
+        FrozenDict({S: URIRef(EX + "a"), L: Literal("A'")}),
+        FrozenDict({S: URIRef(EX + "c"), L: Literal("C")}),
+        FrozenDict({L: Literal("any")}),
+    ]
+    return a, b
+
+
+def test_hash_join_matches_nested_loop() -> None:
+    a, b = _solutions()
+
+    expected = _sorted(_join(a, b))
+    assert len(expected) == 10
+    assert _sorted(_hashJoin(a, b, {S})) == expected
+    assert _sorted(_hashJoin(a, b, {S, O})) == expected
+    assert _sorted(_hashJoin(a, b, set())) == expected
+
+
+def test_hash_join_query() -> None:
+    g = Graph()
+    for i in range(20):
+        g.add((URIRef(EX + "s%d" % i), URIRef(EX + "p"), Literal(i)))
+        if i % 2:
+            g.add((URIRef(EX + "s%d" % i), URIRef(EX + "q"), Literal(i * 2)))
+
+    # a join of joins is not evaluated lazily
+    res = g.query(
+        """
+        PREFIX : <http://example.org/>
+        SELECT ?s ?x ?y WHERE {
+            { ?s :p ?x } { ?s :q ?y } { ?s :p ?x }
+        }"""
+    )
+
+    rows = sorted((int(x), int(y)) for s, x, y in res)
+    assert rows == [(i, i * 2) for i in range(1, 20, 2)]
+
+
+def test_keyed_minus_matches_nested_loop() -> None:
+    a, b = _solutions()
+    b.append(FrozenDict({O: Literal(3), L: Literal("B")}))
+
+    expected = _sorted(_minus(a, b))
+    assert expected == _sorted([a[1]])
+    assert _sorted(_minus(a, b, {S})) == expected
+    assert _sorted(_minus(a, b, {S, O})) == expected
+
+
+def test_keyed_diff_matches_nested_loop() -> None:
+    a, b = _solutions()
+    expr = Literal(False)
+
+    expected = _sorted(_diff(a, b, expr))
+    assert expected == _sorted(a)
+    assert _sorted(_diff(a, b, expr, {S})) == expected
+    assert _sorted(_diff(a, b, Literal(True), {S, O})) == []
+
+
+def test_keyed_minus_query() -> None:
+    g = Graph()
+    for i in range(20):
+        g.add((URIRef(EX + "s%d" % i), URIRef(EX + "p"), Literal(i)))
+        if i % 3:
+            g.add((URIRef(EX + "s%d" % i), URIRef(EX + "q"), Literal(i)))
+
+    res = g.query(
+        """
+        PREFIX : <http://example.org/>
+        SELECT ?x WHERE {
+            ?s :p ?x
+            MINUS { ?s :q ?y OPTIONAL { ?s :r ?z } }
+            MINUS { ?other :r ?nothing }
+        }"""
+    )
+
+    assert sorted(int(x) for x, in res) == list(range(0, 20, 3))
+
+
+def test_reorder_triples_by_statistics() -> None:
+    g = Graph()
+    ex = Namespace(EX)
+    for i in range(50):
+        g.add((ex["s%d" % i], RDF.type, ex.Book))
+        g.add((ex["s%d" % i], ex.isbn, Literal("isbn-%d" % i)))
+
+    ctx = QueryContext(g)
+    t = Variable("t")
+    typed = (S, RDF.type, t)
+    isbn = (S, ex.isbn, Literal("isbn-7"))
+    assert _reorderTriplesByStatistics(ctx, [typed, isbn]) == [isbn, typed]
+
+    res = g.query(
+        "SELECT ?t { ?s a ?t ; <http://example.org/isbn> 'isbn-7' }",
+    )
+    assert [row.t for row in res] == [ex.Book]
+
+
+def test_reorder_triples_without_statistics() -> None:
+    g = Graph(store="SimpleMemory")
+    ctx = QueryContext(g)
+    triples = [(S, RDF.type, Variable("t")), (S, URIRef(EX + "p"), O)]
+    assert _reorderTriplesByStatistics(ctx, triples) is None
+
+
+def test_batched_bgp(monkeypatch) -> None:
+    monkeypatch.setattr(rdflib.plugins.sparql.evaluate, "_BGP_BATCH_SIZE", 3)
+    g = Graph()
+    ex = Namespace(EX)
+    for i in range(10):
+        g.add((ex["s%d" % i], ex.p, ex["s%d" % ((i + 1) % 10)]))
+        g.add((ex["s%d" % i], ex.q, Literal(i)))
+    g.add((ex.s3, ex.p, ex.s3))
+
+    res = g.query(
+        "SELECT ?x ?n { ?x <http://example.org/p> ?y . ?y <http://example.org/q> ?n }"
+    )
+    assert len(res) == 11
+    assert all(int(n) == (int(x[-1]) + 1) % 10 for x, n in res if x != ex.s3)
+
+    res = g.query("SELECT ?x { ?x <http://example.org/p> ?x }")
+    assert [row.x for row in res] == [ex.s3]
+
+    res = g.query(
+        "SELECT ?n { ?x <http://example.org/p> ?y . ?y ?p ?n }",
+        initBindings={"x": ex.s1, "p": ex.q},
+    )
+    assert [row.n for row in res] == [Literal(2)]
+
+
+def test_union_is_lazy(monkeypatch) -> None:
+    g = Graph()
+    ex = Namespace(EX)
+    for i in range(5):
+        g.add((ex["s%d" % i], ex.p, Literal(i)))
+        g.add((ex["s%d" % i], ex.q, Literal(i)))
+
+    evaluated = []
+    evalBGP = rdflib.plugins.sparql.evaluate.evalBGP
+
+    def _evalBGP(ctx, bgp):
+        evaluated.append(bgp[0][1])
+        return evalBGP(ctx, bgp)
+
+    monkeypatch.setattr(rdflib.plugins.sparql.evaluate, "evalBGP", _evalBGP)
+    res = g.query(
+        """
+        PREFIX : <http://example.org/>
+        SELECT ?o { { ?s :p ?o } UNION { ?s :q ?o } } LIMIT 3"""
+    )
+    assert len(res) == 3
+    assert evaluated == [ex.p]
+
+    res = g.query(
+        """
+        PREFIX : <http://example.org/>
+        SELECT ?o { { ?s :p ?o } UNION { ?s :q ?o } }"""
+    )
+    assert len(res) == 10
+
+
+def test_order_by_limit_top_k(monkeypatch) -> None:
+    g = Graph()
+    ex = Namespace(EX)
+    for i in range(30):
+        g.add((ex["s%d" % i], ex.p, Literal(i % 7)))
+        g.add((ex["s%d" % i], ex.q, Literal(i)))
+
+    queries = [
+        "SELECT ?s ?x ?y { ?s :p ?x ; :q ?y } ORDER BY ?x DESC(?y) LIMIT 5",
+        "SELECT ?y { ?s :p ?x ; :q ?y } ORDER BY DESC(?x) ?y LIMIT 4 OFFSET 3",
+        "SELECT DISTINCT ?x { ?s :p ?x } ORDER BY ?x LIMIT 3",
+        "SELECT ?y { ?s :q ?y OPTIONAL { ?s :r ?z } } ORDER BY ?z ?y LIMIT 2",
+        "SELECT ?y { ?s :q ?y } ORDER BY ?y LIMIT 0",
+    ]
+    prefix = "PREFIX : <http://example.org/> "
+    top_k = [list(g.query(prefix + q)) for q in queries]
+
+    # the same queries with a full sort
+    monkeypatch.setattr(
+        rdflib.plugins.sparql.evaluate, "_evalTopK", lambda ctx, part, k: None
+    )
+    assert top_k == [list(g.query(prefix + q)) for q in queries]
+    assert [int(x) for x, in top_k[2]] == [0, 1, 2]
+    assert [(int(x), int(y)) for _, x, y in top_k[0]] == [
+        (0, 28),
+        (0, 21),
+        (0, 14),
+        (0, 7),
+        (0, 0),
+    ]
+
+
+def test_distinct_spills_to_disk() -> None:
+    ctx = QueryContext(Graph())
+    rows = [
+        FrozenDict({S: URIRef(EX + "s%d" % (i % 40)), O: Literal(i % 3)})
+        for i in range(300)
+    ]
+
+    expected = set(rows)
+    assert len(expected) == 120
+    in_memory = list(_distinct(rows, None, ctx))
+    assert in_memory == list(dict.fromkeys(rows))
+
+    spilled = list(_distinct(rows, 10, ctx))
+    assert len(spilled) == 120
+    assert set(spilled) == expected
+    # the rows seen before the limit keep their order
+    assert spilled[:10] == in_memory[:10]
+
+    # a limit too low to fit any partition spills recursively
+    assert set(_distinct(rows, 1, ctx)) == expected
+
+
+def test_distinct_and_reduced_settings(monkeypatch) -> None:
+    g = Graph()
+    ex = Namespace(EX)
+    for i in range(50):
+        g.add((ex["s%d" % i], ex.p, Literal(i % 5)))
+        g.add((ex["s%d" % i], ex.q, Literal(i % 2)))
+
+    monkeypatch.setattr(rdflib.plugins.sparql, "SPARQL_DISTINCT_MEMORY_ROWS", 3)
+    res = g.query(
+        "SELECT DISTINCT ?x ?y { ?s <http://example.org/p> ?x ; <http://example.org/q> ?y }"
+    )
+    assert sorted((int(x), int(y)) for x, y in res) == [
+        (x, y) for x in range(5) for y in range(2)
+    ]
+
+    q = "SELECT REDUCED ?x { ?s <http://example.org/p> ?x }"
+    monkeypatch.setattr(rdflib.plugins.sparql, "SPARQL_REDUCED_WINDOW", 0)
+    assert len(g.query(q)) == 50
+    monkeypatch.setattr(rdflib.plugins.sparql, "SPARQL_REDUCED_WINDOW", 5)
+    assert sorted(int(x) for x, in g.query(q)) == list(range(5))
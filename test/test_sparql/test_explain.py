@@ -0,0 +1,89 @@
+from rdflib import Graph, Literal, Namespace
+from rdflib.plugins.sparql.explain import (
+    PlanNode,
+    QueryProfile,
+    explain,
+    explainAnalyze,
+)
+
+EX = Namespace("http://example.org/")
+
+QUERY = """
+PREFIX ex: <http://example.org/>
+SELECT ?s ?x ?y {
+    ?s ex:p ?x
+    OPTIONAL { ?s ex:q ?y }
+}"""
+
+
+def _graph() -> Graph:
+    g = Graph()
+    for i in range(10):
+        g.add((EX["s%d" % i], EX.p, Literal(i)))
+        if i % 2:
+            g.add((EX["s%d" % i], EX.q, Literal(i * 2)))
+            g.add((EX["s%d" % i], EX.q, Literal(i * 3)))
+    return g
+
+
+def _nodes(plan: PlanNode):
+    return [(depth, node.name) for depth, node in plan.walk()]
+
+
+def test_explain() -> None:
+    plan = explain(QUERY)
+    assert _nodes(plan) == [
+        (0, "SelectQuery"),
+        (1, "Project"),
+        (2, "LeftJoin"),
+        (3, "BGP"),
+        (3, "BGP"),
+    ]
+    assert all(node.evaluations == 0 for _, node in plan.walk())
+    assert str(plan).splitlines() == [
+        "SelectQuery",
+        "  Project ?s ?x ?y",
+        "    LeftJoin",
+        "      BGP ?s ex:p ?x",
+        "      BGP ?s ex:q ?y",
+    ]
+
+
+def test_explain_analyze() -> None:
+    plan = explainAnalyze(_graph(), QUERY)
+    select, project, leftjoin, left, right = (node for _, node in plan.walk())
+
+    assert select.rows == project.rows == leftjoin.rows == 15
+    assert left.evaluations == 1 and left.rows == 10 and left.triples == 1
+    # the OPTIONAL part is evaluated for each solution of the first part,
+    # and again for those it has no match for
+    assert right.evaluations == 15
+    assert right.rows == 10 and right.peak == 2 and right.triples == 15
+
+    assert select.time >= project.time >= leftjoin.time >= left.time > 0
+    assert leftjoin.selfTime <= leftjoin.time - left.time - right.time + 1e-6
+    lines = str(plan).splitlines()
+    assert lines[0].startswith("SelectQuery  rows=15 time=")
+    assert lines[4].startswith(
+        "      BGP ?s ex:q ?y  rows=10 evaluations=15 peak=2 triples=15 time="
+    )
+
+
+def test_query_profile() -> None:
+    g = _graph()
+    profile = QueryProfile()
+    res = g.query(
+        "SELECT ?s { ?s <http://example.org/p> ?x FILTER (?x > 3) } LIMIT 2",
+        profile=profile,
+    )
+    assert profile.plan is not None and profile.plan.rows == 0
+    assert len(list(res)) == 2
+    assert [(node.name, node.rows) for _, node in profile.plan.walk()] == [
+        ("SelectQuery", 2),
+        ("Slice", 2),
+        ("Project", 2),
+        ("Filter", 2),
+        # only the solutions the LIMIT needed were computed
+        ("BGP", 6),
+    ]
+    assert sorted(g.query(QUERY, profile=QueryProfile())) == sorted(g.query(QUERY))
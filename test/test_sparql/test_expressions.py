@@ -1,10 +1,13 @@
 from functools import partial
 from test.utils import eq_ as eq
 
+import rdflib
 import rdflib.plugins.sparql.parser as p
 from rdflib import Literal, Variable
+from rdflib.plugins.sparql import operators, prepareQuery
 from rdflib.plugins.sparql.algebra import translatePName, traverse
 from rdflib.plugins.sparql.operators import simplify
+from rdflib.plugins.sparql.parserutils import CompValue, Expr
 from rdflib.plugins.sparql.sparql import Prologue, QueryContext, SPARQLError
 
 
@@ -144,3 +147,73 @@ def test_and_or():
         bool(_eval(_translate((p.Expression.parseString("(2>1 || 3>2) && 3>4")[0])))),
         False,
     )
+
+
+def test_compiled_expression_is_not_bound_to_a_solution():
+    def ctx(x, y):
+        c = QueryContext()
+        c[Variable("x")] = Literal(x)
+        c[Variable("y")] = Literal(y)
+        return c
+
+    e = _translate(p.Expression.parseString("?x + 1 > ?y")[0])
+    eq(bool(_eval(e, ctx(3, 3))), True)
+    eq(bool(_eval(e, ctx(1, 3))), False)
+
+    # changing a parameter compiles the expression again
+    e["other"] = Literal(0)
+    eq(bool(_eval(e, ctx(1, 3))), True)
+
+    # evaluating an expression again while it is being evaluated (as
+    # threads sharing a prepared query may) does not mix up the solutions
+    custom = rdflib.URIRef("http://example.org/nested")
+    results = []
+
+    def nested(x):
+        if not results:
+            results.append(None)
+            results[0] = bool(_eval(f, ctx(10, 20)))
+        return x
+
+    operators.register_custom_function(custom, nested)
+    try:
+        f = _translate(p.Expression.parseString("<%s>(?x) + 1 > ?y" % custom)[0])
+        eq(bool(_eval(f, ctx(3, 3))), True)
+        eq(results, [False])
+    finally:
+        operators.unregister_custom_function(custom)
+
+
+def test_query_expressions_are_compiled_when_translated():
+    query = prepareQuery(
+        "SELECT ?s ?y { ?s ?p ?o FILTER(?o > 1 && NOT EXISTS { ?o ?p ?s "
+        "FILTER(?s != ?o) }) BIND(?o + 1 AS ?y) }"
+    )
+    exprs = []
+
+    def collect(x):
+        if isinstance(x, Expr):
+            exprs.append(x)
+        if isinstance(x, CompValue):
+            for y in list(x.values()) + list(x.__dict__.values()):
+                collect(y)
+        elif isinstance(x, list):
+            for y in x:
+                collect(y)
+
+    collect(query.algebra)
+    assert {e.name for e in exprs} >= {
+        "RelationalExpression",
+        "AdditiveExpression",
+        "Builtin_NOTEXISTS",
+    }
+    assert all(e._compiled is not None for e in exprs)
+
+    ex = rdflib.Namespace("http://example.org/")
+    g = rdflib.Graph()
+    for i in range(4):
+        g.add((ex["s%d" % i], ex.p, Literal(i)))
+    g.add((ex.s3, ex.p, ex.s3))
+    assert sorted(g.query(query)) == [
+        (ex["s%d" % i], Literal(i + 1)) for i in range(2, 4)
+    ]
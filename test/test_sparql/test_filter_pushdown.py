@@ -0,0 +1,94 @@
+from typing import List
+
+import pytest
+
+import rdflib.plugins.sparql.algebra
+from rdflib import ConjunctiveGraph, Literal, Namespace, Variable
+from rdflib.plugins.sparql import prepareQuery
+
+EX = Namespace("http://example.org/")
+
+QUERIES = [
+    "SELECT ?s ?a { ?s :p ?o ; :age ?a FILTER(?o = :o3) }",
+    "SELECT ?s ?a { ?s :p ?o ; :age ?a FILTER(?o = :o3 && ?a > 5) }",
+    "SELECT ?s ?a { ?s :p ?o ; :age ?a FILTER(sameTerm(?a, 4)) }",
+    "SELECT ?s ?a { ?s :p ?o ; :age ?a FILTER(?a = 4) }",
+    "SELECT ?s ?o ?a { ?s :p ?o OPTIONAL { ?s :age ?a } FILTER(?o = :o3) }",
+    "SELECT ?s ?o ?a { ?s :p ?o OPTIONAL { ?s :age ?a } FILTER(?a > 5) }",
+    "SELECT ?s ?o { { ?s :p ?o } UNION { ?s :q ?o } FILTER(?s != :s2) }",
+    "SELECT ?s ?x { ?s :p ?o { SELECT ?x { ?x :p :o3 } } FILTER(?x = ?s) }",
+    "SELECT ?s { ?s :p ?o FILTER(?o = :o3 || ?s = :s1) }",
+    "SELECT ?s { ?s :p ?o FILTER(EXISTS { ?s :age 4 } && ?o = :o4) }",
+    "SELECT ?s { ?s :p ?o FILTER(?o = :o3 && ?o = :o4) }",
+    "SELECT ?s { GRAPH ?g { ?s :p ?o } FILTER(?o = :o3) }",
+]
+
+
+def _graph() -> ConjunctiveGraph:
+    cg = ConjunctiveGraph()
+    g = cg.get_context(EX.g)
+    for i in range(30):
+        g.add((EX["s%d" % i], EX.p, EX["o%d" % (i % 5)]))
+        g.add((EX["s%d" % i], EX.age, Literal(i % 10)))
+        if i % 3 == 0:
+            g.add((EX["s%d" % i], EX.q, EX["o%d" % (i % 7)]))
+    return cg
+
+
+def _results(g: ConjunctiveGraph) -> List[List]:
+    return [sorted(g.query(prepareQuery(q, initNs={"": EX})), key=str) for q in QUERIES]
+
+
+def test_pushdown_keeps_results(monkeypatch) -> None:
+    g = _graph()
+    pushed = _results(g)
+
+    monkeypatch.setattr(
+        rdflib.plugins.sparql.algebra, "pushDownFilters", lambda n: None
+    )
+    assert pushed == _results(g)
+    assert len(pushed[0]) == 6
+
+
+def test_equality_becomes_binding() -> None:
+    q = prepareQuery(
+        "SELECT ?s { ?s :p ?o OPTIONAL { ?s :age ?a } FILTER(?o = :o3 && ?a > 5) }",
+        initNs={"": EX},
+    )
+    project = q.algebra.p
+    # the range filter cannot go below the OPTIONAL
+    assert project.p.name == "Filter"
+    left = project.p.p
+    assert left.name == "LeftJoin"
+    # the equality binds ?o before the BGP is evaluated
+    assert left.p1.name == "Join" and left.p1.lazy
+    assert left.p1.p1.name == "ToMultiSet"
+    assert left.p1.p1.p.res == [{Variable("o"): EX.o3}]
+    assert left.p1.p2.name == "BGP"
+
+
+@pytest.mark.parametrize(
+    "bindings, expected",
+    [
+        ({}, {EX["s%d" % i] for i in range(3, 30, 5)}),
+        ({"s": EX.s8}, {EX.s8}),
+        ({"s": EX.s4}, set()),
+        ({"o": EX.o4}, set()),
+    ],
+)
+def test_pushdown_with_init_bindings(bindings, expected) -> None:
+    g = _graph()
+    q = prepareQuery("SELECT ?s { ?s :p ?o FILTER(?o = :o3) }", initNs={"": EX})
+    res = g.query(q, initBindings=bindings)
+    assert {row.s for row in res} == expected
+
+
+def test_filter_in_service_is_left_alone() -> None:
+    q = prepareQuery(
+        """
+        SELECT * {
+            ?s ?p ?o
+            SERVICE <http://example.org/sparql> { ?s <http://example.org/p> ?z FILTER(?z > 1) }
+        }"""
+    )
+    assert "FILTER(?z > 1)" in str(q.algebra)
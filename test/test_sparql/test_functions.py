@@ -5,7 +5,8 @@ import pytest
 
 from rdflib.graph import Graph
 from rdflib.namespace import XSD, Namespace
-from rdflib.plugins.sparql.operators import _lang_range_check
+from rdflib.plugins.sparql import prepareQuery
+from rdflib.plugins.sparql.operators import _compileRegex, _lang_range_check
 from rdflib.term import BNode, Identifier, Literal, URIRef
 
 EG = Namespace("https://example.com/")
@@ -91,6 +92,9 @@ EG = Namespace("https://example.com/")
         (r'regex("Alice", "^ali", "i")', Literal(True)),
         (r'regex("Bob", "^ali", "i")', Literal(False)),
         (r'replace("abcd", "b", "Z")', Literal("aZcd")),
+        (r'replace("aBbBa", "b", "Z", "i")', Literal("aZZZa")),
+        (r'replace("abcd", "(b)(c)", "$2$1")', Literal("acbd")),
+        (r'regex("a\nb", "^b$", "m")', Literal(True)),
         (r"abs(-1.5)", Literal("1.5", datatype=XSD.decimal)),
         (r"round(2.4999)", Literal("2", datatype=XSD.decimal)),
         (r"round(2.5)", Literal("3", datatype=XSD.decimal)),
@@ -187,3 +191,32 @@ def test_lang_range_check(
 ) -> None:
     actual_result = _lang_range_check(range, literal)
     assert expected_result == actual_result
+
+
+def test_regex_patterns_are_compiled_once() -> None:
+    graph = Graph()
+    for name in ["Alice", "alicia", "Bob"]:
+        graph.add((EG[name], EG.name, Literal(name)))
+
+    query = prepareQuery(
+        """
+        PREFIX eg: <https://example.com/>
+        SELECT ?n ?pattern {
+            ?s eg:name ?n
+            VALUES ?pattern { "^ali" "^b" }
+            FILTER (regex(?n, "^ali", "i") || regex(?n, ?pattern, "i"))
+        }"""
+    )
+    # the constant pattern is compiled at translation time
+    before = _compileRegex.cache_info()
+    assert sorted((str(n), str(pattern)) for n, pattern in graph.query(query)) == [
+        ("Alice", "^ali"),
+        ("Alice", "^b"),
+        ("Bob", "^b"),
+        ("alicia", "^ali"),
+        ("alicia", "^b"),
+    ]
+    # the variable ones are found in the cache after their first use
+    after = _compileRegex.cache_info()
+    assert after.misses - before.misses <= 2
+    assert after.hits > before.hits
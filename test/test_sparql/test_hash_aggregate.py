@@ -0,0 +1,61 @@
+import rdflib.plugins.sparql
+from rdflib import Graph, Literal, Namespace
+
+EX = Namespace("http://example.org/")
+
+QUERY = """
+PREFIX : <http://example.org/>
+SELECT ?type (COUNT(*) AS ?n) (COUNT(DISTINCT ?v) AS ?d) (SUM(?v) AS ?sum)
+    (AVG(?v) AS ?avg) (MIN(?v) AS ?min) (MAX(?v) AS ?max)
+    (SAMPLE(?type) AS ?sample) (GROUP_CONCAT(DISTINCT ?v; separator="|") AS ?vs)
+WHERE {
+    ?s a ?type
+    OPTIONAL { ?s :value ?v }
+}
+GROUP BY ?type
+"""
+
+
+def _graph() -> Graph:
+    g = Graph()
+    for i in range(200):
+        s = EX["s%d" % i]
+        g.add((s, EX.p, Literal(i)))
+        g.add((s, rdflib.RDF.type, EX["T%d" % (i % 13)]))
+        if i % 4:
+            g.add((s, EX.value, Literal(i % 5)))
+    return g
+
+
+def _rows(res):
+    return sorted(tuple(row) for row in res)
+
+
+def test_hash_aggregate() -> None:
+    g = _graph()
+    rows = _rows(g.query(QUERY))
+    assert len(rows) == 13
+
+    by_type = {row[0]: row for row in rows}
+    t0 = by_type[EX.T0]
+    members = [i for i in range(200) if i % 13 == 0]
+    values = [i % 5 for i in members if i % 4]
+    assert int(t0[1]) == len(members)
+    assert int(t0[2]) == len(set(values))
+    assert int(t0[3]) == sum(values)
+    assert (t0[5], t0[6], t0[7]) == (Literal(min(values)), Literal(max(values)), EX.T0)
+
+
+def test_hash_aggregate_spills_groups(monkeypatch) -> None:
+    g = _graph()
+    expected = _rows(g.query(QUERY))
+
+    for limit in (1, 5):
+        monkeypatch.setattr(rdflib.plugins.sparql, "SPARQL_GROUP_MEMORY_GROUPS", limit)
+        assert _rows(g.query(QUERY)) == expected
+
+    # without GROUP BY all rows are one group, with no rows there is one
+    # empty solution
+    assert [int(n) for n, in g.query("SELECT (COUNT(*) AS ?n) { ?s ?p ?o }")] == [550]
+    res = g.query("SELECT (COUNT(*) AS ?n) { ?s <urn:nothing> ?o } GROUP BY ?s")
+    assert list(res.bindings) == [{}]
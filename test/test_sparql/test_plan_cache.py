@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+
+from rdflib import BNode, Graph, Literal, Namespace, URIRef
+from rdflib.plugins.sparql import processor
+from rdflib.plugins.sparql.processor import PlanCache
+
+EX = Namespace("http://example.org/")
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    processor.queryPlanCache.clear()
+    processor.updatePlanCache.clear()
+    yield
+    processor.queryPlanCache.clear()
+    processor.updatePlanCache.clear()
+
+
+def test_query_plan_reused() -> None:
+    g = Graph()
+    g.add((EX.a, EX.p, Literal(1)))
+    cache = processor.queryPlanCache
+
+    q = "SELECT ?o { ?s ex:p ?o }"
+    for _ in range(3):
+        assert [row.o for row in g.query(q, initNs={"ex": EX})] == [Literal(1)]
+    assert (cache.hits, cache.misses, len(cache)) == (2, 1, 1)
+
+    # a different namespace or base is a different plan
+    assert list(g.query(q, initNs={"ex": "http://example.org/other/"})) == []
+    g.query("SELECT ?o { ?s <p> ?o }", base=EX)
+    g.query("SELECT ?o { ?s <p> ?o }", base="http://example.com/")
+    assert (cache.hits, cache.misses, len(cache)) == (2, 4, 4)
+
+
+def test_plan_cache_lru() -> None:
+    cache = PlanCache(maxsize=2)
+    built = []
+
+    def build(name):
+        built.append(name)
+        return name
+
+    for name in ["a", "b", "a", "c", "b", "a"]:
+        assert cache.get(name, lambda: build(name)) == name
+    assert built == ["a", "b", "c", "b", "a"]
+    assert (cache.hits, cache.misses, len(cache)) == (1, 5, 2)
+
+    cache.maxsize = 0
+    cache.clear()
+    cache.get("a", lambda: build("a"))
+    assert len(cache) == 0
+
+
+def test_update_plan_reused() -> None:
+    g = Graph()
+    cache = processor.updatePlanCache
+
+    for i in range(3):
+        g.update(
+            "INSERT { ?s <urn:count> ?n } WHERE { VALUES (?s ?n) { (<urn:a> 1) } }"
+        )
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert len(g) == 1
+
+    # blank nodes in INSERT DATA are new for each update
+    for i in range(2):
+        g.update("INSERT DATA { [] <urn:p> 1 }")
+    assert (cache.hits, cache.misses, len(cache)) == (2, 3, 1)
+    assert len({s for s in g.subjects(URIRef("urn:p")) if isinstance(s, BNode)}) == 2
+
+
+def test_query_plan_shared_between_threads() -> None:
+    g = Graph()
+    for i in range(10):
+        g.add((EX["s%d" % i], EX.p, Literal(i)))
+
+    errors = []
+
+    def run():
+        try:
+            for _ in range(20):
+                res = g.query("SELECT (SUM(?o) AS ?t) { ?s <http://example.org/p> ?o }")
+                assert [int(row.t) for row in res] == [45]
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len(processor.queryPlanCache) == 1
@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+
+import rdflib.plugins.sparql
+from rdflib import Graph, Literal, Namespace
+from rdflib.paths import OneOrMore, _checked_paths, _path_check
+from rdflib.plugins.sparql import sparql
+from rdflib.plugins.sparql.sparql import (
+    QueryCancelled,
+    QueryInterrupted,
+    QueryLimitExceeded,
+    QueryLimits,
+    QueryTimeout,
+    SPARQLError,
+)
+
+EX = Namespace("http://example.org/")
+
+CROSS_PRODUCT = "SELECT * { ?a ?b ?c . ?d ?e ?f . ?g ?h ?i }"
+
+
+@pytest.fixture(scope="module")
+def graph() -> Graph:
+    g = Graph()
+    for i in range(200):
+        g.add((EX["s%d" % i], EX.p, EX["s%d" % (i + 1)]))
+    return g
+
+
+def test_query_timeout(graph: Graph) -> None:
+    start = time.monotonic()
+    with pytest.raises(QueryTimeout):
+        for _ in graph.query(CROSS_PRODUCT, limits=QueryLimits(timeout=0.2)):
+            pass
+    assert time.monotonic() - start < 5
+
+
+def test_query_cancelled(graph: Graph) -> None:
+    limits = QueryLimits()
+    threading.Timer(0.2, limits.cancel).start()
+    with pytest.raises(QueryCancelled):
+        for _ in graph.query(CROSS_PRODUCT, limits=limits):
+            pass
+
+
+def test_query_max_rows(graph: Graph) -> None:
+    query = "SELECT * { ?a ?b ?c . ?c ?d ?e }"
+    assert len(graph.query(query, limits=QueryLimits(maxRows=1000))) == 199
+    with pytest.raises(QueryLimitExceeded):
+        len(graph.query(CROSS_PRODUCT, limits=QueryLimits(maxRows=1000)))
+
+    # not taken for an error in the FILTER, which would only be false
+    with pytest.raises(QueryInterrupted) as excinfo:
+        len(
+            graph.query(
+                "SELECT ?a { ?a ?b ?c FILTER EXISTS { ?d ?e ?f . ?g ?h ?i } }",
+                limits=QueryLimits(maxRows=1000),
+            )
+        )
+    assert not isinstance(excinfo.value, SPARQLError)
+
+
+def test_query_max_memory(graph: Graph) -> None:
+    with pytest.raises(QueryLimitExceeded):
+        for _ in graph.query(CROSS_PRODUCT, limits=QueryLimits(maxMemory=1)):
+            pass
+
+
+def test_query_max_memory_not_measurable(graph: Graph, tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(sparql, "_STATM", str(tmp_path / "missing"))
+    assert sparql._residentMemory() is None
+    with pytest.raises(ValueError):
+        QueryLimits(maxMemory=1)
+    # a default limit on memory is left out rather than failing every query
+    monkeypatch.setattr(rdflib.plugins.sparql, "SPARQL_MAX_MEMORY", 1)
+    assert QueryLimits.default() is None
+    assert len(graph.query("SELECT * { ?a ?b ?c }")) == 200
+
+
+def test_default_query_limits(graph: Graph, monkeypatch) -> None:
+    assert QueryLimits.default() is None
+    monkeypatch.setattr(rdflib.plugins.sparql, "SPARQL_MAX_ROWS", 1000)
+    with pytest.raises(QueryLimitExceeded):
+        len(graph.query(CROSS_PRODUCT))
+    # given limits are used instead
+    query = "SELECT * { ?a ?b ?c . ?d ?e ?f }"
+    assert len(graph.query(query, limits=QueryLimits(maxRows=10**5))) == 200 * 200
+
+
+def test_path_search_is_checked() -> None:
+    g = Graph()
+    for i in range(3000):
+        g.add((EX["s%d" % i], EX.p, EX["s%d" % (i + 1)]))
+
+    with pytest.raises(QueryTimeout):
+        g.query(
+            "SELECT (COUNT(*) AS ?n) { ?s <http://example.org/p>* ?o }",
+            limits=QueryLimits(timeout=0.2),
+        ).bindings
+
+    class Stop(Exception):
+        pass
+
+    def _stop() -> None:
+        raise Stop()
+
+    # the pairs are all found before the first is returned
+    with pytest.raises(Stop):
+        next(_checked_paths(g.triples((None, EX.p * OneOrMore, None)), _stop))
+    assert getattr(_path_check, "check", None) is None
+
+    checks = []
+    pairs = _checked_paths(
+        g.triples((EX.s0, EX.p * OneOrMore, None)), lambda: checks.append(1)
+    )
+    assert [o for _, _, o in pairs][:2] == [EX.s1, EX.s2]
+    assert len(checks) == 3001
+
+
+def test_limits_count_rows() -> None:
+    limits = QueryLimits(maxRows=10)
+    limits.check(10)
+    limits.check()
+    with pytest.raises(QueryLimitExceeded):
+        limits.check(1)
+
+    g = Graph()
+    g.add((EX.a, EX.p, Literal(1)))
+    limits = QueryLimits()
+    assert len(g.query("SELECT * { ?s ?p ?o }", limits=limits)) == 1
+    assert limits.rows == 1
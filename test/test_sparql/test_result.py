@@ -186,6 +186,8 @@ def make_select_result_serialize_parse_tests() -> Iterator[ParameterSet]:
         ("json", DestinationType.TEXT_IO, "utf-16"): pytest.mark.xfail(
             raises=TypeError
         ),
+        ("tsv", DestinationType.TEXT_IO, "utf-8"): pytest.mark.xfail(raises=TypeError),
+        ("tsv", DestinationType.TEXT_IO, "utf-16"): pytest.mark.xfail(raises=TypeError),
         ("txt", DestinationType.BINARY_IO, "utf-8"): pytest.mark.xfail(
             raises=TypeError
         ),
@@ -440,3 +442,57 @@ def test_serialize_to_fileuri_with_authortiy(
         )
         assert False  # this should never happen as serialize should always fail
     assert catcher.value is not None
+
+
+@pytest.mark.parametrize("format", ["csv", "json", "tsv", "xml"])
+def test_serialize_lazy(format: str) -> None:
+    graph = Graph()
+    for i in range(100):
+        graph.add((EGSCHEME["s%d" % i], EGSCHEME.p, Literal(i)))
+    query = "SELECT ?s ?o { ?s ?p ?o } ORDER BY ?o"
+    expected = graph.query(query).serialize(format=format)
+
+    result = graph.query(query)
+    evaluated = []
+    assert result._genbindings is not None
+    result._genbindings = (evaluated.append(b) or b for b in result._genbindings)
+    with BytesIO() as bio:
+        result.serialize(bio, format=format, lazy=True)
+        assert bio.getvalue() == expected
+    assert len(evaluated) == 100
+    # the solutions were written without being kept
+    assert result._genbindings is None and result._bindings == []
+
+    result = graph.query(query)
+    # those already read are written as well
+    assert len(list(itertools.islice(result, 10))) == 10
+    assert result.serialize(format=format, lazy=True) == expected
+    assert len(result._bindings) == 10
+
+
+def test_tsv_serialize_literals() -> None:
+    s, o = Variable("s"), Variable("o")
+    result = Result("SELECT")
+    result.vars = [s, o]
+    result.bindings = [
+        {s: BNode("b0"), o: Literal('tab\there,\nline \\ "quoted"')},
+        {s: EGSCHEME.s, o: Literal("chat", lang="fr")},
+        {s: EGSCHEME.s, o: Literal(1)},
+        {o: Literal(" ")},
+        {s: EGSCHEME.s},
+    ]
+    data = result.serialize(format="tsv")
+    assert data is not None
+    assert data.decode("utf-8").splitlines() == [
+        "?s\t?o",
+        '_:b0\t"tab\\there,\\nline \\\\ \\"quoted\\""',
+        '<example:s>\t"chat"@fr',
+        '<example:s>\t"1"^^<http://www.w3.org/2001/XMLSchema#integer>',
+        '\t" "',
+        "<example:s>\t",
+    ]
+    parsed = Result.parse(BytesIO(data), format="tsv")
+    # the parser gives unbound variables as None
+    assert [
+        {k: v for k, v in row.items() if v is not None} for row in parsed.bindings
+    ] == result.bindings
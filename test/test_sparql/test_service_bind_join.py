@@ -0,0 +1,325 @@
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from test.utils.audit import AuditHookDispatcher
+from test.utils.urlopen import context_urlopener
+from threading import Lock, Thread, current_thread
+from typing import Any, Generator, List, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+from urllib.request import HTTPHandler, OpenerDirector, Request
+
+import pytest
+
+import rdflib.plugins.sparql
+from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib.plugins.sparql import prepareQuery
+from rdflib.plugins.sparql.evaluate import _jsonBindings
+from rdflib.plugins.stores.memory import Memory
+
+EX = Namespace("http://example.org/")
+
+
+class SPARQLEndpoint(BaseHTTPRequestHandler):
+    """
+    A SPARQL endpoint answering from a Graph, which redirects GET requests
+    to /moved to itself
+    """
+
+    protocol_version = "HTTP/1.1"
+    graph = Graph()
+    queries: List[str] = []
+    delay = 0.0
+    running = 0
+    most_running = 0
+    lock = Lock()
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        if url.path == "/moved":
+            self.send_response(301)
+            self.send_header("Location", "/sparql?" + url.query)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._answer(parse_qs(url.query)["query"][0])
+
+    def do_POST(self) -> None:  # noqa: N802
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        self._answer(parse_qs(body)["query"][0])
+
+    def _answer(self, query: str) -> None:
+        cls = type(self)
+        with cls.lock:
+            cls.queries.append(query)
+            cls.running += 1
+            cls.most_running = max(cls.most_running, cls.running)
+        time.sleep(self.delay)
+        with cls.lock:
+            body = self.graph.query(query).serialize(format="json")
+            cls.running -= 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/sparql-results+json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def endpoint() -> Generator[str, None, None]:
+    SPARQLEndpoint.graph = Graph()
+    SPARQLEndpoint.queries = []
+    SPARQLEndpoint.delay = 0.0
+    SPARQLEndpoint.most_running = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SPARQLEndpoint)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield "http://127.0.0.1:%d/sparql" % server.server_port
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_service_bind_join(endpoint: str) -> None:
+    remote = SPARQLEndpoint.graph
+    local = Graph()
+    for i in range(250):
+        local.add((EX["s%d" % i], EX.p, Literal(i)))
+        if i % 4:
+            local.add((EX["s%d" % i], EX.q, Literal(i % 3)))
+        remote.add((EX["s%d" % i], EX.name, Literal("name %d" % i)))
+        remote.add((EX["s%d" % i], EX.name, Literal("other name %d" % i)))
+        remote.add((EX["s%d" % i], EX.r, Literal(i % 3)))
+
+    query = """
+    PREFIX ex: <http://example.org/>
+    SELECT ?s ?name ?x WHERE {
+        ?s ex:p ?i OPTIONAL { ?s ex:q ?x }
+        SERVICE <%s> { ?s ex:name ?name ; ex:r ?x }
+    }"""
+    rows = sorted(local.query(query % endpoint))
+    assert len(SPARQLEndpoint.queries) == 3
+
+    expected = local + remote
+    assert rows == sorted(expected.query(query.replace("SERVICE <%s>", "")))
+    assert len(rows) == 500
+
+
+def test_service_batch_size(endpoint: str, monkeypatch) -> None:
+    monkeypatch.setattr(rdflib.plugins.sparql, "SPARQL_SERVICE_BATCH_SIZE", 7)
+    SPARQLEndpoint.graph.add((EX.a, EX.name, Literal("a")))
+    SPARQLEndpoint.graph.add((EX.b, EX.name, Literal("b")))
+    local = Graph()
+    for i in range(20):
+        local.add((EX.a if i % 2 else EX.b, EX.p, Literal(i)))
+
+    query = """
+    PREFIX ex: <http://example.org/>
+    SELECT ?i ?name WHERE {
+        ?s ex:p ?i
+        SERVICE <%s> { ?s ex:name ?name }
+    }"""
+    res = local.query(query % endpoint)
+    assert sorted((int(i), str(name)) for i, name in res) == [
+        (i, "a" if i % 2 else "b") for i in range(20)
+    ]
+    assert len(SPARQLEndpoint.queries) == 3
+
+
+def test_service_subquery_per_solution(endpoint: str) -> None:
+    SPARQLEndpoint.graph.add((EX.a, EX.name, Literal("a")))
+    SPARQLEndpoint.graph.add((EX.b, EX.name, Literal("b")))
+    local = Graph()
+    local.add((EX.a, EX.p, Literal(1)))
+    local.add((EX.b, EX.p, Literal(2)))
+
+    # the projection of a query cannot be extended to tell the rows apart
+    res = local.query(
+        """
+        SELECT ?i ?name WHERE {
+            ?s <http://example.org/p> ?i
+            SERVICE <%s> {
+                SELECT ?s ?name WHERE { ?s <http://example.org/name> ?name }
+            }
+        }"""
+        % endpoint
+    )
+    assert sorted((int(i), str(name)) for i, name in res) == [(1, "a"), (2, "b")]
+    assert len(SPARQLEndpoint.queries) == 2
+
+
+def test_service_without_shared_variables(endpoint: str) -> None:
+    SPARQLEndpoint.graph.add((EX.a, EX.name, Literal("a")))
+    local = Graph()
+    for i in range(5):
+        local.add((URIRef(EX["s%d" % i]), EX.p, Literal(i)))
+
+    res = local.query(
+        """
+        SELECT ?i ?name WHERE {
+            ?s <http://example.org/p> ?i
+            SERVICE <%s> { ?x <http://example.org/name> ?name }
+        }"""
+        % endpoint
+    )
+    assert sorted(int(i) for i, name in res) == list(range(5))
+    assert len(SPARQLEndpoint.queries) == 1
+
+
+def test_service_network_defences(
+    endpoint: str, audit_hook_dispatcher: AuditHookDispatcher
+) -> None:
+    SPARQLEndpoint.graph.add((EX.a, EX.name, Literal("a")))
+    query = "SELECT ?name { SERVICE <%s> { ?s <http://example.org/name> ?name } }"
+
+    def audit_hook(name: str, args: Tuple[Any, ...]) -> None:
+        if args[0].startswith(endpoint):
+            raise PermissionError("access blocked")
+
+    with audit_hook_dispatcher.ctx_hook("urllib.Request", audit_hook):
+        with pytest.raises(PermissionError):
+            list(Graph().query(query % endpoint))
+
+    opened = []
+
+    class RecordingHTTPHandler(HTTPHandler):
+        def http_open(self, req: Request) -> Any:
+            opened.append(req.get_full_url())
+            return super().http_open(req)
+
+    opener = OpenerDirector()
+    opener.add_handler(RecordingHTTPHandler())
+    with context_urlopener(opener):
+        assert [str(name) for name, in Graph().query(query % endpoint)] == ["a"]
+    assert len(opened) == 1 and opened[0].startswith(endpoint)
+
+
+def test_service_redirect(endpoint: str) -> None:
+    SPARQLEndpoint.graph.add((EX.a, EX.name, Literal("a")))
+    moved = endpoint.replace("/sparql", "/moved")
+    # short enough to be sent with GET
+    res = Graph().query(
+        "SELECT ?name { SERVICE <%s> { SELECT ?name { ?s <%s> ?name } } }"
+        % (moved, EX.name)
+    )
+    assert [str(name) for name, in res] == ["a"]
+    assert len(SPARQLEndpoint.queries) == 1
+
+
+UNION_QUERY = """
+PREFIX ex: <http://example.org/>
+SELECT ?s ?name WHERE {
+    { ?s ex:p ?i SERVICE <%(url)s> { ?s ex:name ?name } }
+    UNION { SERVICE <%(url)s> { ?s ex:r 0 . BIND("zero" AS ?name) } }
+    UNION { SERVICE <%(url)s> { ?s ex:r 1 . BIND("one" AS ?name) } }
+}"""
+
+
+def _union_data() -> Graph:
+    local = Graph()
+    for i in range(30):
+        local.add((EX["s%d" % i], EX.p, Literal(i)))
+        SPARQLEndpoint.graph.add((EX["s%d" % i], EX.name, Literal("name %d" % i)))
+        SPARQLEndpoint.graph.add((EX["s%d" % i], EX.r, Literal(i % 3)))
+    return local
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_service_union_prefetch(endpoint: str, monkeypatch, workers: int) -> None:
+    local = _union_data()
+    expected = sorted(local.query(UNION_QUERY % {"url": endpoint}))
+    assert len(expected) == 50
+    assert SPARQLEndpoint.most_running == 1
+
+    SPARQLEndpoint.delay = 0.2
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        monkeypatch.setattr(rdflib.plugins.sparql, "SPARQL_EXECUTOR", executor)
+        monkeypatch.setattr(rdflib.plugins.sparql, "SPARQL_PREFETCH_ROWS", 2)
+        assert sorted(local.query(UNION_QUERY % {"url": endpoint})) == expected
+    # the branches were sent to the endpoint at the same time
+    assert SPARQLEndpoint.most_running == (3 if workers > 1 else 2)
+
+
+def test_service_prefetch_closed_early(endpoint: str, monkeypatch) -> None:
+    local = _union_data()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        monkeypatch.setattr(rdflib.plugins.sparql, "SPARQL_EXECUTOR", executor)
+        monkeypatch.setattr(rdflib.plugins.sparql, "SPARQL_PREFETCH_ROWS", 1)
+        res = local.query((UNION_QUERY + " LIMIT 2") % {"url": endpoint})
+        assert len(res) == 2
+        # the evaluation of the branches that are not needed stops
+    assert len(SPARQLEndpoint.queries) <= 3
+
+
+class ThreadRecordingMemory(Memory):
+    """
+    A Memory store recording the threads its triples are read in
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads: Set[Thread] = set()
+
+    def triples(self, triple_pattern, context=None):
+        self.threads.add(current_thread())
+        yield from super().triples(triple_pattern, context)
+
+
+def test_service_join_prefetches_service_side(endpoint: str, monkeypatch) -> None:
+    local = Graph(ThreadRecordingMemory())
+    for i in range(30):
+        local.add((EX["s%d" % i], EX.p, Literal(i)))
+        SPARQLEndpoint.graph.add((EX["s%d" % i], EX.name, Literal("name %d" % i)))
+    query = """
+    PREFIX ex: <http://example.org/>
+    SELECT ?s ?name WHERE {
+        { SELECT DISTINCT ?s ?i { ?s ex:p ?i } }
+        SERVICE <%s> { ?s ex:name ?name }
+    }"""
+    prepared = prepareQuery(query % endpoint)
+    join = prepared.algebra.p.p
+    assert join.name == "Join" and not join.lazy
+    # found when the query was translated
+    assert not join.p1._service and join.p2._service
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        monkeypatch.setattr(rdflib.plugins.sparql, "SPARQL_EXECUTOR", executor)
+        assert len(local.query(prepared)) == 30
+    # the local side was not read from the store in another thread
+    assert local.store.threads == {current_thread()}
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 1000])
+def test_json_bindings_are_streamed(size: int) -> None:
+    result = {
+        "results": {
+            "bindings": [
+                {"x": {"type": "literal", "value": "café %d" % i}} for i in range(20)
+            ],
+            "distinct": False,
+        },
+        "head": {"vars": ["x"], "link": []},
+    }
+    stream = io.BytesIO(json.dumps(result, indent=1, ensure_ascii=False).encode())
+    read = []
+
+    def _read(n: int) -> bytes:
+        data = io.BytesIO.read(stream, min(n, size))
+        read.append(len(data))
+        return data
+
+    stream.read = _read  # type: ignore[method-assign]
+    bindings = _jsonBindings(stream)
+    assert next(bindings) == result["results"]["bindings"][0]
+    if size < 100:
+        # the rest of the body has not been read yet
+        assert stream.tell() < len(stream.getvalue()) / 2
+    assert [next(bindings)] + list(bindings) == result["results"]["bindings"][1:]
+
+    assert list(_jsonBindings(io.BytesIO(b"{}"))) == []
+    assert list(_jsonBindings(io.BytesIO(b'{"head": {}, "boolean": true}'))) == []
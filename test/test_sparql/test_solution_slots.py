@@ -0,0 +1,104 @@
+from rdflib import Graph, Literal, URIRef, Variable
+from rdflib.plugins.sparql import prepareQuery
+from rdflib.plugins.sparql.sparql import (
+    FrozenBindings,
+    QueryContext,
+    SlotBindings,
+    SolutionSlots,
+)
+
+EX = "http://example.org/"
+
+X = Variable("x")
+Y = Variable("y")
+Z = Variable("z")
+W = Variable("w")
+
+
+def _ctx() -> QueryContext:
+    ctx = QueryContext(Graph(), initBindings={})
+    ctx.slots = SolutionSlots([X, Y, Z])
+    return ctx
+
+
+def test_slots_assigned_at_translation() -> None:
+    q = prepareQuery(
+        "SELECT ?x ?z { ?x <http://example.org/p> ?y . BIND(?y + 1 AS ?z) }"
+    )
+    assert q.slots is not None
+    assert set(q.slots.variables) == {X, Y, Z}
+
+
+def test_slot_bindings_mapping() -> None:
+    ctx = _ctx()
+    a = SlotBindings(ctx, {X: Literal(1), W: Literal(4)})
+    assert len(a) == 2
+    assert dict(a.items()) == {X: Literal(1), W: Literal(4)}
+    assert a[X] == Literal(1)
+    assert a.get(Y) is None
+    assert a == FrozenBindings(ctx, {X: Literal(1), W: Literal(4)})
+    assert hash(a) == hash(FrozenBindings(ctx, {X: Literal(1), W: Literal(4)}))
+    assert a.project([W]) == {W: Literal(4)}
+    assert a.forget(_ctx()) == a
+
+
+def test_slot_bindings_merge_and_compatible() -> None:
+    ctx = _ctx()
+    a = SlotBindings(ctx, {X: Literal(1), Y: Literal(2)})
+    b = SlotBindings(ctx, {Y: Literal(2), Z: Literal(3)})
+    c = SlotBindings(ctx, {Y: Literal(5)})
+    d = SlotBindings(ctx, {Z: Literal(3)})
+
+    assert a.compatible(b) and b.compatible(a)
+    assert not a.compatible(c)
+    assert a.compatible({Y: Literal(2), W: Literal(0)})
+    assert not a.disjointDomain(b)
+    assert a.disjointDomain(d)
+
+    merged = a.merge(b)
+    assert isinstance(merged, SlotBindings)
+    assert merged == {X: Literal(1), Y: Literal(2), Z: Literal(3)}
+    assert a.merge({W: URIRef(EX)}) == {X: Literal(1), Y: Literal(2), W: URIRef(EX)}
+
+
+def test_slot_getter() -> None:
+    ctx = _ctx()
+    slots = ctx.slots
+    assert slots is not None
+    looked_up = []
+
+    def fallback(solution):
+        looked_up.append(solution)
+        return solution.get(X)
+
+    get = slots.getter(X, fallback)
+    a = SlotBindings(ctx, {X: Literal(1)})
+    assert get(a) == Literal(1)
+    assert looked_up == []
+
+    # not bound, or not in a solution of the same slots
+    assert get(SlotBindings(ctx, {Y: Literal(2)})) is None
+    assert get(SlotBindings(_ctx(), {X: Literal(3)})) == Literal(3)
+    assert get(FrozenBindings(ctx, {X: Literal(4)})) == Literal(4)
+    assert len(looked_up) == 3
+
+    # and a variable without a slot is always looked up
+    assert slots.getter(W, fallback) is fallback
+
+
+def test_query_solutions_use_slots() -> None:
+    g = Graph()
+    for i in range(5):
+        g.add((URIRef(EX + "s%d" % i), URIRef(EX + "p"), Literal(i)))
+
+    res = g.query(
+        """
+        SELECT DISTINCT ?x ?y ?z {
+            ?x <http://example.org/p> ?y
+            OPTIONAL { ?x <http://example.org/q> ?z }
+            FILTER (?y > 1)
+        }"""
+    )
+    assert all(isinstance(b, SlotBindings) for b in res.bindings)
+    assert sorted(int(row.y) for row in res) == [2, 3, 4]
+    assert all(row.z is None for row in res)
@@ -1,5 +1,4 @@
 import logging
-import os
 from dataclasses import dataclass, field
 from io import StringIO
 from pathlib import Path
@@ -8,6 +7,7 @@ from typing import Collection, Tuple, Union, cast
 
 import pytest
 from _pytest.mark.structures import Mark, MarkDecorator, ParameterSet
+from pyparsing import ParseException
 
 import rdflib.plugins.sparql.algebra as algebra
 import rdflib.plugins.sparql.parser as parser
@@ -175,6 +175,15 @@ algebra_tests = [
         "test_operators__unary",
         "Test if unary expressions are properly translated into the query text.",
     ),
+    AlgebraTest(
+        "test_other__service1",
+        "Test if a nested service pattern is properly translated"
+        "into the query text.",
+        pytest.mark.xfail(
+            raises=ParseException,
+            reason="the OPTIONAL inside the SERVICE is not translated to query text",
+        ),
+    ),
     AlgebraTest(
         "test_other__service2",
         'Test if "service" along with its service string is properly translated'
@@ -243,26 +252,6 @@ unused_files = {
 }
 
 
-if os.name != "nt":
-    # On Windows this test causes a stackoverflow or memory error, so don't run
-    # it on Windows. The test fails anyway on linux and should be fixed. Once
-    # the cause of this failure is fixed the condition to not run it on windows
-    # should be removed and it should be added to the normal tests.
-    algebra_tests.append(
-        AlgebraTest(
-            "test_other__service1",
-            "Test if a nested service pattern is properly translated"
-            "into the query text.",
-            pytest.mark.xfail(
-                raises=RecursionError,
-                reason="Fails with RecursionError inside parser.parseQuery",
-            ),
-        )
-    )
-else:
-    unused_files.add("test_other__service1.txt")
-
-
 def test_all_files_used(data_path: Path) -> None:
     all_files_names = {path.name for path in data_path.glob("*")}
     expected_files = {test.filename for test in algebra_tests}
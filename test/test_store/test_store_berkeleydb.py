@@ -166,3 +166,17 @@ def test_open_shut(get_graph: Tuple[str, ConjunctiveGraph]):
     assert (
         len(g) == 3
     ), "After close and reopen, we should still have the 3 originally added triples"
+
+
+def test_predicate_statistics(get_graph: Tuple[str, ConjunctiveGraph]):
+    path, g = get_graph
+    ex = "https://example.org/"
+    assert g.store.predicate_statistics(URIRef(ex + "b")) == (1, 1, 1)
+    assert g.store.predicate_statistics(URIRef(ex + "x")) == (0, 0, 0)
+
+    g.add((URIRef(ex + "d"), URIRef(ex + "b"), URIRef(ex + "c")))
+    g.add((URIRef(ex + "d"), URIRef(ex + "b"), URIRef(ex + "f")))
+    assert g.store.predicate_statistics(URIRef(ex + "b")) == (3, 2, 2)
+
+    g.remove((URIRef(ex + "d"), None, None))
+    assert g.store.predicate_statistics(URIRef(ex + "b")) == (1, 1, 1)
@@ -1,9 +1,15 @@
+import random
+import threading
+import time
+import tracemalloc
+
 import pytest
 
 import rdflib
+from rdflib.graph import QuotedGraph
 
 
-@pytest.fixture(scope="function", params=["SimpleMemory", "Memory"])
+@pytest.fixture(scope="function", params=["SimpleMemory", "Memory", "EncodedMemory"])
 def get_graph(request):
     g = rdflib.Graph(request.param)
     yield g
@@ -29,3 +35,263 @@ def test_memory_store(get_graph):
     g.remove(triple1)
     assert len(g) == 1
     assert len(g.serialize()) > 0
+
+
+@pytest.mark.parametrize("store", ["Memory", "EncodedMemory"])
+def test_memory_predicate_statistics(store):
+    g = rdflib.Dataset(store)
+    ex = rdflib.Namespace("http://example.org/")
+    g1 = g.graph(ex.g1)
+    g2 = g.graph(ex.g2)
+    assert g.store.predicate_statistics(ex.p) == (0, 0, 0)
+
+    g1.add((ex.a, ex.p, ex.x))
+    g1.add((ex.a, ex.p, ex.y))
+    g1.add((ex.b, ex.p, ex.x))
+    g2.add((ex.b, ex.p, ex.x))
+    g2.add((ex.c, ex.q, ex.x))
+    assert g.store.predicate_statistics(ex.p) == (3, 2, 2)
+    assert g.store.predicate_statistics(ex.q) == (1, 1, 1)
+
+    g1.remove((ex.b, ex.p, ex.x))
+    assert g.store.predicate_statistics(ex.p) == (3, 2, 2)
+    g2.remove((ex.b, ex.p, ex.x))
+    assert g.store.predicate_statistics(ex.p) == (2, 1, 2)
+    g1.remove((ex.a, None, ex.x))
+    assert g.store.predicate_statistics(ex.p) == (1, 1, 1)
+    g1.add((ex.b, ex.p, ex.x))
+    assert g.store.predicate_statistics(ex.p) == (2, 2, 2)
+
+
+def _state(ds):
+    store = ds.store
+    contexts = sorted((type(c).__name__, c.identifier) for c in store.contexts())
+    patterns = [(None, None, None)]
+    for (s, p, o), _ in store.triples((None, None, None)):
+        patterns += [(s, None, None), (None, p, None), (None, None, o)]
+        patterns += [(s, p, None), (None, p, o), (s, None, o), (s, p, o)]
+    state = {}
+    for c in [None] + [
+        QuotedGraph(store, c) if kind == "QuotedGraph" else ds.get_context(c)
+        for kind, c in contexts
+    ]:
+        cid = None if c is None else c.identifier
+        state[cid, "len"] = len(store) if c is None else store.__len__(c)
+        for pattern in patterns:
+            state[cid, pattern] = sorted(
+                (t, sorted(x.identifier for x in cs))
+                for t, cs in store.triples(pattern, c)
+            )
+    return contexts, state
+
+
+def test_encoded_memory_matches_memory():
+    rnd = random.Random(11)
+    ex = rdflib.Namespace("http://example.org/")
+    terms = [ex["n%d" % i] for i in range(6)] + [rdflib.Literal(i) for i in range(4)]
+    datasets = [rdflib.Dataset("Memory"), rdflib.Dataset("EncodedMemory")]
+
+    def _triple():
+        return (rnd.choice(terms[:6]), ex["p%d" % rnd.randrange(3)], rnd.choice(terms))
+
+    for step in range(300):
+        op = rnd.random()
+        name = ex["g%d" % rnd.randrange(3)] if rnd.random() < 0.8 else None
+        # some of the triples are quoted in formulas too
+        quoted = ex["q%d" % rnd.randrange(2)] if rnd.random() < 0.25 else None
+        if op < 0.6:
+            triple = _triple()
+            for ds in datasets:
+                (ds.default_context if name is None else ds.graph(name)).add(triple)
+                if quoted is not None:
+                    ds.store.add(triple, QuotedGraph(ds.store, quoted), quoted=True)
+        else:
+            pattern = tuple(t if rnd.random() < 0.5 else None for t in _triple())
+            for ds in datasets:
+                if quoted is not None:
+                    ds.store.remove(pattern, QuotedGraph(ds.store, quoted))
+                elif name is None:
+                    ds.store.remove(pattern, None)
+                else:
+                    ds.graph(name).remove(pattern)
+        if step % 20 == 0:
+            assert _state(datasets[0]) == _state(datasets[1])
+            for p in [ex.p0, ex.p1, ex.p2]:
+                assert datasets[0].store.predicate_statistics(p) == datasets[
+                    1
+                ].store.predicate_statistics(p)
+
+
+def test_encoded_memory_reuses_ids():
+    g = rdflib.Graph("EncodedMemory")
+    ex = rdflib.Namespace("http://example.org/")
+    for i in range(100):
+        g.add((ex.s, ex.p, rdflib.Literal(i)))
+    # removed while the triples are iterated over
+    for s, p, o in g:
+        g.remove((s, p, o))
+        g.add((ex["t%d" % o.value], ex.q, rdflib.Literal(-o.value)))
+    assert len(g) == 100
+    assert set(g.objects(None, ex.q)) == {rdflib.Literal(-i) for i in range(100)}
+    assert list(g.triples((ex.s, None, None))) == []
+    assert len(g.store._EncodedMemory__terms) <= 202
+
+
+def test_memory_shares_context_sets():
+    ds = rdflib.Dataset("Memory")
+    ex = rdflib.Namespace("http://example.org/")
+    g1 = ds.graph(ex.g1)
+    g2 = ds.graph(ex.g2)
+    for i in range(10):
+        g1.add((ex.s, ex.p, rdflib.Literal(i)))
+        g2.add((ex.s, ex.p, rdflib.Literal(i)))
+    g2.add((ex.s, ex.q, ex.o))
+    g1.add((ex.s, ex.q, ex.o))
+
+    store = ds.store
+    contexts = store._Memory__tripleContexts
+    # those not in the contexts of the first triple, all in the same ones
+    assert len(contexts) == 11
+    assert len({id(ctxs) for ctxs in contexts.values()}) == 1
+    assert {g.identifier for g in store.contexts((ex.s, ex.q, ex.o))} == {
+        ex.g1,
+        ex.g2,
+    }
+    assert len(g1) == len(g2) == 11
+
+    g2.remove((None, ex.p, None))
+    assert list(contexts) == [(ex.s, ex.q, ex.o)]
+    assert len(g1) == 11 and len(g2) == 1
+    assert {g.identifier for g in store.contexts((ex.s, ex.p, rdflib.Literal(1)))} == {
+        ex.g1
+    }
+
+
+def test_memory_triples_changed_while_iterated():
+    g = rdflib.Graph("Memory")
+    ex = rdflib.Namespace("http://example.org/")
+    before = {(ex.s, ex.p, rdflib.Literal(i)) for i in range(100)}
+    for triple in before:
+        g.add(triple)
+
+    seen = []
+    for triple in g.triples((ex.s, ex.p, None)):
+        seen.append(triple)
+        g.add((ex.s, ex.p, rdflib.Literal(-triple[2].value - 1)))
+    # the triples as they were when the iteration started
+    assert set(seen) == before and len(seen) == 100
+    assert len(g) == 200
+
+    seen = []
+    for triple in g:
+        seen.append(triple)
+        g.remove(triple)
+        g.add((ex.t, ex.p, triple[2]))
+    assert len(seen) == 200
+    assert set(g) == {(ex.t, ex.p, o) for _, _, o in seen}
+    assert not g.store._Memory__iterated
+
+
+class _SlowDict(dict):
+    """a dict letting other threads run between reading and setting a value"""
+
+    def get(self, *args):
+        time.sleep(0.001)
+        return super().get(*args)
+
+    def __getitem__(self, key):
+        time.sleep(0.001)
+        return super().__getitem__(key)
+
+
+def test_memory_triples_iterated_in_threads():
+    g = rdflib.Graph("Memory")
+    ex = rdflib.Namespace("http://example.org/")
+    for i in range(40):
+        g.add((ex.s, ex.p, rdflib.Literal(i)))
+    g.store._Memory__iterated = _SlowDict()
+    errors = []
+
+    def read():
+        try:
+            for _ in range(20):
+                assert len(list(g.triples((ex.s, ex.p, None)))) == 40
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert not g.store._Memory__iterated
+
+
+def test_memory_triples_are_not_copied():
+    g = rdflib.Graph("Memory")
+    ex = rdflib.Namespace("http://example.org/")
+    for i in range(10000):
+        g.add((ex["s%d" % (i % 10)], ex.p, rdflib.Literal(i)))
+    for pattern in [(None, None, None), (ex.s1, None, None), (None, ex.p, None)]:
+        tracemalloc.start()
+        try:
+            triples = g.triples(pattern)
+            next(triples)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert peak < 8000
+        assert len(list(triples)) == (9999 if pattern[0] is None else 999)
+
+
+@pytest.mark.parametrize("subscribed", [False, True])
+def test_memory_bulk_load(subscribed):
+    rnd = random.Random(5)
+    ex = rdflib.Namespace("http://example.org/")
+    terms = [ex["n%d" % i] for i in range(8)] + [rdflib.Literal(i) for i in range(5)]
+    quads = [
+        (
+            rnd.choice(terms[:8]),
+            ex["p%d" % rnd.randrange(3)],
+            rnd.choice(terms),
+            ex["g%d" % rnd.randrange(3)],
+        )
+        for _ in range(400)
+    ]
+    expected = rdflib.Dataset("Memory")
+    bulk = rdflib.Dataset("Memory")
+    added = []
+    if subscribed:
+        dispatcher = bulk.store.dispatcher
+        dispatcher.subscribe(rdflib.store.TripleRemovedEvent, lambda event: None)
+        dispatcher.subscribe(
+            rdflib.store.TripleAddedEvent, lambda event: added.append(event.triple)
+        )
+
+    with bulk.bulk_load():
+        for i in range(0, 400, 50):
+            batch = quads[i : i + 50]
+            for s, p, o, g in batch:
+                expected.graph(g).add((s, p, o))
+            if i % 100:
+                for s, p, o, g in batch:
+                    bulk.graph(g).add((s, p, o))
+            else:
+                with bulk.bulk_load():
+                    bulk.addN((s, p, o, bulk.graph(g)) for s, p, o, g in batch)
+            if i == 200:
+                # the triples added so far can be looked up and removed
+                assert _state(bulk) == _state(expected)
+                for ds in (expected, bulk):
+                    ds.remove((None, ex.p1, terms[0]))
+                    ds.graph(ex.g2).remove((terms[1], None, None))
+        assert sorted(bulk.triples((None, ex.p0, None))) == sorted(
+            expected.triples((None, ex.p0, None))
+        )
+    assert _state(bulk) == _state(expected)
+    for p in [ex.p0, ex.p1, ex.p2]:
+        stats = expected.store.predicate_statistics(p)
+        assert bulk.store.predicate_statistics(p) == stats
+    if subscribed:
+        assert sorted(added) == sorted((s, p, o) for s, p, o, g in quads)
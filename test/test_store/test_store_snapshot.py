@@ -0,0 +1,140 @@
+from io import BytesIO
+
+import pytest
+
+from rdflib import (
+    XSD,
+    BNode,
+    ConjunctiveGraph,
+    Dataset,
+    Graph,
+    Literal,
+    Namespace,
+    URIRef,
+)
+from rdflib.plugins.stores.auditable import AuditableStore
+from rdflib.plugins.stores.memory import Memory
+from rdflib.plugins.stores.snapshot import dump, load
+
+EX = Namespace("http://example.org/")
+
+TERMS = [
+    Literal("plain"),
+    Literal("café \U0001f600", lang="fr"),
+    Literal("01", datatype=XSD.integer, normalize=False),
+    Literal("2", datatype=XSD.integer),
+    Literal("x", datatype=EX.custom),
+    Literal(""),
+    BNode("b1"),
+    EX["é"],
+]
+
+
+def _restored(graph: Graph) -> Graph:
+    f = BytesIO()
+    dump(graph, f)
+    f.seek(0)
+    return load(f)
+
+
+@pytest.mark.parametrize("store", ["Memory", "SimpleMemory", "EncodedMemory"])
+def test_snapshot_graph(store: str) -> None:
+    g = Graph(store, identifier=EX.graph)
+    g.bind("ex", EX)
+    for i, term in enumerate(TERMS):
+        g.add((EX["s%d" % i], EX.p, term))
+        g.add((BNode("b1"), EX.q, term))
+
+    restored = _restored(g)
+    assert type(restored.store) is type(g.store)
+    assert restored.identifier == EX.graph
+    assert sorted(restored) == sorted(g)
+    for s, p, o in restored:
+        # the exact terms are restored
+        assert any(o == term and type(o) is type(term) for term in TERMS)
+        if isinstance(o, Literal):
+            assert (o.language, o.datatype) in {
+                (term.language, term.datatype) for term in TERMS if term == o
+            }
+    assert ("ex", URIRef(EX)) in set(restored.namespaces())
+    assert restored.value(EX.s2, EX.p) == Literal(
+        "01", datatype=XSD.integer, normalize=False
+    )
+
+
+def test_snapshot_dataset(tmp_path) -> None:
+    ds = Dataset(default_union=True)
+    ds.add((EX.a, EX.p, EX.b))
+    ds.graph(EX.g1).add((EX.a, EX.p, EX.c))
+    ds.graph(EX.g2).add((EX.a, EX.p, EX.c))
+    ds.graph(EX.g2).add((EX.c, EX.p, Literal(1)))
+    ds.graph(EX.empty)
+
+    path = tmp_path / "dataset.snapshot"
+    dump(ds, path)
+    restored = load(str(path))
+    assert isinstance(restored, Dataset) and restored.default_union
+    assert sorted(restored.quads()) == sorted(ds.quads())
+    assert {g.identifier for g in restored.graphs()} == {
+        g.identifier for g in ds.graphs()
+    }
+    assert sorted(restored.graph(EX.g2)) == sorted(ds.graph(EX.g2))
+    stats = ds.store.predicate_statistics(EX.p)
+    assert restored.store.predicate_statistics(EX.p) == stats == (3, 2, 3)
+
+
+@pytest.mark.parametrize("store", ["Memory", "EncodedMemory"])
+def test_snapshot_default_context(store: str) -> None:
+    cg = ConjunctiveGraph(store)
+    cg.store.add((EX.a, EX.p, EX.b), None)
+    cg.get_context(EX.g).add((EX.a, EX.p, EX.c))
+    cg.store.add((EX.a, EX.p, EX.d), None)
+    cg.get_context(EX.g).add((EX.a, EX.p, EX.d))
+    assert len(cg.store) == 3
+
+    restored = _restored(cg)
+    assert len(restored.store) == 3
+    assert sorted(t for t, _ in restored.store.triples((None, None, None))) == sorted(
+        t for t, _ in cg.store.triples((None, None, None))
+    )
+    assert set(restored.get_context(EX.g)) == {(EX.a, EX.p, EX.c), (EX.a, EX.p, EX.d)}
+
+
+def test_snapshot_formulas() -> None:
+    cg = ConjunctiveGraph(identifier=EX.cg)
+    cg.parse(
+        data="""
+        @prefix : <http://example.org/> .
+        :a :p :b .
+        { ?x a :C } => { ?x a :D } .
+        """,
+        format="n3",
+    )
+    restored = _restored(cg)
+    assert isinstance(restored, ConjunctiveGraph)
+    assert restored.identifier == EX.cg
+    assert set(restored.quads()) == set(cg.quads())
+    assert len(restored) == len(cg) == 2
+    formulas = {c.identifier: set(c) for c in cg.contexts() if c.identifier != EX.cg}
+    restored_formulas = {
+        c.identifier: set(c) for c in restored.contexts() if c.identifier != EX.cg
+    }
+    assert restored_formulas == formulas and len(formulas) == 2
+
+
+def test_snapshot_errors() -> None:
+    with pytest.raises(ValueError):
+        load(BytesIO(b"not a snapshot at all"))
+    f = BytesIO()
+    dump(Graph(), f)
+    with pytest.raises(ValueError):
+        load(BytesIO(f.getvalue()[:-1]))
+    with pytest.raises(ValueError):
+        load(BytesIO(f.getvalue()[:8] + b"\xff\xff" + f.getvalue()[10:]))
+
+    g = Graph("SimpleMemory")
+    g.add((EX.a, EX.p, Graph(identifier=EX.g)))  # type: ignore[arg-type]
+    with pytest.raises(ValueError):
+        dump(g, BytesIO())
+    with pytest.raises(ValueError):
+        dump(Graph(AuditableStore(Memory())), BytesIO())